@@ -1,8 +1,12 @@
 import time
+from urllib.parse import urlparse
+
 import duckdb
 import psycopg2
 from testcontainers.postgres import PostgresContainer
-from urllib.parse import urlparse
+
+from evolve.io import PostgresTable
+from evolve.ir import ArrowBackend
 
 # 1. Spin up a Postgres test container
 with PostgresContainer("postgres:latest") as postgres:
@@ -78,3 +82,29 @@ with PostgresContainer("postgres:latest") as postgres:
     con.execute("SELECT COUNT(*) FROM (" + filtered_scan_query + ")").fetchall()
     scan_filtered_time = time.time() - start
     print(f"postgres_scan filtered time: {scan_filtered_time:.3f}s")
+
+    # 7. Benchmark evolve PostgresTable single-stream vs partitioned reads
+    table_options = {
+        "host": host,
+        "port": port,
+        "user": user,
+        "password": password,
+        "db": dbname,
+        "schema": "public",
+        "table": "bigtable",
+        "backend": ArrowBackend(),
+    }
+    read_modes = {
+        "single stream": {},
+        "4 partitions on id": {"partition_column": "id", "num_partitions": 4},
+        "8 partitions on id": {"partition_column": "id", "num_partitions": 8},
+        "4 partitions on ctid": {"num_partitions": 4},
+    }
+
+    print("\nPostgresTable reads:")
+    for label, options in read_modes.items():
+        source = PostgresTable(**table_options, **options)
+        start = time.time()
+        n_rows = source.read().num_rows
+        elapsed = time.time() - start
+        print(f"  {label}: {n_rows} rows in {elapsed:.3f}s")
@@ -0,0 +1,485 @@
+"""
+Benchmark every reader and writer of `evolve.io` against every backend.
+
+Synthetic datasets are generated at each of the requested sizes in every
+format, then each I/O object reads and writes them through each backend of
+`evolve.ir`. Every case is repeated and the median is reported, together with
+the throughput and the peak memory the case added to the process.
+
+The results are saved as json, and compared against a saved baseline with
+`--baseline`: a case whose median time grew by more than `--threshold` is a
+regression, and makes the run exit with status 1.
+
+Usage
+-----
+    python bench/io_suite.py --sizes 10000 1000000 --output results.json
+    python bench/io_suite.py --baseline results.json --threshold 0.15
+
+Postgres is only benchmarked with `--postgres`, which starts a local container
+through testcontainers, SQLite stands in for a database otherwise.
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from evolve import ResourceMonitor
+from evolve.io import (
+    ArrowIpcFile,
+    Bytes,
+    CsvFile,
+    FixedWidthFile,
+    JsonFile,
+    JsonLinesFile,
+    ParquetFile,
+    PostgresTable,
+    SQLiteTable,
+)
+from evolve.io._base import BaseIO
+from evolve.ir import (
+    ArrowBackend,
+    BaseBackend,
+    BytesBackend,
+    DuckdbBackend,
+    PolarsBackend,
+)
+
+BACKENDS: dict[str, Callable[[], BaseBackend]] = {
+    "arrow": ArrowBackend,
+    "polars": PolarsBackend,
+    "duckdb": DuckdbBackend,
+    "bytes": BytesBackend,
+}
+
+# the `(offset, width)` of the columns of the fixed width files
+FIXED_WIDTH_COLUMNS = {
+    "id": (0, 10),
+    "value": (10, 24),
+    "name": (34, 16),
+    "city": (50, 12),
+}
+
+CITIES = np.array(["Stockholm", "Gothenburg", "Malmo", "Uppsala", "Lund", "Umea"])
+
+
+def synthetic_table(n_rows: int, seed: int = 42) -> pa.Table:
+    """Generate the same table of mixed column types for a given size and seed."""
+    rng = np.random.default_rng(seed)
+    names = np.char.add("name-", rng.integers(0, 1_000_000, n_rows).astype(str))
+    return pa.table(
+        {
+            "id": np.arange(n_rows, dtype=np.int64),
+            "value": rng.normal(0, 1_000, n_rows).round(6),
+            "name": names,
+            "city": CITIES[rng.integers(0, len(CITIES), n_rows)],
+        }
+    )
+
+
+def write_fixed_width(table: pa.Table, path: Path) -> None:
+    """Write the table as right-padded fixed width records, one per line."""
+    columns = [
+        np.char.ljust(
+            table[name].to_numpy(zero_copy_only=False).astype(str),
+            width,
+        )
+        for name, (_, width) in FIXED_WIDTH_COLUMNS.items()
+    ]
+    records = np.char.add(columns[0], columns[1])
+    for column in columns[2:]:
+        records = np.char.add(records, column)
+    path.write_text("\n".join(records.tolist()) + "\n")
+
+
+class Format:
+    """
+    A format benchmarked with one I/O object.
+
+    Parameters
+    ----------
+    name : str
+        The name of the format in the results.
+    suffix : str
+        The extension of the files in the format.
+    make_io : Callable[[str, BaseBackend], BaseIO]
+        Create the I/O object for a uri and backend.
+    generate : Callable[[pa.Table, str], None]
+        Write the source dataset of the read benchmarks to a uri.
+    backends : tuple[str, ...]
+        The backends the format is benchmarked with.
+    writes : bool
+        Whether the I/O object can write, besides read.
+
+    """
+
+    def __init__(
+        self,
+        name: str,
+        suffix: str,
+        make_io: Callable[[str, BaseBackend], BaseIO],
+        generate: Callable[[pa.Table, str], None],
+        backends: tuple[str, ...] = ("arrow", "polars", "duckdb", "bytes"),
+        writes: bool = True,
+    ) -> None:
+        self.name = name
+        self.suffix = suffix
+        self.make_io = make_io
+        self.generate = generate
+        self.backends = backends
+        self.writes = writes
+
+
+def _write_sqlite(table: pa.Table, uri: str) -> None:
+    SQLiteTable(uri, "bench", write_mode="create", backend=ArrowBackend()).write(table)
+
+
+def _write_ndjson(table: pa.Table, uri: str) -> None:
+    import polars as pl
+
+    pl.from_arrow(table).write_ndjson(uri)
+
+
+FORMATS = [
+    Format(
+        "csv",
+        ".csv",
+        lambda uri, backend: CsvFile(uri, backend=backend),
+        lambda table, uri: pv.write_csv(table, uri),
+    ),
+    Format(
+        # `JsonFile` reads newline delimited json, and writes a json array
+        "json",
+        ".json",
+        lambda uri, backend: JsonFile(uri, backend=backend),
+        _write_ndjson,
+    ),
+    Format(
+        "ndjson",
+        ".jsonl",
+        lambda uri, backend: JsonLinesFile(uri, backend=backend),
+        _write_ndjson,
+    ),
+    Format(
+        "fixed_width",
+        ".txt",
+        lambda uri, backend: FixedWidthFile(
+            uri,
+            colspecs=FIXED_WIDTH_COLUMNS.values(),
+            colnames=FIXED_WIDTH_COLUMNS.keys(),
+            backend=backend,
+        ),
+        lambda table, uri: write_fixed_width(table, Path(uri)),
+        writes=False,
+    ),
+    Format(
+        "parquet",
+        ".parquet",
+        lambda uri, backend: ParquetFile(uri, backend=backend),
+        lambda table, uri: pq.write_table(table, uri),
+    ),
+    Format(
+        "arrow_ipc",
+        ".arrow",
+        lambda uri, backend: ArrowIpcFile(uri, backend=backend),
+        lambda table, uri: ArrowIpcFile(uri, backend=ArrowBackend()).write(table),
+    ),
+    Format(
+        "sqlite",
+        ".db",
+        lambda uri, backend: SQLiteTable(
+            uri, "bench", write_mode="create", backend=backend
+        ),
+        _write_sqlite,
+    ),
+    Format(
+        # raw bytes only make sense in the bytes backend
+        "bytes",
+        ".bin",
+        lambda uri, backend: Bytes(uri, backend=backend),
+        lambda table, uri: pq.write_table(table, uri),
+        backends=("bytes",),
+    ),
+]
+
+
+@contextlib.contextmanager
+def postgres_format() -> Iterator[Format]:
+    """Start a postgres container and benchmark `PostgresTable` against it."""
+    from testcontainers.postgres import PostgresContainer
+
+    with PostgresContainer("postgres:latest") as postgres:
+        connection = {
+            "host": postgres.get_container_host_ip(),
+            "port": str(postgres.get_exposed_port(postgres.port)),
+            "user": postgres.username,
+            "password": postgres.password,
+            "db": postgres.dbname,
+            "schema": "public",
+        }
+
+        def make_io(uri: str, backend: BaseBackend) -> BaseIO:
+            # every uri is its own table in the same database
+            return PostgresTable(
+                **connection,
+                table=Path(uri).stem.replace("-", "_"),
+                write_mode="replace",
+                backend=backend,
+            )
+
+        def generate(table: pa.Table, uri: str) -> None:
+            make_io(uri, ArrowBackend()).write(table)
+
+        yield Format("postgres", "", make_io, generate)
+
+
+def _size_on_disk(uri: str) -> int | None:
+    path = Path(uri)
+    return path.stat().st_size if path.exists() else None
+
+
+def measure(run: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    """
+    Time `run` `repeat` times, after a warm up run.
+
+    The peak memory is the highest resident set size sampled during a run,
+    less the resident set size at its start.
+    """
+    run()
+    times, peaks = [], []
+    for _ in range(repeat):
+        gc.collect()
+        with ResourceMonitor(interval=0.002, network=False, disk=False) as monitor:
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        rss = monitor.samples()["rss"].to_numpy()
+        peaks.append(int(rss.max() - rss[0]) if len(rss) else 0)
+    return {
+        "seconds": statistics.median(times),
+        "min_seconds": min(times),
+        "max_seconds": max(times),
+        "peak_rss_delta": max(peaks),
+    }
+
+
+def benchmark(
+    formats: list[Format],
+    sizes: list[int],
+    repeat: int,
+    work_dir: Path,
+) -> Iterator[dict[str, Any]]:
+    """Run every read and write case, yielding the result of each."""
+    for n_rows in sizes:
+        table = synthetic_table(n_rows)
+        for fmt in formats:
+            source = str(work_dir / f"source-{fmt.name}-{n_rows}{fmt.suffix}")
+            fmt.generate(table, source)
+            for backend_name in fmt.backends:
+                backend = BACKENDS[backend_name]()
+
+                def read(fmt=fmt, source=source, backend=backend) -> None:
+                    fmt.make_io(source, backend).read()
+
+                cases = [("read", read)]
+                if fmt.writes:
+                    data = backend.ir_from_arrow_table(table)
+                    if isinstance(backend, BytesBackend) and fmt.name == "bytes":
+                        data = Path(source).read_bytes()
+                    counter = iter(range(sys.maxsize))
+                    target = str(work_dir / f"target-{fmt.name}-{backend_name}")
+
+                    def write(
+                        data=data,
+                        counter=counter,
+                        target=target,
+                        fmt=fmt,
+                        backend=backend,
+                    ) -> None:
+                        # a fresh target per run, so writers never append
+                        fmt.make_io(
+                            f"{target}-{next(counter)}{fmt.suffix}", backend
+                        ).write(data)
+
+                    cases.append(("write", write))
+
+                for operation, run in cases:
+                    result = {
+                        "case": f"{operation}/{fmt.name}/{backend_name}/{n_rows}",
+                        "operation": operation,
+                        "format": fmt.name,
+                        "backend": backend_name,
+                        "rows": n_rows,
+                        "bytes": _size_on_disk(source),
+                    }
+                    try:
+                        result.update(measure(run, repeat))
+                    # a failing case is recorded, the suite goes on
+                    except Exception as e:  # noqa: BLE001
+                        result["error"] = f"{type(e).__name__}: {e}"
+                    else:
+                        seconds = result["seconds"]
+                        result["rows_per_s"] = n_rows / seconds
+                        if result["bytes"] is not None:
+                            result["mb_per_s"] = result["bytes"] / 2**20 / seconds
+                    yield result
+
+
+def environment() -> dict[str, Any]:
+    """Describe the machine and library versions the results were measured on."""
+    versions = {}
+    for package in ("evolve-py", "pyarrow", "polars", "duckdb", "adbc-driver-sqlite"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(
+    results: list[dict[str, Any]],
+    baseline: list[dict[str, Any]],
+    threshold: float,
+) -> list[dict[str, Any]]:
+    """
+    Find the cases whose median time grew by more than `threshold`.
+
+    A case that fails now but succeeded in the baseline is a regression too,
+    with the error instead of a time. Cases missing from either side, or that
+    failed in the baseline, are skipped.
+    """
+    previous = {r["case"]: r for r in baseline if "error" not in r}
+    regressions = []
+    for result in results:
+        before = previous.get(result["case"])
+        if before is None:
+            continue
+        if "error" in result:
+            regressions.append(
+                {
+                    "case": result["case"],
+                    "baseline_seconds": before["seconds"],
+                    "error": result["error"],
+                }
+            )
+            continue
+        ratio = result["seconds"] / before["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                {
+                    "case": result["case"],
+                    "baseline_seconds": before["seconds"],
+                    "seconds": result["seconds"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
+
+
+def _print_result(result: dict[str, Any]) -> None:
+    if "error" in result:
+        print(f"{result['case']:<36} {result['error']}")
+        return
+    mb_per_s = result.get("mb_per_s")
+    print(
+        f"{result['case']:<36} {result['seconds'] * 1e3:>10.2f} ms "
+        f"{result['rows_per_s']:>14,.0f} rows/s "
+        f"{'' if mb_per_s is None else f'{mb_per_s:>9.1f} MB/s'} "
+        f"peak +{result['peak_rss_delta'] / 2**20:.1f} MiB"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="the number of rows of the generated datasets",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        help="only benchmark these formats, e.g. csv parquet",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=list(BACKENDS),
+        help="only benchmark these backends",
+    )
+    parser.add_argument("--postgres", action="store_true")
+    parser.add_argument("--output", type=Path, default=Path("bench-results.json"))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="the relative slowdown counted as a regression",
+    )
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        formats = list(FORMATS)
+        if args.postgres:
+            formats.append(stack.enter_context(postgres_format()))
+        if args.formats:
+            formats = [f for f in formats if f.name in args.formats]
+        if args.backends:
+            for fmt in formats:
+                fmt.backends = tuple(b for b in fmt.backends if b in args.backends)
+
+        work_dir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        results = []
+        for result in benchmark(formats, args.sizes, args.repeat, work_dir):
+            _print_result(result)
+            results.append(result)
+
+    args.output.write_text(
+        json.dumps({"environment": environment(), "results": results}, indent=2)
+    )
+    print(f"\nsaved {len(results)} results to {args.output}")
+
+    if args.baseline is None:
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(results, baseline["results"], args.threshold)
+    for regression in regressions:
+        if "error" in regression:
+            print(f"REGRESSION {regression['case']}: {regression['error']}")
+            continue
+        print(
+            f"REGRESSION {regression['case']}: "
+            f"{regression['baseline_seconds'] * 1e3:.2f} ms -> "
+            f"{regression['seconds'] * 1e3:.2f} ms ({regression['ratio']:.2f}x)"
+        )
+    if not regressions:
+        print(f"no regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
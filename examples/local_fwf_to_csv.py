@@ -1,4 +1,5 @@
 import json
+
 import src.evolve as ev
 
 ev.ir.set_global_backend(ev.PolarsBackend())
@@ -38,8 +39,9 @@ def main() -> None:
         .with_target(target)
     )
 
-    # Pipelines are lazy by design
-    pipeline.run()
+    # Pipelines are lazy by design, streaming keeps memory bounded by the
+    # batch size no matter how large the fixed width file is
+    pipeline.run(streaming=True)
 
     print("Reading result:")
     res = ev.io.CsvFile("example-200MB.csv")
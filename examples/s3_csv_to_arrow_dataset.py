@@ -1,22 +1,23 @@
 import uuid
-import time
 from datetime import datetime
 from pathlib import Path
 
-import polars as pl
+from loguru import logger
+from minio import Minio
+
 import evolve as ev
 from evolve import (
     PolarsBackend,
     set_global_backend,
 )
-from minio import Minio
-from loguru import logger
+from evolve.transform import AddLoadMetadata
 
 set_global_backend(PolarsBackend())
 
 job_start_time = datetime.now()
 job_unique_id = str(uuid.uuid4())
 job_name = Path(__file__)
+load_metadata = AddLoadMetadata(str(job_name), loaded_time=job_start_time)
 
 
 @logger.catch(reraise=True)
@@ -39,22 +40,9 @@ def main() -> None:
             endpoint_override=config.S3_ENDPOINT,
         )
 
-        t_read_start = time.perf_counter()
-        df = source.read()
-        t_read_elapsed = time.perf_counter() - t_read_start
-        logger.info(f"reading {len(df}) rows took {t_read_elapsed:.6f} seconds")
-
-        df.with_columns(
-            [
-                pl.lit(job_start_time).alias("internal_loaded_time"),
-                pl.lit(job_name).alias("internal_job_name"),
-            ]
-        )
-
-        t_write_start = time.perf_counter()
-        target.write(df)
-        t_write_elapsed = time.perf_counter() - t_write_start
-        logger.info(f"writing {len(df)} took {t_write_elapsed:.6f} seconds")
+        pipeline = ev.Pipeline(source, target, transforms=[load_metadata])
+        report = pipeline.run()
+        logger.info(report.to_json())
 
 
 if __name__ == "__main__":
@@ -1,12 +1,18 @@
 from . import io
 from .__version__ import __version__
+from ._utils import clear_file_system_cache, set_file_system_idle_timeout
+from .cache import SourceCache
 from .ir import (
     IR,
     ArrowBackend,
     BaseBackend,
     DuckdbBackend,
+    LazyIR,
     PolarsBackend,
+    get_conversion_stats,
     set_global_backend,
 )
+from .metrics import RunReport, StageMetrics
 from .pipeline import Pipeline
-from .utils import monitor_usage
+from .state import JsonStateStore
+from .utils import ResourceMonitor, monitor_usage
@@ -0,0 +1,97 @@
+import queue
+import threading
+from typing import Any, Callable, Iterator
+
+from .exceptions import PipelineAbortedError
+
+# How long a blocked put/get waits before checking whether it should give up.
+_POLL_INTERVAL = 0.1
+
+_CLOSED = object()
+
+
+class _Channel:
+    """
+    Bounded queue connecting two pipeline stages running on separate threads.
+
+    A producer blocks on `put` while the channel is full, which is what gives
+    backpressure between the stages. All channels of a pipeline share one
+    `abort` event, when any stage fails the event is set and every blocked
+    producer and consumer gives up instead of waiting forever.
+    """
+
+    def __init__(self, maxsize: int, abort: threading.Event) -> None:
+        """Initialize the channel with room for `maxsize` items."""
+        if maxsize < 1:
+            raise ValueError(f"channel size must be at least 1, got {maxsize}")
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._abort = abort
+
+    def put(self, item: Any) -> None:
+        """Put an item on the channel, blocking while it is full."""
+        while True:
+            if self._abort.is_set():
+                raise PipelineAbortedError("another pipeline stage failed")
+            try:
+                self._queue.put(item, timeout=_POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def close(self) -> None:
+        """Signal the consumer that no more items will be put on the channel."""
+        self.put(_CLOSED)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yield items from the channel until it is closed."""
+        while True:
+            if self._abort.is_set():
+                raise PipelineAbortedError("another pipeline stage failed")
+            try:
+                item = self._queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            if item is _CLOSED:
+                return
+            yield item
+
+
+def _run_concurrently(
+    background: list[Callable[[], None]],
+    foreground: Callable[[], None],
+    abort: threading.Event,
+) -> None:
+    """
+    Run each `background` stage on its own thread and `foreground` on this one.
+
+    When any stage fails the `abort` event is set, which makes every other
+    stage blocked on a `_Channel` sharing that event give up, and the first
+    failure is re-raised once all threads have finished.
+    """
+    errors = []
+
+    def run_stage(stage: Callable[[], None]) -> None:
+        try:
+            stage()
+        except PipelineAbortedError:
+            pass
+        # any error, so it is re-raised on the calling thread
+        except BaseException as e:  # noqa: BLE001
+            errors.append(e)
+            abort.set()
+
+    threads = [
+        threading.Thread(target=run_stage, args=(stage,), daemon=True)
+        for stage in background
+    ]
+    for thread in threads:
+        thread.start()
+
+    run_stage(foreground)
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
@@ -1,16 +1,99 @@
 import os
+import threading
+import time
 from pathlib import Path
 from typing import (
+    Any,
+    Callable,
+    Hashable,
     Mapping,
     Tuple,
 )
 
 from pyarrow import fs
 
-
 from .exceptions import UnknownUriSchemeError
 
 
+class _FileSystemRegistry:
+    """
+    A process-wide cache of file system instances.
+
+    Setting up a file system, e.g. resolving credentials and connecting to an
+    object store, is expensive, while the instances are thread-safe and keep
+    their connections pooled. So every I/O object with the same scheme,
+    endpoint and credentials shares one instance.
+    """
+
+    def __init__(self) -> None:
+        self._file_systems: dict[Hashable, tuple[fs.FileSystem, float]] = {}
+        self._lock = threading.Lock()
+        self.idle_timeout: float | None = None
+
+    def get(
+        self,
+        key: Hashable,
+        factory: Callable[[], fs.FileSystem],
+    ) -> fs.FileSystem:
+        """Get the file system for `key`, set up with `factory` if not cached."""
+        now = time.monotonic()
+        with self._lock:
+            if self.idle_timeout is not None:
+                # evicted instances stay usable by the I/O objects holding them
+                self._file_systems = {
+                    k: (file_system, last_used)
+                    for k, (file_system, last_used) in self._file_systems.items()
+                    if now - last_used <= self.idle_timeout
+                }
+
+            cached = self._file_systems.get(key)
+            file_system = factory() if cached is None else cached[0]
+            self._file_systems[key] = (file_system, now)
+            return file_system
+
+    def clear(self) -> None:
+        """Drop all cached file systems."""
+        with self._lock:
+            self._file_systems.clear()
+
+
+_FILE_SYSTEMS = _FileSystemRegistry()
+
+
+def clear_file_system_cache() -> None:
+    """
+    Drop all cached file systems.
+
+    I/O objects created afterwards set up new file systems, e.g. to pick up
+    rotated credentials from the environment.
+    """
+    _FILE_SYSTEMS.clear()
+
+
+def set_file_system_idle_timeout(seconds: float | None) -> None:
+    """
+    Evict cached file systems that have not been used for `seconds`.
+
+    By default cached file systems are kept for the lifetime of the process.
+    """
+    _FILE_SYSTEMS.idle_timeout = seconds
+
+
+def _cache_key(options: Mapping[str, Any]) -> Hashable:
+    """Turn file system options into a hashable, order independent key."""
+
+    def hashable(value: Any) -> Hashable:
+        if isinstance(value, fs.S3RetryStrategy):
+            return (type(value).__name__, value.max_attempts)
+        if isinstance(value, Mapping):
+            return tuple(sorted((k, hashable(v)) for k, v in value.items()))
+        if isinstance(value, list):
+            return tuple(hashable(v) for v in value)
+        return value
+
+    return hashable(options)
+
+
 def _try_get_file_system_from_uri(
     uri: str | Path,
     **fs_options: Mapping[str, str],
@@ -23,6 +106,11 @@ def _try_get_file_system_from_uri(
     ----------
     uri : str | Path
         The uniform resource identifier to the file/object.
+    **fs_options
+        Used to set up the file system, e.g. the credentials, endpoint,
+        `connect_timeout`, `request_timeout` and `retry_strategy` of s3.
+        File systems are cached per scheme and options, so I/O objects with
+        the same options share one instance and its connections.
 
     Returns
     -------
@@ -43,7 +131,7 @@ def _try_get_file_system_from_uri(
         uri = "file://" + uri
 
     if "file:///" in uri:
-        file_system = fs.LocalFileSystem()
+        file_system = _FILE_SYSTEMS.get(("file",), fs.LocalFileSystem)
         file_path = uri.replace("file://", "")
 
     elif "s3://" in uri or "s3fs://" in uri:
@@ -60,15 +148,23 @@ def _try_get_file_system_from_uri(
         allow_bucket_deletion = fs_options.get("allow_bucket_deletion", False)
         tls_ca_file_path = fs_options.get("tls_ca_file_path")
 
-        file_system = fs.S3FileSystem(
-            access_key=access_key,
-            secret_key=secret_key,
-            endpoint_override=endpoint_override,
-            region=region,
-            scheme=scheme,
-            allow_bucket_creation=allow_bucket_creation,
-            allow_bucket_deletion=allow_bucket_deletion,
-            tls_ca_file_path=tls_ca_file_path,
+        options = {
+            "access_key": access_key,
+            "secret_key": secret_key,
+            "endpoint_override": endpoint_override,
+            "region": region,
+            "scheme": scheme,
+            "allow_bucket_creation": allow_bucket_creation,
+            "allow_bucket_deletion": allow_bucket_deletion,
+            "tls_ca_file_path": tls_ca_file_path,
+        }
+        # only passed when set, so pyarrow's defaults apply otherwise
+        for name in ("connect_timeout", "request_timeout", "retry_strategy"):
+            if fs_options.get(name) is not None:
+                options[name] = fs_options[name]
+
+        file_system = _FILE_SYSTEMS.get(
+            ("s3", _cache_key(options)), lambda: fs.S3FileSystem(**options)
         )
         file_path = uri.replace("s3fs://", "").replace("s3://", "")
 
@@ -84,15 +180,18 @@ def _try_get_file_system_from_uri(
         kerb_ticket = fs_options.get("kerb_ticket")
         extra_conf = fs_options.get("extra_conf")
 
-        file_system = fs.HadoopFileSystem(
-            host=host,
-            port=port,
-            user=user,
-            replication=replication,
-            buffer_size=buffer_size,
-            default_block_size=default_block_size,
-            kerb_ticket=kerb_ticket,
-            extra_conf=extra_conf,
+        options = {
+            "host": host,
+            "port": port,
+            "user": user,
+            "replication": replication,
+            "buffer_size": buffer_size,
+            "default_block_size": default_block_size,
+            "kerb_ticket": kerb_ticket,
+            "extra_conf": extra_conf,
+        }
+        file_system = _FILE_SYSTEMS.get(
+            ("hdfs", _cache_key(options)), lambda: fs.HadoopFileSystem(**options)
         )
         file_path = uri.replace("hdfs://", "")
 
@@ -0,0 +1,243 @@
+import hashlib
+import os
+import pickle
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+
+import pyarrow as pa
+from pyarrow import fs, ipc
+
+_COPY_CHUNK_SIZE = 8 * 2**20
+
+
+def _default_directory() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "evolve" / "sources"
+
+
+def _options_digest(options: Any) -> str:
+    """Hash the options a file is decoded with, e.g. the csv parse options."""
+    try:
+        encoded = pickle.dumps(options)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        # e.g. options holding a lambda or a lock
+        encoded = repr(options).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _copy(source: pa.NativeFile, sink: pa.NativeFile) -> None:
+    while chunk := source.read(_COPY_CHUNK_SIZE):
+        sink.write(chunk)
+
+
+class SourceCache:
+    """
+    A local disk cache of remote source files, shared by runs and processes.
+
+    Entries are keyed by the uri of the file together with its version on the
+    file system, i.e. its ETag (if the file system reports one, like s3), its
+    size and modification time. A file changed at the source is a new key, so
+    stale entries are never read, they just age out.
+
+    A cached file is stored either as its raw bytes, or (with `decoded`) as
+    the table an I/O object decoded it into, in the uncompressed arrow ipc
+    file format. Decoded entries are memory-mapped on a hit, so re-reading a
+    cached csv neither downloads nor parses it, and only the pages the
+    pipeline touches are read from disk.
+
+    Entries are evicted least recently used first, once the cache outgrows
+    `max_size`. Entries are written to a temporary file and moved into
+    place, so processes sharing the directory never see partial entries.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        *,
+        max_size: int = 10 * 2**30,
+        decoded: bool = True,
+    ) -> None:
+        """
+        Initialize a new `SourceCache`.
+
+        Parameters
+        ----------
+        directory : str | Path | None
+            The local directory of the cache, `$XDG_CACHE_HOME/evolve/sources`
+            (or `~/.cache/evolve/sources`) by default.
+        max_size : int
+            The number of bytes the entries may take up on disk.
+        decoded : bool
+            Store the decoded tables of the I/O objects that support it, so a
+            hit needs no parsing. Otherwise only the raw files are cached.
+
+        """
+        self._directory = Path(directory) if directory else _default_directory()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._decoded = decoded
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        """Get the directory the entries are stored in."""
+        return self._directory
+
+    @property
+    def size(self) -> int:
+        """Get the number of bytes taken up by the entries."""
+        return sum(path.stat().st_size for path in self._entries())
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            for path in self._entries():
+                path.unlink(missing_ok=True)
+
+    def open_input_file(
+        self,
+        file_system: fs.FileSystem,
+        path: str,
+    ) -> pa.NativeFile:
+        """
+        Open a cached copy of a file, downloading it on a miss.
+
+        Parameters
+        ----------
+        file_system : fs.FileSystem
+            The file system of the source file.
+        path : str
+            The path of the source file on `file_system`.
+
+        Returns
+        -------
+        pa.NativeFile
+            The cached copy, memory-mapped for reading.
+
+        """
+        entry = self._entry(self._key(file_system, path), ".raw")
+        if not self._hit(entry):
+            with file_system.open_input_stream(path) as source:
+                self._store(entry, lambda sink: _copy(source, sink))
+        return pa.memory_map(str(entry))
+
+    def read_table(
+        self,
+        file_system: fs.FileSystem,
+        path: str,
+        decode: Callable[[pa.NativeFile], pa.Table],
+        options: Any = None,
+    ) -> pa.Table:
+        """
+        Read the table decoded from a file, decoding it on a miss.
+
+        Parameters
+        ----------
+        file_system : fs.FileSystem
+            The file system of the source file.
+        path : str
+            The path of the source file on `file_system`.
+        decode : Callable[[pa.NativeFile], pa.Table]
+            Decode the opened file into a table, e.g. `pyarrow.csv.read_csv`.
+        options : Any
+            Everything that changes the decoded table besides the file, e.g.
+            the parse options. Tables decoded with other options are separate
+            entries.
+
+        Returns
+        -------
+        pa.Table
+            The decoded table. Its columns are backed by the memory-mapped
+            entry, unless the cache only stores raw files.
+
+        """
+        if not self._decoded:
+            with self.open_input_file(file_system, path) as source:
+                return decode(source)
+
+        key = self._key(file_system, path)
+        entry = self._entry(f"{key}-{_options_digest(options)[:16]}", ".arrow")
+        if not self._hit(entry):
+            with file_system.open_input_file(path) as source:
+                table = decode(source)
+
+            def write(sink: pa.NativeFile) -> None:
+                with ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+            self._store(entry, write)
+        with ipc.open_file(pa.memory_map(str(entry))) as reader:
+            return reader.read_all()
+
+    def _key(self, file_system: fs.FileSystem, path: str) -> str:
+        """Get the key of the current version of a file."""
+        info = file_system.get_file_info(path)
+        if info.type != fs.FileType.File:
+            raise FileNotFoundError(f"no such file: {file_system.type_name}://{path}")
+
+        etag = None
+        if not isinstance(file_system, fs.LocalFileSystem):
+            # object stores report the ETag in the metadata of an opened file
+            with file_system.open_input_file(path) as source:
+                metadata = {
+                    (k.decode() if isinstance(k, bytes) else k).lower(): v
+                    for k, v in source.metadata().items()
+                }
+            etag = metadata.get("etag")
+
+        version = f"{file_system.type_name}://{path}|{etag}|{info.size}|{info.mtime_ns}"
+        return hashlib.sha256(version.encode()).hexdigest()
+
+    def _entry(self, key: str, suffix: str) -> Path:
+        return self._directory / key[:2] / f"{key}{suffix}"
+
+    def _entries(self) -> list[Path]:
+        return [
+            path
+            for path in self._directory.glob("*/*")
+            if path.suffix in (".raw", ".arrow")
+        ]
+
+    def _hit(self, entry: Path) -> bool:
+        """Check for an entry, marking it as recently used."""
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _store(self, entry: Path, write: Callable[[pa.NativeFile], None]) -> None:
+        """Write an entry atomically, then evict entries beyond the size cap."""
+        entry.parent.mkdir(exist_ok=True)
+        tmp_path = entry.with_name(f".{entry.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with pa.OSFile(str(tmp_path), "wb") as sink:
+                write(sink)
+            os.replace(tmp_path, entry)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self._evict(keep=entry)
+
+    def _evict(self, keep: Path) -> None:
+        """Remove the least recently used entries until the cache fits."""
+        with self._lock:
+            entries = []
+            for path in self._entries():
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    # evicted by another process
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+            size = sum(entry_size for _, entry_size, _ in entries)
+            for _, entry_size, path in sorted(entries):
+                if size <= self._max_size:
+                    break
+                if path == keep:
+                    continue
+                # memory maps of open readers stay valid after the unlink
+                path.unlink(missing_ok=True)
+                size -= entry_size
@@ -8,3 +8,9 @@ class UnknownUriSchemeError(Exception):
     """Raised when an unsupported URI scheme was encountered."""
 
     pass
+
+
+class PipelineAbortedError(Exception):
+    """Raised in a pipeline stage when a concurrently running stage failed."""
+
+    pass
@@ -1,7 +1,13 @@
 from .arrow_dataset import ArrowDataset
+from .arrow_ipc import ArrowIpcFile
+from .bytes import Bytes
 from .csv import CsvFile
 from .fixed_width import FixedWidthFile
-from .bytes import Bytes
-from .parquet import ParquetFile
+from .iceberg import IcebergTable
 from .json import JsonFile
+from .jsonl import JsonLinesFile
+from .multi_file import MultiFile
+from .multi_fixed_width import MultiFixedWidthFile
+from .parquet import ParquetFile
 from .postgres import PostgresTable
+from .sqlite import SQLiteTable
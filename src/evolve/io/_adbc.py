@@ -0,0 +1,114 @@
+from typing import Any, Iterable, Iterator
+
+import pyarrow as pa
+
+from ._utils import _peek_schema
+
+WRITE_MODES = ("create", "append", "replace", "create_append")
+
+
+def _validate_write_mode(write_mode: str) -> None:
+    if write_mode not in WRITE_MODES:
+        raise ValueError(
+            f"unknown write mode '{write_mode}', expected one of {list(WRITE_MODES)}"
+        )
+
+
+def _quote(*identifiers: str | None) -> str:
+    """Quote a (possibly schema qualified) SQL identifier."""
+    return ".".join(
+        '"' + identifier.replace('"', '""') + '"'
+        for identifier in identifiers
+        if identifier is not None
+    )
+
+
+def _adbc_ingest(
+    connection: Any,
+    table: str,
+    batches: Iterable[pa.RecordBatch],
+    *,
+    write_mode: str,
+    db_schema: str | None = None,
+    commit_every: int | None = None,
+) -> int:
+    """
+    Bulk load a stream of record batches into a table through ADBC.
+
+    The batches are streamed into `adbc_ingest` as a record batch reader, which
+    the drivers turn into a bulk load (binary COPY for PostgreSQL) instead of
+    row by row INSERTs.
+
+    Parameters
+    ----------
+    connection : Any
+        An ADBC DB-API connection.
+    table : str
+        The name of the table to load into.
+    batches : Iterable[pa.RecordBatch]
+        The record batches to load.
+    write_mode : str
+        One of `create`, `append`, `replace` or `create_append`.
+    db_schema : str | None
+        The database schema of the table.
+    commit_every : int | None
+        Commit after every chunk of at least this many rows instead of once at
+        the end. Chunks after the first are always appended.
+
+    Returns
+    -------
+    int
+        The number of rows loaded.
+
+    """
+    _validate_write_mode(write_mode)
+    schema, batches = _peek_schema(batches)
+    if schema is None:
+        return 0
+
+    exhausted = False
+    n_loaded = 0
+
+    def take_chunk() -> Iterator[pa.RecordBatch]:
+        nonlocal exhausted, n_loaded
+        n_rows = 0
+        for batch in batches:
+            yield batch
+            n_rows += batch.num_rows
+            n_loaded += batch.num_rows
+            if commit_every is not None and n_rows >= commit_every:
+                return
+        exhausted = True
+
+    with connection.cursor() as cursor:
+        while not exhausted:
+            cursor.adbc_ingest(
+                table,
+                pa.RecordBatchReader.from_batches(schema, take_chunk()),
+                mode=write_mode,
+                db_schema_name=db_schema,
+            )
+            connection.commit()
+            write_mode = "append"
+
+    return n_loaded
+
+
+def _adbc_swap_tables(
+    connection: Any,
+    table: str,
+    staging_table: str,
+    db_schema: str | None = None,
+) -> None:
+    """
+    Replace `table` by `staging_table` in a single transaction.
+
+    Readers either see the old table or the fully loaded new one, never a
+    partially loaded table.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {_quote(db_schema, table)}")
+        cursor.execute(
+            f"ALTER TABLE {_quote(db_schema, staging_table)} RENAME TO {_quote(table)}"
+        )
+    connection.commit()
@@ -1,6 +1,11 @@
 import abc
+import itertools
+from typing import Iterable, Iterator
 
-from ..ir import IR, BaseBackend
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from ..ir import IR, BaseBackend, LazyIR
 
 
 class BaseIO(abc.ABC):
@@ -30,3 +35,68 @@ class BaseIO(abc.ABC):
     def write(self, data: IR) -> None:
         """Write the backend IR data to the target path."""
         pass
+
+    def commit(self) -> None:
+        """
+        Persist the progress made by the last read.
+
+        Incremental sources record their new high-water mark in their state
+        store here, which the pipeline calls only once the data read has been
+        written to the target. Sources without incremental state do nothing.
+        """
+        pass
+
+    def scan(self) -> LazyIR:
+        """
+        Create a lazy query plan over the source.
+
+        The default implementation reads the full dataset eagerly, I/O objects
+        that support projection and predicate pushdown should override this.
+        """
+        table = self._backend.ir_to_arrow_table(self.read())
+        return self._backend.lazy_from_arrow_dataset(ds.dataset(table))
+
+    def read_batches(self, batch_size: int | None = None) -> Iterator[pa.RecordBatch]:
+        """
+        Read the data from the source path as a stream of arrow record batches.
+
+        The default implementation materializes the full dataset with `read`
+        and slices it up, I/O objects that can read incrementally should
+        override this to keep memory bounded by the batch size.
+
+        Parameters
+        ----------
+        batch_size : int | None
+            The maximum number of rows per record batch, defaults to the
+            natural chunking of the source.
+
+        Yields
+        ------
+        pa.RecordBatch
+            The next record batch read from the source.
+
+        """
+        table = self._backend.ir_to_arrow_table(self.read())
+        yield from table.to_batches(max_chunksize=batch_size)
+
+    def write_batches(self, batches: Iterable[pa.RecordBatch]) -> None:
+        """
+        Write a stream of arrow record batches to the target path.
+
+        The default implementation collects all batches into one table and
+        hands it to `write`, I/O objects that can write incrementally should
+        override this to keep memory bounded by the batch size.
+
+        Parameters
+        ----------
+        batches : Iterable[pa.RecordBatch]
+            The record batches to write, all sharing the same schema.
+
+        """
+        batches = iter(batches)
+        first = next(batches, None)
+        if first is None:
+            return
+
+        table = pa.Table.from_batches(itertools.chain([first], batches))
+        self.write(self._backend.ir_from_arrow_table(table))
@@ -1,66 +1,353 @@
+import collections
+import concurrent.futures
+import itertools
+import json
 import os
+import threading
+import uuid
 from pathlib import Path
+from typing import Iterable, Iterator
 
+import numpy as np
 import polars as pl
 import pyarrow as pa
-import pyarrow.parquet as pq
+import pyarrow.compute as pc
 import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from pyarrow import fs
 
 from .._utils import _try_get_file_system_from_uri
-from ..ir import BaseBackend, get_global_backend, IR
-
+from ..ir import IR, BaseBackend, LazyIR, get_global_backend
 from ._base import BaseIO
+from ._utils import _peek_schema
+from .parquet import _write_row_groups
+
+_DEFAULT_TARGET_FILE_SIZE = 256 * 1024 * 1024
+# aim for row groups of this many uncompressed bytes when compacting, capped
+# at the pyarrow default of 1024 * 1024 rows
+_TARGET_ROW_GROUP_BYTES = 128 * 1024 * 1024
+_MAX_ROW_GROUP_SIZE = 1024 * 1024
+
+
+def _bin_pack(
+    files: list[tuple[fs.FileInfo, pq.FileMetaData]],
+    target_size: int,
+) -> list[list[tuple[fs.FileInfo, pq.FileMetaData]]]:
+    """
+    Pack files into bins of at most `target_size` bytes, first fit decreasing.
+
+    Only bins of more than one file are returned, a file alone in its bin is
+    left as it is.
+    """
+    bins = []
+    for file in sorted(files, key=lambda file: file[0].size, reverse=True):
+        for size_and_files in bins:
+            if size_and_files[0] + file[0].size <= target_size:
+                size_and_files[0] += file[0].size
+                size_and_files[1].append(file)
+                break
+        else:
+            bins.append([file[0].size, [file]])
+
+    return [
+        sorted(files, key=lambda file: file[0].path)
+        for _, files in bins
+        if len(files) > 1
+    ]
+
+
+def _row_group_size(metadata: Iterable[pq.FileMetaData]) -> int:
+    """Rows per row group for about `_TARGET_ROW_GROUP_BYTES` of uncompressed data."""
+    n_bytes = n_rows = 0
+    for meta in metadata:
+        n_rows += meta.num_rows
+        n_bytes += sum(
+            meta.row_group(i).total_byte_size for i in range(meta.num_row_groups)
+        )
+    bytes_per_row = max(n_bytes // max(n_rows, 1), 1)
+    return max(1, min(_TARGET_ROW_GROUP_BYTES // bytes_per_row, _MAX_ROW_GROUP_SIZE))
+
+
+def _compression(metadata: Iterable[pq.FileMetaData]) -> str:
+    """Get the codec of the first column chunk found in the files."""
+    for meta in metadata:
+        if meta.num_row_groups and meta.num_columns:
+            codec = meta.row_group(0).column(0).compression.lower()
+            return "none" if codec == "uncompressed" else codec
+    return "snappy"
+
+
+def _reap(futures: set[concurrent.futures.Future]) -> None:
+    """Drop the finished futures from `futures`, re-raising their errors."""
+    done = {future for future in futures if future.done()}
+    for future in done:
+        future.result()
+    futures -= done
+
+
+class _Partition:
+    """The write state of one partition, only touched by its drain task."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.queue = collections.deque()
+        self.draining = False
+        self.writer = None
+        self.sink = None
+        self.n_files = 0
+        self.file_rows = 0
+        self.buffered = []
+        self.buffered_rows = 0
+
+
+class _PartitionedParquetWriter:
+    """
+    Stream record batches into hive partitioned parquet files, written by a
+    pool of workers with one open file per partition.
+
+    Every partition has a queue of tables to write. Whenever a queue gets its
+    first table a drain task is submitted to the pool, which writes the queue
+    in order, so the partitions are written concurrently while the rows of
+    each partition keep their input order.
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        partition_cols: list[str],
+        *,
+        filename: str,
+        compression: str,
+        filesystem: fs.FileSystem,
+        max_workers: int,
+        max_rows_per_file: int | None,
+        row_group_size: int | None,
+    ) -> None:
+        self._base_dir = base_dir.rstrip("/")
+        self._partition_cols = partition_cols
+        self._stem, self._suffix = os.path.splitext(filename)
+        self._compression = compression
+        self._filesystem = filesystem
+        self._max_workers = max_workers
+        self._max_rows_per_file = max_rows_per_file
+        self._row_group_size = row_group_size
+        self._partitions: dict[tuple, _Partition] = {}
+        self._lock = threading.Lock()
+        # bounds the number of tables queued up but not yet written
+        self._slots = threading.Semaphore(4 * max_workers)
+
+    def write(self, batches: Iterable[pa.RecordBatch]) -> None:
+        futures = set()
+        with concurrent.futures.ThreadPoolExecutor(self._max_workers) as executor:
+            try:
+                for batch in batches:
+                    for keys, table in self._split(batch):
+                        # wait for a slot, but fail fast if a write failed
+                        while not self._slots.acquire(timeout=0.1):
+                            _reap(futures)
+                        future = self._enqueue(executor, self._partition(keys), table)
+                        if future is not None:
+                            futures.add(future)
+                    _reap(futures)
+
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+
+                closing = [
+                    executor.submit(self._close, partition)
+                    for partition in self._partitions.values()
+                ]
+                for future in concurrent.futures.as_completed(closing):
+                    future.result()
+            except BaseException:
+                for partition in self._partitions.values():
+                    with self._lock:
+                        partition.queue.clear()
+                concurrent.futures.wait(futures)
+                for partition in self._partitions.values():
+                    self._close(partition, flush=False)
+                raise
+
+    def _split(self, batch: pa.RecordBatch) -> Iterator[tuple[tuple, pa.RecordBatch]]:
+        """
+        Split a batch into one batch per partition.
+
+        The rows are sorted by the partition columns with a stable sort, so
+        every partition is a slice of the sorted batch, in input order.
+        """
+        if batch.num_rows == 0:
+            return
+
+        order = pc.sort_indices(
+            batch, sort_keys=[(col, "ascending") for col in self._partition_cols]
+        )
+        batch = batch.take(order)
+        keys = batch.select(self._partition_cols)
+        runs = (
+            pl.from_arrow(keys)
+            .select(pl.struct(self._partition_cols).rle_id())
+            .to_series()
+            .to_numpy()
+        )
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(runs)) + 1])
+        ends = np.append(starts[1:], batch.num_rows)
+        for start, end, row in zip(
+            starts.tolist(), ends.tolist(), keys.take(starts).to_pylist()
+        ):
+            yield tuple(row.values()), batch.slice(start, end - start)
+
+    def _partition(self, keys: tuple) -> _Partition:
+        partition = self._partitions.get(keys)
+        if partition is None:
+            parts = [f"{col}={val}" for col, val in zip(self._partition_cols, keys)]
+            partition = _Partition("/".join([self._base_dir, *parts]))
+            self._partitions[keys] = partition
+        return partition
+
+    def _enqueue(
+        self,
+        executor: concurrent.futures.Executor,
+        partition: _Partition,
+        batch: pa.RecordBatch,
+    ) -> concurrent.futures.Future | None:
+        with self._lock:
+            partition.queue.append(batch)
+            if partition.draining:
+                return None
+            partition.draining = True
+        return executor.submit(self._drain, partition)
+
+    def _drain(self, partition: _Partition) -> None:
+        while True:
+            with self._lock:
+                if not partition.queue:
+                    partition.draining = False
+                    return
+                batch = partition.queue.popleft()
+            try:
+                self._append(partition, batch)
+            except BaseException:
+                with self._lock:
+                    partition.draining = False
+                raise
+            finally:
+                self._slots.release()
+
+    def _append(self, partition: _Partition, batch: pa.RecordBatch) -> None:
+        while batch.num_rows:
+            if self._max_rows_per_file is not None:
+                room = self._max_rows_per_file - partition.file_rows
+                if room == 0:
+                    self._close(partition)
+                    continue
+                chunk, batch = batch.slice(0, room), batch.slice(room)
+            else:
+                chunk, batch = batch, batch.slice(batch.num_rows)
+
+            partition.buffered.append(chunk)
+            partition.buffered_rows += chunk.num_rows
+            partition.file_rows += chunk.num_rows
+            self._flush(partition, final=False)
+
+    def _flush(self, partition: _Partition, final: bool) -> None:
+        """Write the buffered rows, holding back a partial row group unless final."""
+        n_rows = partition.buffered_rows
+        if self._row_group_size is not None and not final:
+            n_rows -= n_rows % self._row_group_size
+        if not n_rows:
+            return
+
+        table = pa.Table.from_batches(partition.buffered)
+        if partition.writer is None:
+            self._open(partition, table.schema)
+        partition.writer.write_table(
+            table.slice(0, n_rows),
+            row_group_size=self._row_group_size or n_rows,
+        )
+        partition.buffered = table.slice(n_rows).to_batches()
+        partition.buffered_rows -= n_rows
+
+    def _open(self, partition: _Partition, schema: pa.Schema) -> None:
+        name = self._stem
+        if partition.n_files:
+            name += f"-{partition.n_files}"
+        if isinstance(self._filesystem, fs.LocalFileSystem):
+            self._filesystem.create_dir(partition.directory, recursive=True)
+
+        path = f"{partition.directory}/{name}{self._suffix}"
+        partition.sink = self._filesystem.open_output_stream(path)
+        partition.writer = pq.ParquetWriter(
+            partition.sink, schema, compression=self._compression
+        )
+
+    def _close(self, partition: _Partition, flush: bool = True) -> None:
+        if flush:
+            self._flush(partition, final=True)
+        if partition.writer is not None:
+            partition.writer.close()
+            partition.sink.close()
+            partition.writer = None
+            partition.n_files += 1
+        partition.file_rows = 0
 
 
 def write_partitioned_parquet_embedded(
-    df: pa.Table | pl.DataFrame,
+    data: pa.Table | pl.DataFrame | Iterable[pa.RecordBatch],
     base_dir: str,
     partition_cols: list[str],
     filename: str = "data.parquet",
     compression: str = "zstd",
     filesystem: fs.FileSystem | None = None,
+    *,
+    max_workers: int | None = None,
+    max_rows_per_file: int | None = None,
+    row_group_size: int | None = None,
 ) -> None:
     """
-    Write partitioned Parquet files with embedded partition columns using Polars or PyArrow.
+    Write partitioned Parquet files with embedded partition columns.
+
+    The input is streamed batch by batch, every batch is split up by partition
+    and the parts are appended to one open parquet writer per partition. The
+    writes go through a pool of workers, so with thousands of partitions on
+    an object store the per-request latency of the files is overlapped.
 
     Args:
-        df: Polars DataFrame or PyArrow Table
+        data: Polars DataFrame, PyArrow Table or a stream of record batches
         base_dir: Output directory (local or S3)
         partition_cols: List of column names to partition by
-        filename: Name of each output file
+        filename: Name of each output file, further files of a partition are
+            suffixed with `-1`, `-2`, ...
         compression: Parquet compression codec
         filesystem: Optional PyArrow filesystem (e.g., S3FileSystem)
+        max_workers: Number of partition files written concurrently
+        max_rows_per_file: Start a new file in a partition once the current
+            one holds this many rows
+        row_group_size: Buffer this many rows per partition before writing a
+            row group, by default every incoming part is written as it comes
     """
-    if isinstance(df, pa.Table):
-        df = pl.from_arrow(df)
-
-    if not all(col in df.columns for col in partition_cols):
-        raise ValueError("All partition columns must be present in the DataFrame")
-
-    # Group by partition columns
-    groups = df.group_by(partition_cols, maintain_order=True)
+    if isinstance(data, pl.DataFrame):
+        data = data.to_arrow()
+    if isinstance(data, pa.Table):
+        data = data.to_batches()
 
-    for keys, group_df in groups:
-        # Build partition path
-        parts = [f"{col}={val}" for col, val in zip(partition_cols, keys)]
-        path = os.path.join(base_dir, *parts)
+    schema, batches = _peek_schema(data)
+    if schema is None:
+        return
 
-        # Create directory if local
-        if filesystem is None:
-            os.makedirs(path, exist_ok=True)
-
-        # Convert to Arrow
-        arrow_table = group_df.to_arrow()
+    if not all(col in schema.names for col in partition_cols):
+        raise ValueError("All partition columns must be present in the DataFrame")
 
-        # Write Parquet file
-        full_path = os.path.join(path, filename)
-        pq.write_table(
-            arrow_table,
-            full_path,
-            compression=compression,
-            filesystem=filesystem,
-        )
+    writer = _PartitionedParquetWriter(
+        base_dir,
+        partition_cols,
+        filename=filename,
+        compression=compression,
+        filesystem=filesystem or fs.LocalFileSystem(),
+        max_workers=max_workers or min(32, (os.cpu_count() or 1) + 4),
+        max_rows_per_file=max_rows_per_file,
+        row_group_size=row_group_size,
+    )
+    writer.write(batches)
 
 
 class ArrowDataset(BaseIO):
@@ -71,6 +358,17 @@ class ArrowDataset(BaseIO):
         backend: BaseBackend | None = None,
         **options,
     ) -> None:
+        """
+        Initialize a new `ArrowDataset`.
+
+        Next to the file system options, `schema`, `format`, `partitioning`
+        and `existing_data_behaviour` configure the dataset. Writes can be
+        tuned with `max_rows_per_file` and `row_group_size`. With
+        `embed_partition_columns` and `partitioning` given as a list of
+        column names, parquet datasets are written by
+        `write_partitioned_parquet_embedded`, which keeps the partition
+        columns in the files and writes `max_workers` partitions concurrently.
+        """
         super().__init__(
             name=self.__class__.__name__,
             backend=backend or get_global_backend(),
@@ -85,6 +383,15 @@ class ArrowDataset(BaseIO):
         self._format = options.get("format", "parquet")
         self._partitioning = options.get("partitioning")
         self._existing_data_behaviour = options.get("existing_data_behaviour", "error")
+        self._max_rows_per_file = options.get("max_rows_per_file")
+        self._row_group_size = options.get("row_group_size")
+        self._embed_partition_columns = options.get("embed_partition_columns", False)
+        self._max_workers = options.get("max_workers")
+
+        if self._embed_partition_columns and not isinstance(self._partitioning, list):
+            raise ValueError(
+                "embed_partition_columns requires partitioning as a list of columns"
+            )
 
     def read(self) -> IR:
         return self._backend.ir_from_arrow_table(
@@ -96,11 +403,235 @@ class ArrowDataset(BaseIO):
         )
 
     def write(self, data: IR) -> None:
+        self.write_batches(self._backend.ir_to_arrow_table(data).to_batches())
+
+    def scan(self) -> LazyIR:
+        """
+        Create a lazy query plan over the dataset.
+
+        Unlike `read`, the configured partitioning is applied when discovering
+        the dataset, so the partition columns are part of the plan and filters
+        on them skip whole directories.
+        """
+        return self._backend.lazy_from_arrow_dataset(
+            ds.dataset(
+                self._base_dir,
+                format=self._format,
+                filesystem=self._file_system,
+                partitioning=self._partitioning,
+            )
+        )
+
+    def read_batches(self, batch_size: int | None = None) -> Iterator[pa.RecordBatch]:
+        """Stream the dataset as record batches, one file fragment at a time."""
+        dataset = ds.dataset(
+            self._base_dir,
+            format=self._format,
+            filesystem=self._file_system,
+        )
+        if batch_size is None:
+            yield from dataset.to_batches()
+        else:
+            yield from dataset.to_batches(batch_size=batch_size)
+
+    def write_batches(self, batches: Iterable[pa.RecordBatch]) -> None:
+        """Write a stream of record batches to the dataset without collecting them."""
+        schema, batches = _peek_schema(batches)
+        if schema is None:
+            return
+
+        if self._embed_partition_columns:
+            write_partitioned_parquet_embedded(
+                batches,
+                self._base_dir,
+                self._partitioning,
+                filesystem=self._file_system,
+                max_workers=self._max_workers,
+                max_rows_per_file=self._max_rows_per_file,
+                row_group_size=self._row_group_size,
+            )
+            return
+
+        sizing = {}
+        if self._max_rows_per_file is not None:
+            sizing["max_rows_per_file"] = self._max_rows_per_file
+        if self._row_group_size is not None:
+            sizing["min_rows_per_group"] = self._row_group_size
+            sizing["max_rows_per_group"] = self._row_group_size
+
         ds.write_dataset(
-            data=self._backend.ir_to_arrow_table(data),
+            data=batches,
             base_dir=self._base_dir,
+            schema=schema,
             format=self._format,
             partitioning=self._partitioning,
             existing_data_behavior=self._existing_data_behaviour,
             filesystem=self._file_system,
+            **sizing,
         )
+
+    def compact(
+        self,
+        target_file_size: int = _DEFAULT_TARGET_FILE_SIZE,
+        *,
+        row_group_size: int | None = None,
+        max_workers: int | None = None,
+    ) -> list[str]:
+        """
+        Compact the small parquet files of every partition into larger files.
+
+        Within each directory of the dataset the files smaller than
+        `target_file_size` bytes are bin-packed into groups of at most that
+        size, and every group is rewritten as a single file. Files are
+        streamed one record batch at a time, so a partition never has to fit
+        in memory, and the directories are compacted concurrently by
+        `max_workers` threads. Only files with the same schema are combined.
+
+        The new file is written under a hidden name, which readers skip, and
+        only moved into place once the files it replaces are deleted, so a
+        reader never sees the same rows twice. Object stores and most file
+        systems cannot swap several files at once though: a reader listing a
+        directory while its files are being replaced misses their rows.
+        Compaction is not safe with concurrent readers, run it while nothing
+        reads the dataset.
+
+        A journal listing the replaced files is kept next to them until the
+        swap is done, so an interrupted compaction is finished (or abandoned,
+        if its file was not completely written) by the next `compact`.
+
+        Parameters
+        ----------
+        target_file_size : int
+            The size in bytes the compacted files should approach.
+        row_group_size : int | None
+            The number of rows per row group of the compacted files, by
+            default sized for about 128 MiB of uncompressed data per group.
+        max_workers : int | None
+            The number of directories compacted concurrently.
+
+        Returns
+        -------
+        list[str]
+            The paths of the compacted files written.
+
+        """
+        if self._format != "parquet":
+            raise ValueError(f"can only compact parquet datasets, not {self._format}")
+
+        selector = fs.FileSelector(self._base_dir, recursive=True)
+        files = [
+            info
+            for info in self._file_system.get_file_info(selector)
+            if info.type == fs.FileType.File
+        ]
+        directories = [
+            list(infos)
+            for _, infos in itertools.groupby(
+                sorted(files, key=lambda info: info.path),
+                key=lambda info: info.path.rpartition("/")[0],
+            )
+        ]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            compacted = executor.map(
+                lambda infos: self._compact_directory(
+                    infos, target_file_size, row_group_size
+                ),
+                directories,
+            )
+            return [path for paths in compacted for path in paths]
+
+    def _compact_directory(
+        self,
+        infos: list[fs.FileInfo],
+        target_file_size: int,
+        row_group_size: int | None,
+    ) -> list[str]:
+        journals = [i for i in infos if i.base_name.startswith("_compaction-")]
+        for journal in journals:
+            self._finish_compaction(journal.path)
+        if journals:
+            # the recovery deleted files, so list the directory again
+            directory = infos[0].path.rpartition("/")[0]
+            infos = self._file_system.get_file_info(fs.FileSelector(directory))
+
+        small = [
+            info
+            for info in infos
+            if info.type == fs.FileType.File
+            and not info.base_name.startswith((".", "_"))
+            and info.size < target_file_size
+        ]
+        by_schema = collections.defaultdict(list)
+        for info in small:
+            with self._file_system.open_input_file(info.path) as f:
+                metadata = pq.read_metadata(f)
+            by_schema[metadata.schema.to_arrow_schema()].append((info, metadata))
+
+        return [
+            self._compact_files(files, row_group_size)
+            for same_schema in by_schema.values()
+            for files in _bin_pack(same_schema, target_file_size)
+        ]
+
+    def _compact_files(
+        self,
+        files: list[tuple[fs.FileInfo, pq.FileMetaData]],
+        row_group_size: int | None,
+    ) -> str:
+        """Rewrite the files as a single file and replace them with it."""
+        directory = files[0][0].path.rpartition("/")[0]
+        name = uuid.uuid4().hex
+        journal_path = f"{directory}/_compaction-{name}.json"
+        journal = {
+            "staging": f"{directory}/.compacting-{name}.parquet",
+            "ready": f"{directory}/.compacted-{name}.parquet",
+            "output": f"{directory}/compacted-{name}.parquet",
+            "inputs": [info.path for info, _ in files],
+        }
+        # record the intent first, so an interrupted compaction can always
+        # be completed or rolled back by the next one
+        with self._file_system.open_output_stream(journal_path) as f:
+            f.write(json.dumps(journal).encode())
+
+        schema = files[0][1].schema.to_arrow_schema()
+        compression = _compression(meta for _, meta in files)
+        if row_group_size is None:
+            row_group_size = _row_group_size(meta for _, meta in files)
+
+        def batches() -> Iterator[pa.RecordBatch]:
+            for info, _ in files:
+                with self._file_system.open_input_file(info.path) as f:
+                    yield from pq.ParquetFile(f).iter_batches()
+
+        with self._file_system.open_output_stream(journal["staging"]) as sink:
+            with pq.ParquetWriter(sink, schema, compression=compression) as writer:
+                _write_row_groups(writer, batches(), schema, row_group_size)
+
+        # the complete file stays hidden until the files it replaces are gone
+        self._file_system.move(journal["staging"], journal["ready"])
+        self._finish_compaction(journal_path)
+        return journal["output"]
+
+    def _finish_compaction(self, journal_path: str) -> None:
+        """
+        Complete the compaction recorded in a journal: once the compacted file
+        is completely written the files it replaces are deleted and it is
+        moved into place, otherwise the compaction is abandoned and its
+        partially written file removed.
+        """
+        with self._file_system.open_input_stream(journal_path) as f:
+            journal = json.loads(f.read())
+
+        ready, output = self._file_system.get_file_info(
+            [journal.get("ready", journal["output"]), journal["output"]]
+        )
+        done = fs.FileType.File in (ready.type, output.type)
+        replaced = journal["inputs"] if done else []
+        for info in self._file_system.get_file_info([journal["staging"], *replaced]):
+            if info.type == fs.FileType.File:
+                self._file_system.delete_file(info.path)
+        if ready.type == fs.FileType.File and ready.path != output.path:
+            self._file_system.move(ready.path, output.path)
+
+        self._file_system.delete_file(journal_path)
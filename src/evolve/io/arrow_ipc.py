@@ -0,0 +1,169 @@
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pyarrow import fs, ipc
+
+from .._utils import _try_get_file_system_from_uri
+from ..ir import IR, BaseBackend, LazyIR, get_global_backend
+from ._base import BaseIO
+from ._utils import _limit_batch_size, _peek_schema
+
+_COMPRESSIONS = (None, "lz4", "zstd")
+
+
+class ArrowIpcFile(BaseIO):
+    """
+    Implementation of an arrow ipc (feather v2) file, or a directory of them.
+
+    The ipc file format stores record batches exactly as they are laid out
+    in memory, which makes it the cheapest way to stage data between
+    pipeline steps: nothing is parsed or converted on the way in or out.
+    Local files are read through a memory map, so an uncompressed file is
+    opened instantly whatever its size, its columns point straight into the
+    page cache and only the pages that are touched are read from disk.
+    Compressed files are memory-mapped as well, but their buffers are
+    decompressed into memory when read.
+
+    A uri pointing to a directory is read as a dataset of all the ipc files
+    in it. Setting `max_rows_per_file` writes such a dataset, which is how
+    a stream larger than one file should be staged.
+    """
+
+    def __init__(
+        self,
+        uri: str | Path,
+        *,
+        compression: str | None = None,
+        memory_map: bool = True,
+        backend: BaseBackend | None = None,
+        **options,
+    ) -> None:
+        """
+        Initialize a new `ArrowIpcFile`.
+
+        Parameters
+        ----------
+        uri : str | Path
+            The uniform resource identifier to the file, or to the directory
+            of a multi-file dataset.
+        compression : str | None
+            Compress the written record batches with "lz4" or "zstd". Files
+            are uncompressed by default, so they can be read zero-copy.
+        memory_map : bool
+            Read local files through a memory map instead of into memory.
+        backend : BaseBackend | None
+            The backend to read the data into.
+        **options
+            Used to set up the file system. `max_rows_per_file` writes a
+            multi-file dataset into the directory at `uri`, in files of at
+            most this many rows, and `existing_data_behaviour` tells what to
+            do with the files already there (see `ArrowDataset`).
+
+        """
+        super().__init__(
+            name=self.__class__.__name__,
+            backend=backend or get_global_backend(),
+        )
+
+        if compression not in _COMPRESSIONS:
+            raise ValueError(
+                f"unsupported compression '{compression}', "
+                f"expected one of {list(_COMPRESSIONS)}"
+            )
+
+        file_system, file_path = _try_get_file_system_from_uri(uri, **options)
+        if memory_map and isinstance(file_system, fs.LocalFileSystem):
+            # datasets open their files through the file system
+            file_system = fs.LocalFileSystem(use_mmap=True)
+
+        self._file_system = file_system
+        self._file_path = file_path
+        self._compression = compression
+        self._memory_map = memory_map
+        self._max_rows_per_file = options.get("max_rows_per_file")
+        self._existing_data_behaviour = options.get("existing_data_behaviour", "error")
+
+    def _is_dataset(self) -> bool:
+        info = self._file_system.get_file_info(self._file_path)
+        return info.type == fs.FileType.Directory
+
+    def _dataset(self) -> ds.Dataset:
+        return ds.dataset(
+            self._file_path,
+            format="ipc",
+            filesystem=self._file_system,
+        )
+
+    def read(self) -> IR:
+        """Read the file, or all files of the dataset, to the backend IR."""
+        if self._is_dataset():
+            return self._backend.ir_from_arrow_table(self._dataset().to_table())
+
+        # the buffers of the table keep the memory map open
+        with self._file_system.open_input_file(self._file_path) as source:
+            return self._backend.ir_from_arrow_table(ipc.open_file(source).read_all())
+
+    def read_batches(self, batch_size: int | None = None) -> Iterator[pa.RecordBatch]:
+        """
+        Stream the record batches as they were written, sliced to `batch_size`.
+
+        Batches are read one at a time by their offset in the file footer, so
+        only the pages of the batch being processed are loaded.
+        """
+        if self._is_dataset():
+            dataset = self._dataset()
+            if batch_size is None:
+                yield from dataset.to_batches()
+            else:
+                yield from dataset.to_batches(batch_size=batch_size)
+            return
+
+        with self._file_system.open_input_file(self._file_path) as source:
+            reader = ipc.open_file(source)
+            yield from _limit_batch_size(
+                (reader.get_batch(i) for i in range(reader.num_record_batches)),
+                batch_size,
+            )
+
+    def scan(self) -> LazyIR:
+        """Create a lazy query plan over the file or dataset."""
+        return self._backend.lazy_from_arrow_dataset(self._dataset())
+
+    def write(self, data: IR) -> None:
+        """Write the backend IR data as an ipc file to the target path."""
+        self.write_batches(self._backend.ir_to_arrow_table(data).to_batches())
+
+    def write_batches(self, batches: Iterable[pa.RecordBatch]) -> None:
+        """Write a stream of record batches to the file, or to the dataset."""
+        schema, batches = _peek_schema(batches)
+        if schema is None:
+            return
+
+        if self._max_rows_per_file is not None:
+            file_format = ds.IpcFileFormat()
+            ds.write_dataset(
+                data=batches,
+                base_dir=self._file_path,
+                schema=schema,
+                format=file_format,
+                file_options=file_format.make_write_options(
+                    compression=self._compression
+                ),
+                basename_template="part-{i}.arrow",
+                max_rows_per_file=self._max_rows_per_file,
+                max_rows_per_group=min(self._max_rows_per_file, 1024 * 1024),
+                existing_data_behavior=self._existing_data_behaviour,
+                filesystem=self._file_system,
+            )
+            return
+
+        with self._file_system.open_output_stream(self._file_path) as sink:
+            with ipc.new_file(
+                sink,
+                schema,
+                options=ipc.IpcWriteOptions(compression=self._compression),
+            ) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
@@ -1,7 +1,8 @@
 from pathlib import Path
 
 from .._utils import _try_get_file_system_from_uri
-from ..ir import BytesBackend, IR, get_global_backend, BaseBackend
+from ..cache import SourceCache
+from ..ir import IR, BaseBackend, BytesBackend, get_global_backend
 from ._base import BaseIO
 
 
@@ -13,8 +14,15 @@ class Bytes(BaseIO):
         uri: str | Path,
         *,
         backend: BaseBackend | None = BytesBackend(),
+        cache: SourceCache | None = None,
         **options,
     ) -> None:
+        """
+        Initialize a new `Bytes` I/O object.
+
+        Reads go through `cache` if one is given, so a file read again is
+        memory-mapped from the local cache instead of downloaded.
+        """
         super().__init__(
             name=self.__class__.__name__,
             backend=backend or get_global_backend(),
@@ -24,11 +32,16 @@ class Bytes(BaseIO):
 
         self._file_system = file_system
         self._file_path = file_path
+        self._cache = cache
 
     def read(self) -> IR:
         """Read the bytes from the source path."""
-        with self._file_system.open_input_file(self._file_path) as source:
-            return self._backend.ir_from_bytes(source.read())
+        if self._cache is not None:
+            source = self._cache.open_input_file(self._file_system, self._file_path)
+        else:
+            source = self._file_system.open_input_file(self._file_path)
+        with source:
+            return self._backend.ir_from_bytes(source.read_buffer())
 
     def write(self, data: IR) -> None:
         """Write the data as bytes to the target path."""
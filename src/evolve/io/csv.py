@@ -1,14 +1,21 @@
-from pyarrow import csv
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import duckdb
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pyarrow import csv, fs
 
-from ._base import BaseIO
 from .._utils import _try_get_file_system_from_uri
+from ..cache import SourceCache
 from ..ir import (
     IR,
     BaseBackend,
+    LazyIR,
     get_global_backend,
 )
-
-from pathlib import Path
+from ._base import BaseIO
+from ._utils import _limit_batch_size, _peek_schema
 
 
 class CsvFile(BaseIO):
@@ -19,9 +26,15 @@ class CsvFile(BaseIO):
         uri: str | Path,
         *,
         backend: BaseBackend | None = None,
+        cache: SourceCache | None = None,
         **options,
     ) -> None:
-        """Initialize a new `CsvFile` with the provided options."""
+        """
+        Initialize a new `CsvFile` with the provided options.
+
+        Reads go through `cache` if one is given, so a file read again is
+        memory-mapped from the local cache instead of downloaded and parsed.
+        """
         super().__init__(
             name=self.__class__.__name__, backend=backend or get_global_backend()
         )
@@ -37,24 +50,114 @@ class CsvFile(BaseIO):
         self._parse_options = options.get("parse_options")
         self._convert_options = options.get("convert_options")
         self._write_options = options.get("write_options")
+        self._cache = cache
 
     def read(self) -> IR:
         """Read the file from the source path to the configured backend IR."""
+        if self._cache is not None:
+            return self._backend.ir_from_arrow_table(self._read_cached())
+
         with self._file_system.open_input_file(self._file_path) as source:
-            return self._backend.ir_from_arrow_table(
-                csv.read_csv(
-                    input_file=source,
-                    read_options=self._read_options,
-                    parse_options=self._parse_options,
-                    convert_options=self._convert_options,
-                )
-            )
+            return self._backend.ir_from_arrow_table(self._decode(source))
+
+    def _decode(self, source: pa.NativeFile) -> pa.Table:
+        return csv.read_csv(
+            input_file=source,
+            read_options=self._read_options,
+            parse_options=self._parse_options,
+            convert_options=self._convert_options,
+        )
+
+    def _read_cached(self) -> pa.Table:
+        return self._cache.read_table(
+            self._file_system,
+            self._file_path,
+            self._decode,
+            options=(self._read_options, self._parse_options, self._convert_options),
+        )
 
     def write(self, data: IR) -> None:
-        """Write the backend IR data as a csv to the target path."""
+        """
+        Write the backend IR data as a csv to the target path.
+
+        A duckdb relation written to a local file is copied straight from
+        duckdb with its multithreaded csv writer, unless the write options ask
+        for a quoting style other than the default.
+        """
+        write_options = self._write_options or csv.WriteOptions()
+        if (
+            isinstance(data, duckdb.DuckDBPyRelation)
+            and isinstance(self._file_system, fs.LocalFileSystem)
+            and write_options.quoting_style == "needed"
+        ):
+            data.write_csv(
+                self._file_path,
+                sep=write_options.delimiter,
+                header=write_options.include_header,
+            )
+            return
+
         with self._file_system.open_output_stream(self._file_path) as sink:
             csv.write_csv(
                 data=self._backend.ir_to_arrow_table(data),
                 output_file=sink,
                 write_options=self._write_options,
             )
+
+    def scan(self) -> LazyIR:
+        """
+        Create a lazy query plan over the csv file.
+
+        The file is scanned as an arrow dataset with the same parse options as
+        `read`, so the plan infers the same types, and selected columns are the
+        only ones converted.
+        """
+        file_format = ds.CsvFileFormat(
+            parse_options=self._parse_options,
+            read_options=self._read_options,
+            convert_options=self._convert_options,
+        )
+        return self._backend.lazy_from_arrow_dataset(
+            ds.dataset(
+                self._file_path,
+                format=file_format,
+                filesystem=self._file_system,
+            )
+        )
+
+    def read_batches(self, batch_size: int | None = None) -> Iterator[pa.RecordBatch]:
+        """
+        Stream the csv file as record batches without reading it all at once.
+
+        The file is parsed incrementally with `pyarrow.csv.open_csv`, one block
+        of `read_options.block_size` bytes at a time, and blocks holding more
+        than `batch_size` rows are sliced up further. Cached files are read
+        whole from the cache, which is memory-mapped, and sliced up.
+        """
+        if self._cache is not None:
+            yield from _limit_batch_size(self._read_cached().to_batches(), batch_size)
+            return
+
+        with self._file_system.open_input_stream(self._file_path) as source:
+            reader = csv.open_csv(
+                input_file=source,
+                read_options=self._read_options,
+                parse_options=self._parse_options,
+                convert_options=self._convert_options,
+            )
+            yield from _limit_batch_size(reader, batch_size)
+
+    def write_batches(self, batches: Iterable[pa.RecordBatch]) -> None:
+        """Write a stream of record batches as a csv to the target path."""
+        schema, batches = _peek_schema(batches)
+        if schema is None:
+            return
+
+        with self._file_system.open_output_stream(self._file_path) as sink:
+            with csv.CSVWriter(
+                sink=sink,
+                schema=schema,
+                write_options=self._write_options,
+            ) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
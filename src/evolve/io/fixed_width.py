@@ -47,17 +47,274 @@ pandas does io -> csv, fwf, json, ...
 """
 
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Iterable, Iterator, Tuple
 
-import polars as pl
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import fs
 
+from .._utils import _try_get_file_system_from_uri
 from ..ir import IR, BaseBackend, get_global_backend
 from ._base import BaseIO
-from ._utils import _try_get_file_system_from_uri
+
+_DEFAULT_CHUNK_ROWS = 65_536
+
+# Number of bytes read to find the length of the first record.
+_PROBE_SIZE = 64 * 1024
+
+_UTF8_ENCODINGS = ("utf-8", "utf8", "ascii")
+
+
+def _open_records(file_system: fs.FileSystem, file_path: str) -> pa.NativeFile:
+    """Memory-map local files, and open remote files for random access."""
+    if isinstance(file_system, fs.LocalFileSystem):
+        return pa.memory_map(file_path, "r")
+    return file_system.open_input_file(file_path)
+
+
+def _iter_lines(
+    source: pa.NativeFile,
+    position: int,
+    chunk_bytes: int,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Read the newline terminated lines of an open file in chunks of whole lines.
+
+    Lines may differ in length. Every chunk ends at a line boundary, the next
+    read starts right after it, so no bytes are ever carried over between
+    chunks.
+
+    Yields
+    ------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        The uint8 bytes of the chunk, and the start offset and the length
+        (without newline characters) of every line in it.
+
+    """
+    size = source.size()
+    while position < size:
+        n_bytes = min(chunk_bytes, size - position)
+        source.seek(position)
+        data = np.frombuffer(source.read_buffer(n_bytes), dtype=np.uint8)
+        ends = np.flatnonzero(data == ord("\n"))
+
+        if position + n_bytes == size:
+            if not len(ends) or ends[-1] != n_bytes - 1:
+                # last line without a trailing newline
+                ends = np.append(ends, n_bytes)
+        elif not len(ends):
+            # a single line longer than the chunk, read a larger chunk
+            chunk_bytes *= 2
+            continue
+        else:
+            data = data[: ends[-1] + 1]
+
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        lengths = ends - starts
+        has_cr = (lengths > 0) & (data[np.maximum(ends - 1, 0)] == ord("\r"))
+        lengths[has_cr] -= 1
+
+        yield data, starts, lengths
+        position += len(data)
+
+
+def _iter_line_chunks(
+    file_system: fs.FileSystem,
+    file_path: str,
+    chunk_bytes: int,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Read a file of newline terminated lines in chunks, see `_iter_lines`."""
+    with _open_records(file_system, file_path) as source:
+        yield from _iter_lines(source, 0, chunk_bytes)
+
+
+def _gather(
+    data: np.ndarray,
+    starts: np.ndarray,
+    lengths: np.ndarray,
+    offset: int,
+    width: int,
+    pad_byte: int,
+) -> np.ndarray:
+    """
+    Gather `width` bytes at `offset` of every line into a `(n_lines, width)` array.
+
+    Bytes past the end of a line are filled with `pad_byte`.
+
+    The lines are picked out of a sliding window view of `data`, indexed by
+    their start offset alone, so besides the `n_lines * width` bytes of the
+    result only one int64 index per line is allocated, plus a mask for the
+    lines shorter than `offset + width`.
+    """
+    positions = starts + offset
+    # lines whose window runs past the end of the chunk are copied one by
+    # one, there are at most `offset + width` of them
+    fits = positions <= len(data) - width
+    if width and fits.all():
+        result = np.lib.stride_tricks.sliding_window_view(data, width)[positions]
+    else:
+        result = np.full((len(starts), width), pad_byte, dtype=np.uint8)
+        if width and fits.any():
+            windows = np.lib.stride_tricks.sliding_window_view(data, width)
+            result[fits] = windows[positions[fits]]
+        for i in np.flatnonzero(~fits):
+            line = data[positions[i] : starts[i] + lengths[i]][:width]
+            result[i, : len(line)] = line
+
+    # the windows of short lines run into the next lines
+    short = np.flatnonzero(fits & (lengths < offset + width))
+    if len(short):
+        inside = np.arange(width)[None, :] < (lengths[short] - offset)[:, None]
+        result[short] = np.where(inside, result[short], pad_byte)
+    return result
+
+
+def _iter_record_chunks(
+    file_system: fs.FileSystem,
+    file_path: str,
+    chunk_rows: int,
+    record_length: int,
+    pad_byte: int = ord(" "),
+) -> Iterator[np.ndarray]:
+    """
+    Read a file of newline terminated fixed length records in row chunks.
+
+    As long as every record is as long as the first one, and holds all
+    `record_length` bytes, the records are viewed in place. From the first
+    chunk with records of another length on, e.g. records with their
+    trailing blanks trimmed, the chunks are split on newlines and every
+    record is cut or padded with `pad_byte` to `record_length` bytes.
+
+    Parameters
+    ----------
+    record_length : int
+        The number of bytes every record holds fields in, records of ragged
+        files are padded or cut to this length.
+
+    Yields
+    ------
+    np.ndarray
+        A `(n_rows, n_bytes)` uint8 array of the next chunk of records,
+        without the newline characters. Local files are memory-mapped, so the
+        records of files with equally long records point straight into the
+        page cache without any copy.
+
+    """
+    with _open_records(file_system, file_path) as source:
+        size = source.size()
+        if size == 0:
+            return
+
+        probe = source.read_at(min(_PROBE_SIZE, size), 0)
+        newline_at = probe.find(b"\n")
+        if newline_at == -1:
+            if size > len(probe):
+                raise ValueError(
+                    f"no newline found in the first {_PROBE_SIZE} bytes of "
+                    f"'{file_path}', is it a fixed width file?"
+                )
+            newline = b""
+            first_length = size
+        else:
+            newline = b"\r\n" if probe[:newline_at].endswith(b"\r") else b"\n"
+            first_length = newline_at + 1 - len(newline)
+
+        line_length = first_length + len(newline)
+        chunk_bytes = chunk_rows * line_length
+        position = 0
+        if first_length >= record_length and size % line_length in (0, first_length):
+            while position < size:
+                source.seek(position)
+                buffer = source.read_buffer(min(chunk_bytes, size - position))
+                if buffer.size % line_length:
+                    # last record without a trailing newline
+                    buffer = pa.py_buffer(buffer.to_pybytes() + newline)
+
+                lines = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, line_length)
+                if newline and not (lines[:, -1] == ord("\n")).all():
+                    break
+                yield lines[:, :first_length]
+                position += buffer.size
+
+        for data, starts, lengths in _iter_lines(source, position, chunk_bytes):
+            records = _gather(data, starts, lengths, 0, record_length, pad_byte)
+            for offset in range(0, len(records), chunk_rows):
+                yield records[offset : offset + chunk_rows]
+
+
+def _decode_field(
+    field: np.ndarray,
+    encoding: str,
+    pad_char: str | None,
+) -> pa.Array:
+    """
+    Decode a `(n_rows, width)` uint8 array of field bytes to a string array.
+
+    The bytes are handed to arrow as a fixed size binary array, which is
+    decoded and stripped with arrow compute kernels without any per-row python
+    work. Encodings other than utf-8 are decoded with numpy.
+    """
+    n_rows, width = field.shape
+    field = np.ascontiguousarray(field)
+    if encoding.lower() in _UTF8_ENCODINGS:
+        values = pa.FixedSizeBinaryArray.from_buffers(
+            pa.binary(width),
+            n_rows,
+            [None, pa.py_buffer(field)],
+        )
+        values = values.cast(pa.binary()).cast(pa.string())
+    else:
+        values = pa.array(np.char.decode(field.view(f"S{width}").ravel(), encoding))
+
+    if pad_char is None:
+        return pc.utf8_trim_whitespace(values)
+    return pc.utf8_trim(values, characters=pad_char)
+
+
+def _slice_field(
+    records: np.ndarray,
+    start: int,
+    width: int,
+    encoding: str,
+    pad_char: str | None,
+) -> pa.Array:
+    """Cut one field out of every record in a chunk by its byte offset."""
+    if start + width > records.shape[1]:
+        raise ValueError(
+            f"field at offset {start} with width {width} does not fit in the "
+            f"record length {records.shape[1]}"
+        )
+
+    return _decode_field(records[:, start : start + width], encoding, pad_char)
+
+
+def _slice_fields(
+    records: np.ndarray,
+    colspecs: Iterable[Tuple[int, int]],
+    colnames: Iterable[str],
+    encoding: str,
+    offset: int = 0,
+    pad_char: str | None = None,
+) -> pa.RecordBatch:
+    """Cut every field out of a chunk of records into a record batch."""
+    return pa.RecordBatch.from_arrays(
+        [
+            _slice_field(records, start + offset, width, encoding, pad_char)
+            for start, width in colspecs
+        ],
+        names=list(colnames),
+    )
 
 
 class FixedWidthFile(BaseIO):
-    """Implementation of a fixed width file (fwf)."""
+    """
+    Implementation of a fixed width file (fwf).
+
+    Fields are cut by their byte offsets in fixed size chunks of rows, so
+    delimiter or quote characters inside a record are just data, and memory
+    stays bounded by the chunk size however large the file is.
+    """
 
     def __init__(
         self,
@@ -66,38 +323,61 @@ class FixedWidthFile(BaseIO):
         colnames: Iterable[str],
         encoding: str = "utf-8",
         backend: BaseBackend | None = None,
+        **options,
     ) -> None:
-        """Initialize the `FixedWidthFile`."""
+        """
+        Initialize the `FixedWidthFile`.
+
+        Parameters
+        ----------
+        uri : str | Path
+            The uniform resource identifier to the file/object.
+        colspecs : Iterable[Tuple[int, int]]
+            The `(offset, width)` in bytes of each field in a record.
+        colnames : Iterable[str]
+            The name of each field.
+        encoding : str
+            The encoding of the file.
+        backend : BaseBackend | None
+            The backend to read the data into.
+        **options
+            Used to set up the file system, and `chunk_rows` sets the number
+            of records parsed at a time (default 65536).
+
+        """
         super().__init__(
             name=self.__class__.__name__,
             backend=backend or get_global_backend(),
         )
 
-        file_system, file_path = _try_get_file_system_from_uri(uri=uri)
+        file_system, file_path = _try_get_file_system_from_uri(uri=uri, **options)
         self._file_system = file_system
         self._file_path = file_path
-        self._colspecs = colspecs
-        self._colnames = colnames
+        self._colspecs = list(colspecs)
+        self._colnames = list(colnames)
         self._encoding = encoding
+        self._chunk_rows = options.get("chunk_rows", _DEFAULT_CHUNK_ROWS)
 
     def read(self) -> IR:
         """Read the fixed width file."""
-        with self._file_system.open_input_file(self._file_path) as source:
-            df = pl.read_csv(
-                source=source,
-                has_header=False,
-                skip_rows=0,
-                new_columns=["full_str"],
-            )
+        schema = pa.schema([(name, pa.string()) for name in self._colnames])
+        table = pa.Table.from_batches(self.read_batches(), schema=schema)
+        return self._backend.ir_from_arrow_table(table)
 
-        df = df.with_columns(
-            [
-                pl.col("full_str").str.slice(st[0], st[1]).str.strip_chars().alias(col)
-                for st, col in zip(self._colspecs, self._colnames, strict=True)
-            ]
-        ).drop("full_str")
-
-        return self._backend.ir_from_polars(df)
+    def read_batches(self, batch_size: int | None = None) -> Iterator[pa.RecordBatch]:
+        """Stream the fixed width file in record batches of `batch_size` rows."""
+        for records in _iter_record_chunks(
+            self._file_system,
+            self._file_path,
+            batch_size or self._chunk_rows,
+            max(start + width for start, width in self._colspecs),
+        ):
+            yield _slice_fields(
+                records,
+                self._colspecs,
+                self._colnames,
+                self._encoding,
+            )
 
     def write(self, data: IR) -> None:
         pass
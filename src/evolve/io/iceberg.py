@@ -1,35 +1,168 @@
-import pyiceberg.catalog as ibc
+import collections
+import concurrent.futures
+import os
+import re
+from typing import Iterable, Iterator
 
 import duckdb
 import polars as pl
 import pyarrow as pa
-import pyarrow.parquet as pq
+import pyiceberg.catalog as ibc
+from pyiceberg.expressions import (
+    AlwaysTrue,
+    And,
+    BooleanExpression,
+    EqualTo,
+    IsNull,
+    Or,
+    Reference,
+)
+from pyiceberg.io.pyarrow import ArrowScan, schema_to_pyarrow
+from pyiceberg.table import DataScan, FileScanTask, Table, TableProperties
+from pyiceberg.transforms import IdentityTransform
+from pyiceberg.typedef import Record
+from pyiceberg.utils.properties import property_as_int
 
-from ..ir import BaseBackend, get_global_backend, IR
+from ..ir import IR, BaseBackend, get_global_backend
 from ._base import BaseIO
+from ._utils import _peek_schema
+
+
+def _scan_batches(
+    scan: DataScan,
+    max_workers: int | None = None,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Read the files planned by an iceberg scan concurrently.
+
+    Every data file is read on a thread pool through the file io of the table,
+    which applies its delete files, the row filter and the projection of the
+    scan. At most twice `max_workers` files are read ahead, and the batches
+    are yielded in the order the files were planned.
+
+    Parameters
+    ----------
+    scan : DataScan
+        The scan to read, its manifests and partitions are pruned by its row
+        filter when the files are planned.
+    max_workers : int | None
+        The number of files read at the same time, defaults to the number of
+        cpus.
+
+    Yields
+    ------
+    pa.RecordBatch
+        The next record batch, with the projected schema of the scan.
+
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    arrow_scan = ArrowScan(
+        scan.table_metadata,
+        scan.io,
+        scan.projection(),
+        scan.row_filter,
+        scan.case_sensitive,
+    )
+
+    def read(task: FileScanTask) -> list[pa.RecordBatch]:
+        return list(arrow_scan.to_record_batches([task]))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        pending = collections.deque()
+        try:
+            for task in scan.plan_files():
+                pending.append(executor.submit(read, task))
+                if len(pending) >= 2 * max_workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _to_table(scan: DataScan, batches: Iterable[pa.RecordBatch]) -> pa.Table:
+    """Collect the batches of a scan, keeping its schema if there are none."""
+    batches = list(batches)
+    if batches:
+        return pa.Table.from_batches(batches)
+    return schema_to_pyarrow(scan.projection()).empty_table()
+
+
+def _partition_predicate(
+    table: Table,
+    partitions: Iterable[Record],
+) -> BooleanExpression:
+    """Build a filter matching the rows of any of the identity partitions."""
+    schema = table.metadata.schema()
+    names = [
+        schema.find_field(field.source_id).name
+        for field in table.metadata.spec().fields
+    ]
+
+    def matches(partition: Record) -> BooleanExpression:
+        predicates = [
+            IsNull(Reference(name))
+            if partition[i] is None
+            else EqualTo(Reference(name), partition[i])
+            for i, name in enumerate(names)
+        ]
+        return And(*predicates) if len(predicates) > 1 else predicates[0]
+
+    predicates = [matches(partition) for partition in partitions]
+    return Or(*predicates) if len(predicates) > 1 else predicates[0]
+
+
+_TYPE_FAMILIES = (
+    ("integer", pa.types.is_integer),
+    ("floating", pa.types.is_floating),
+    ("string", lambda t: pa.types.is_string(t) or pa.types.is_large_string(t)),
+    ("binary", lambda t: pa.types.is_binary(t) or pa.types.is_large_binary(t)),
+    ("list", lambda t: pa.types.is_list(t) or pa.types.is_large_list(t)),
+)
+
+
+def _type_family(data_type: pa.DataType) -> str:
+    """Group the arrow types that iceberg stores as the same (or promoted) type."""
+    for family, matches in _TYPE_FAMILIES:
+        if matches(data_type):
+            return family
+    # other types by their name without parameters, e.g. timestamps of any
+    # unit, whose conversion is up to the writer
+    return re.split(r"[\[<(]", str(data_type))[0]
+
+
+def _check_schema(table: Table, schema: pa.Schema) -> None:
+    """
+    Check that batches of `schema` can be written to the table.
+
+    Runs before anything is written, so a mismatch leaves no orphaned data
+    files behind.
+    """
+    name = ".".join(table.name())
+    expected = schema_to_pyarrow(table.schema(), include_field_ids=False)
+    for field in schema:
+        if field.name not in expected.names:
+            raise ValueError(f"column '{field.name}' is not in the schema of {name}")
+        expected_type = expected.field(field.name).type
+        if _type_family(field.type) != _type_family(expected_type):
+            raise ValueError(
+                f"column '{field.name}' of type {field.type} cannot be written "
+                f"as {expected_type} to {name}"
+            )
+    missing = [
+        field.name
+        for field in table.schema().fields
+        if field.required and field.name not in schema.names
+    ]
+    if missing:
+        raise ValueError(f"required columns {missing} are missing for {name}")
+
+
+def read_iceberg_with_pyarrow(catalog: ibc.Catalog, table_name: str) -> pa.Table:
+    scan = catalog.load_table(table_name).scan()
+    return _to_table(scan, _scan_batches(scan))
 
-def read_iceberg_with_pyarrow(catalog: ibc.Catalog, table_name: str) -> pl.DataFrame:
-    table = catalog.load_table(table_name)
-    scan = table.scan()
-    tasks = scan.plan_files()
-    tables = []
-    for task in tasks:
-        file_path = task.file.file_path
-        partition = task.file.partition
-        data_table = pq.read_table(file_path)
-
-        if partition:
-            partition_arrays = {
-                key: pa.array([value] * len(data_table))
-                for key, value in partition.items()
-            }
-            partition_table = pa.table(partition_arrays)
-            enriched_table = pa.concat_tables([data_table, partition_table],
-                                              promote=True,)
-        else:
-            enriched_table = data_table
-        tables.append(enriched_table)
-    return pa.concat_tables(table, promote=True)
 
 def read_iceberg_with_polars(catalog: ibc.Catalog, table_name: str) -> pl.DataFrame:
     table = catalog.load_table(table_name)
@@ -59,10 +192,58 @@ class IcebergTable(BaseIO):
         namespace: str,
         catalog_name: str,
         *,
+        row_filter: str | BooleanExpression = AlwaysTrue(),
+        selected_fields: tuple[str, ...] = ("*",),
+        snapshot_id: int | None = None,
+        max_workers: int | None = None,
+        mode: str = "append",
+        overwrite_filter: str | BooleanExpression = AlwaysTrue(),
+        commit_rows: int | None = None,
         backend: BaseBackend | None = None,
         **options,
     ) -> None:
-        """Initialize the `IcebergTable`."""
+        """
+        Initialize the `IcebergTable`.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table.
+        namespace : str
+            The namespace of the table.
+        catalog_name : str
+            The name of the catalog, loaded with `options` as its properties.
+        row_filter : str | BooleanExpression
+            Only read rows matching the filter, e.g. `"day >= '2024-01-01'"`.
+            It is used to skip manifests and data files whose partition
+            values or column statistics cannot match, before any data is read.
+        selected_fields : tuple[str, ...]
+            The columns to read, all by default.
+        snapshot_id : int | None
+            The snapshot to read, defaults to the current one.
+        max_workers : int | None
+            The number of data files read at the same time, and written per
+            buffer, defaults to the number of cpus.
+        mode : str
+            How a write changes the table: "append" adds the rows,
+            "overwrite" replaces the rows matching `overwrite_filter` and
+            "dynamic" replaces every partition the written rows fall into
+            (identity partitioned tables only).
+        overwrite_filter : str | BooleanExpression
+            The rows replaced by an "overwrite", all by default.
+        commit_rows : int | None
+            Commit a snapshot whenever this many rows have been written, so
+            long streams become visible in steps. By default a write commits
+            all its data files as a single snapshot at the end.
+
+        Writes check the schema of the first batch against the table before
+        writing anything. They buffer record batches up to `max_workers`
+        times the `write.target-file-size-bytes` of the table, and append
+        every full buffer to a transaction, which pyiceberg writes as data
+        files concurrently. Only the commits change the table, a write
+        failing midway leaves orphaned data files but no partial snapshot.
+
+        """
         super().__init__(
             name=self.__class__.__name__,
             backend=backend or get_global_backend(),
@@ -74,15 +255,125 @@ class IcebergTable(BaseIO):
         self._table = table
         self._namespace = namespace
         self._catalog = catalog
+        self._row_filter = row_filter
+        self._selected_fields = selected_fields
+        self._snapshot_id = snapshot_id
+        self._max_workers = max_workers
+
+        if mode not in ("append", "overwrite", "dynamic"):
+            raise ValueError(f"unsupported write mode: {mode}")
+        self._mode = mode
+        self._overwrite_filter = overwrite_filter
+        self._commit_rows = commit_rows
+
+    def _scan(self) -> DataScan:
+        """Plan a scan of the table with the configured filter and columns."""
+        return self._catalog.load_table(self._fqn).scan(
+            row_filter=self._row_filter,
+            selected_fields=self._selected_fields,
+            snapshot_id=self._snapshot_id,
+        )
 
     def read(self) -> IR:
-        """
-        load_table()
-            schema: column names, types, nullability
-            partition spec: how the table is partitioned
-            snapshots: versions of the table over time
-            manifests: lists of data files and their metadata
-            file paths: location of parquet/ORC files
-            scan planner: lets you plan which files to read based on filters
-        """
-        return self._backend.
+        scan = self._scan()
+        return self._backend.ir_from_arrow_table(
+            _to_table(scan, _scan_batches(scan, self._max_workers))
+        )
+
+    def read_batches(self, batch_size: int | None = None) -> Iterator[pa.RecordBatch]:
+        """Stream the data files matching the scan, read concurrently."""
+        for batch in _scan_batches(self._scan(), self._max_workers):
+            if batch_size is None:
+                yield batch
+            else:
+                yield from pa.Table.from_batches([batch]).to_batches(batch_size)
+
+    def write(self, data: IR) -> None:
+        self.write_batches(self._backend.ir_to_arrow_table(data).to_batches())
+
+    def write_batches(self, batches: Iterable[pa.RecordBatch]) -> None:
+        """Write buffered batches through transactions, as few as `commit_rows`."""
+        schema, batches = _peek_schema(batches)
+        if schema is None and self._mode != "overwrite":
+            return
+
+        table = self._catalog.load_table(self._fqn)
+        if schema is not None:
+            _check_schema(table, schema)
+
+        names = []
+        if self._mode == "dynamic":
+            spec = table.metadata.spec()
+            if spec.is_unpartitioned() or not all(
+                isinstance(field.transform, IdentityTransform) for field in spec.fields
+            ):
+                raise ValueError(
+                    "dynamic overwrites need a table with identity partitions only"
+                )
+            table_schema = table.metadata.schema()
+            names = [table_schema.find_field(f.source_id).name for f in spec.fields]
+
+        target_file_size = property_as_int(
+            table.metadata.properties,
+            TableProperties.WRITE_TARGET_FILE_SIZE_BYTES,
+            TableProperties.WRITE_TARGET_FILE_SIZE_BYTES_DEFAULT,
+        )
+        # enough data for every worker of pyiceberg to write a file
+        buffer_bytes = target_file_size * (self._max_workers or os.cpu_count() or 1)
+
+        replaced = set()
+        first_commit = True
+        tx = None
+
+        def append(buffered: list[pa.RecordBatch]) -> None:
+            nonlocal tx, first_commit
+            if tx is None:
+                tx = table.transaction()
+                if self._mode == "overwrite" and first_commit:
+                    tx.delete(self._overwrite_filter)
+                first_commit = False
+            if not buffered:
+                return
+
+            data = pa.Table.from_batches(buffered, schema=schema)
+            if self._mode == "dynamic":
+                # partitions written by an earlier buffer of this write
+                # already hold only new data
+                partitions = {
+                    tuple(row.values())
+                    for row in data.group_by(names).aggregate([]).to_pylist()
+                } - replaced
+                if partitions:
+                    tx.delete(_partition_predicate(table, partitions))
+                    replaced.update(partitions)
+            tx.append(data)
+
+        def commit() -> None:
+            nonlocal tx
+            if tx is not None:
+                tx.commit_transaction()
+                tx = None
+
+        buffered, n_bytes, uncommitted_rows = [], 0, 0
+        for batch in batches:
+            if batch.schema != schema:
+                raise ValueError(
+                    f"batch schema differs from the first batch written to "
+                    f"{self._fqn}:\n{batch.schema}"
+                )
+            if len(batch) == 0:
+                continue
+            buffered.append(batch)
+            n_bytes += batch.nbytes
+            uncommitted_rows += len(batch)
+            commit_due = self._commit_rows and uncommitted_rows >= self._commit_rows
+            if n_bytes >= buffer_bytes or commit_due:
+                append(buffered)
+                buffered, n_bytes = [], 0
+            if commit_due:
+                commit()
+                uncommitted_rows = 0
+
+        if buffered or (self._mode == "overwrite" and first_commit):
+            append(buffered)
+        commit()
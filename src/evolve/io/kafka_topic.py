@@ -1,8 +1,244 @@
-from confluent_kafka import Consumer, Producer, TopicPartition
+import concurrent.futures
+import io
+import queue
+import threading
+import time
+from typing import Any, Iterable, Iterator, Sequence
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
+from confluent_kafka import (
+    Consumer,
+    KafkaError,
+    KafkaException,
+    Message,
+    Producer,
+    TopicPartition,
+)
+from pyarrow import ipc
 
 from ..ir import IR, BaseBackend, get_global_backend
+from ..state import JsonStateStore
 from ._base import BaseIO
 
+_METADATA_FIELDS = [
+    pa.field("kafka_key", pa.binary()),
+    pa.field("kafka_partition", pa.int32()),
+    pa.field("kafka_offset", pa.int64()),
+    pa.field("kafka_timestamp", pa.timestamp("ms", tz="UTC")),
+]
+
+# the librdkafka timestamp type of messages without a timestamp
+_NO_TIMESTAMP = 0
+
+# the number of produced messages between two polls for delivery reports
+_POLL_INTERVAL = 1_000
+
+
+def _metadata_arrays(messages: Sequence[Message]) -> list[pa.Array]:
+    """Get the key, partition, offset and timestamp columns of the messages."""
+    timestamps = []
+    for msg in messages:
+        kind, value = msg.timestamp()
+        timestamps.append(None if kind == _NO_TIMESTAMP else value)
+
+    return [
+        pa.array([msg.key() for msg in messages], type=pa.binary()),
+        pa.array([msg.partition() for msg in messages], type=pa.int32()),
+        pa.array([msg.offset() for msg in messages], type=pa.int64()),
+        pa.array(timestamps, type=pa.int64()).cast(pa.timestamp("ms", tz="UTC")),
+    ]
+
+
+def _decode_json(values: list[bytes | None], schema: pa.Schema | None) -> pa.Table:
+    """Parse json object values into a table, one row per value."""
+    # tombstones (null values) become rows with only nulls
+    payload = b"\n".join(b"{}" if value is None else value for value in values)
+    parse_options = pa_json.ParseOptions(
+        explicit_schema=schema,
+        newlines_in_values=True,
+        unexpected_field_behavior="ignore" if schema is not None else "infer",
+    )
+    return pa_json.read_json(io.BytesIO(payload), parse_options=parse_options)
+
+
+def _decode_arrow(values: list[bytes | None]) -> tuple[pa.Table, np.ndarray]:
+    """
+    Read arrow ipc stream values into one table.
+
+    Returns the table and, per row, the index of the value it was read from.
+    """
+    tables = []
+    counts = []
+    for value in values:
+        table = ipc.open_stream(value).read_all() if value else None
+        if table is not None:
+            tables.append(table)
+        counts.append(0 if table is None else table.num_rows)
+
+    table = pa.concat_tables(tables) if tables else pa.table({})
+    return table, np.repeat(np.arange(len(values)), counts)
+
+
+def _import_fastavro():
+    try:
+        import fastavro
+    except ImportError as e:
+        raise ImportError("avro values require the `fastavro` package") from e
+    return fastavro
+
+
+def _decode_avro(
+    values: list[bytes | None],
+    avro_schema: dict[str, Any],
+    schema: pa.Schema | None,
+) -> pa.Table:
+    """Parse schemaless avro record values into a table, one row per value."""
+    fastavro = _import_fastavro()
+    parsed = fastavro.parse_schema(avro_schema)
+    records = [
+        {}
+        if value is None
+        else fastavro.schemaless_reader(io.BytesIO(value), parsed, parsed)
+        for value in values
+    ]
+    return pa.Table.from_pylist(records, schema=schema)
+
+
+def _to_record_batch(
+    messages: Sequence[Message],
+    value_format: str,
+    schema: pa.Schema | None = None,
+    avro_schema: dict[str, Any] | None = None,
+) -> pa.RecordBatch:
+    """
+    Decode kafka messages into an arrow record batch.
+
+    Parameters
+    ----------
+    messages : Sequence[Message]
+        The messages to decode, without errors.
+    value_format : str
+        How to decode the values: "raw" keeps them as a binary `value`
+        column, "json" and "avro" turn the fields of every value into columns
+        and "arrow" reads every value as an ipc stream of any number of rows.
+    schema : pa.Schema | None
+        The arrow schema of the value columns of json and avro values,
+        inferred if not given.
+    avro_schema : dict[str, Any] | None
+        The writer schema of avro values.
+
+    Returns
+    -------
+    pa.RecordBatch
+        The value columns followed by the `kafka_key`, `kafka_partition`,
+        `kafka_offset` and `kafka_timestamp` columns.
+
+    """
+    values = [msg.value() for msg in messages]
+    rows = None
+    if value_format == "raw":
+        table = pa.table({"value": pa.array(values, type=pa.binary())})
+    elif value_format == "json":
+        table = _decode_json(values, schema)
+    elif value_format == "avro":
+        table = _decode_avro(values, avro_schema, schema)
+    elif value_format == "arrow":
+        table, rows = _decode_arrow(values)
+    else:
+        raise ValueError(f"unsupported value format: {value_format}")
+
+    for field, array in zip(_METADATA_FIELDS, _metadata_arrays(messages)):
+        table = table.append_column(field, array if rows is None else array.take(rows))
+    return pa.RecordBatch.from_struct_array(
+        table.combine_chunks().to_struct_array().combine_chunks()
+    )
+
+
+def _encode(
+    batch: pa.RecordBatch,
+    value_format: str,
+    key_column: str | None = None,
+    avro_schema: dict[str, Any] | None = None,
+    rows_per_message: int = 10_000,
+) -> tuple[list[bytes | None], list[bytes | None]]:
+    """
+    Encode a record batch into kafka message keys and values.
+
+    Parameters
+    ----------
+    batch : pa.RecordBatch
+        The rows to encode. The `kafka_*` metadata columns added by a read
+        are left out of the values.
+    value_format : str
+        How to encode the values: "raw" sends the binary or string `value`
+        column as is, "json" and "avro" encode every row as one message and
+        "arrow" packs up to `rows_per_message` rows into an ipc stream.
+    key_column : str | None
+        The column whose values, as strings, become the message keys.
+        Arrow messages only group rows with the same key. Without one,
+        messages have no key.
+    avro_schema : dict[str, Any] | None
+        The writer schema of avro values.
+    rows_per_message : int
+        The maximum number of rows per arrow message.
+
+    Returns
+    -------
+    tuple[list[bytes | None], list[bytes | None]]
+        The keys and the values of the messages.
+
+    """
+    metadata = [f.name for f in _METADATA_FIELDS]
+    table = pa.Table.from_batches([batch])
+    data = table.drop_columns([n for n in metadata if n in table.column_names])
+
+    keys = [None] * len(batch)
+    if key_column is not None:
+        keys = pc.cast(batch.column(key_column), pa.string()).to_pylist()
+        keys = [None if key is None else key.encode() for key in keys]
+
+    if value_format == "raw":
+        values = data.column("value").to_pylist()
+        values = [v.encode() if isinstance(v, str) else v for v in values]
+    elif value_format == "json":
+        # polars escapes newlines in strings, so every line is one row
+        ndjson = pl.from_arrow(data).write_ndjson().encode()
+        values = ndjson.splitlines()
+    elif value_format == "avro":
+        fastavro = _import_fastavro()
+        parsed = fastavro.parse_schema(avro_schema)
+        values = []
+        for record in data.to_pylist():
+            buffer = io.BytesIO()
+            fastavro.schemaless_writer(buffer, parsed, record)
+            values.append(buffer.getvalue())
+    elif value_format == "arrow":
+        groups = [(None, data)]
+        if key_column is not None:
+            df = pl.from_arrow(table.select([key_column]))
+            indices = df.with_row_index().group_by(key_column, maintain_order=True)
+            groups = [
+                (keys[rows[0]], data.take(rows))
+                for rows in indices.agg(pl.col("index"))["index"].to_list()
+            ]
+
+        keys, values = [], []
+        for key, rows in groups:
+            for chunk in rows.to_batches(max_chunksize=rows_per_message):
+                sink = pa.BufferOutputStream()
+                with ipc.new_stream(sink, chunk.schema) as writer:
+                    writer.write_batch(chunk)
+                keys.append(key)
+                values.append(sink.getvalue().to_pybytes())
+    else:
+        raise ValueError(f"unsupported value format: {value_format}")
+
+    return keys, values
+
 
 class KafkaTopic(BaseIO):
     def __init__(
@@ -13,14 +249,68 @@ class KafkaTopic(BaseIO):
         group_id: str,
         auto_offset_reset: str = "earliest",
         enable_partition_eof: bool = True,
+        value_format: str = "raw",
+        value_schema: pa.Schema | dict[str, Any] | None = None,
+        consume_size: int = 10_000,
+        max_batch_rows: int = 100_000,
+        max_batch_bytes: int = 64 * 1024 * 1024,
+        max_batch_interval: float = 1.0,
+        max_queued_batches: int = 16,
+        key_column: str | None = None,
+        rows_per_message: int = 10_000,
+        compression: str = "zstd",
+        linger_ms: int = 50,
+        batch_bytes: int = 1024 * 1024,
+        producer_config: dict[str, Any] | None = None,
+        state: JsonStateStore | None = None,
         backend: BaseBackend | None = None,
     ) -> None:
-        """Initialize the kafka topic."""
+        """
+        Initialize the kafka topic.
+
+        A read consumes every partition on its own thread, from the start
+        offset up to the high watermark the partition had when the read
+        started. Messages are fetched `consume_size` at a time and decoded
+        into arrow record batches of at most `max_batch_rows` rows or
+        `max_batch_bytes` bytes of values, a partition flushes a smaller
+        batch once `max_batch_interval` seconds passed since its last one.
+
+        Without a `state` store every read starts at the low watermark of each
+        partition. With one, a read resumes every partition at the offset
+        after the last message read by the previous committed run.
+
+        A write produces messages asynchronously, librdkafka batches up to
+        `batch_bytes` per partition, waits up to `linger_ms` to fill a batch
+        and compresses it with `compression`. Delivery failures are collected
+        and raised once all messages have been flushed.
+
+        Parameters
+        ----------
+        value_format : str
+            How the message values are encoded, "raw" values are a binary
+            `value` column, "json" and "avro" values hold the fields of one
+            row and "arrow" values are ipc streams of up to `rows_per_message`
+            rows. Every record batch read also gets the `kafka_key`,
+            `kafka_partition`, `kafka_offset` and `kafka_timestamp` columns,
+            which are left out when writing.
+        value_schema : pa.Schema | dict[str, Any] | None
+            The arrow schema of json values, inferred from the first batch if
+            not given, or the (parsed json) avro schema of avro values.
+        key_column : str | None
+            The column whose values become the keys of the written messages,
+            so rows with the same key end up on the same partition.
+        producer_config : dict[str, Any] | None
+            Additional librdkafka producer settings, overriding the above.
+
+        """
         super().__init__(
             name=self.__class__.__name__,
             backend=backend or get_global_backend(),
         )
 
+        if value_format == "avro" and value_schema is None:
+            raise ValueError("decoding avro values requires a `value_schema`")
+
         config = {
             "bootstrap.servers": bootstrap_servers,
             "group.id": group_id,
@@ -29,45 +319,267 @@ class KafkaTopic(BaseIO):
         }
 
         self._topic = topic
-        c = Consumer(config)
-        metadata = c.list_topics(topic, timeout=5)
+        self._config = config
+        # consumers are short-lived, so no connection outlives its use
+        consumer = Consumer(config)
+        try:
+            metadata = consumer.list_topics(topic, timeout=5)
+        finally:
+            consumer.close()
         self._partitions = [p.id for p in metadata.topics[topic].partitions.values()]
-        assignments = [TopicPartition(topic, p, 0) for p in self._partitions]
-        c.assign(assignments)
 
-        for tp in assignments:
-            low, high = c.get_watermark_offsets(tp)
-            tp.offset = low
+        self._value_format = value_format
+        if value_format == "avro":
+            self._avro_schema, self._value_schema = value_schema, None
+        else:
+            self._avro_schema, self._value_schema = None, value_schema
+        self._schema_lock = threading.Lock()
+        self._consume_size = consume_size
+        self._max_batch_rows = max_batch_rows
+        self._max_batch_bytes = max_batch_bytes
+        self._max_batch_interval = max_batch_interval
+        self._max_queued_batches = max_queued_batches
 
-        c.assign(assignments)
+        self._state = state
+        self._state_key = f"kafka://{bootstrap_servers}/{topic}/{group_id}"
+        self._next_offsets = {}
+        self._pending_offsets = None
 
-        self._consumer = c
-        self._producer = Producer(config)
+        self._key_column = key_column
+        self._rows_per_message = rows_per_message
+        self._producer = Producer(
+            {
+                "bootstrap.servers": bootstrap_servers,
+                "compression.type": compression,
+                "linger.ms": linger_ms,
+                "batch.size": batch_bytes,
+                **(producer_config or {}),
+            }
+        )
 
     def read(self) -> IR:
-        eof_count = 0
-        messages = []
-        while True:
-            msg = self._consumer.poll(timeout=1.0)
-            if msg is None:
-                if eof_count >= len(self._partitions):
-                    break
-                continue
-            if msg.error():
-                # eof for partition
-                if msg.error().code() == msg.error().PARTITION_EOF:
-                    eof_count += 1
-                    continue
-                else:
-                    print(f"kafka consumer error: {msg.error()}")
+        batches = list(self.read_batches())
+        if batches:
+            table = pa.Table.from_batches(batches)
+        else:
+            table = pa.Table.from_batches([], schema=pa.schema(_METADATA_FIELDS))
+        return self._backend.ir_from_arrow_table(table)
+
+    def read_batches(self, batch_size: int | None = None) -> Iterator[pa.RecordBatch]:
+        """
+        Consume all partitions concurrently as a stream of record batches.
+
+        Batches of different partitions are interleaved in the order they
+        become ready, batches of the same partition follow offset order.
+        """
+        max_batch_rows = batch_size or self._max_batch_rows
+        ranges = self._offset_ranges()
+        self._next_offsets = {str(p): start for p, (start, _) in ranges.items()}
+
+        ready = queue.Queue(self._max_queued_batches)
+        stop = threading.Event()
+
+        def put(item: Any) -> None:
+            # bounded, so slow writers hold back the consumers
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return
+                except queue.Full:
                     continue
-            else:
-                val = msg.value()
-                messages.append(val.decode("utf-8"))
 
-        # close the consumer when we read everything
-        self._consumer.close()
-        return messages
+        def consume(partition: int, start: int, end: int) -> None:
+            for batch in self._consume_partition(
+                partition, start, end, max_batch_rows, stop
+            ):
+                put(batch)
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(len(ranges), 1)
+        ) as executor:
+            futures = [
+                executor.submit(consume, partition, start, end)
+                for partition, (start, end) in ranges.items()
+                if start < end
+            ]
+            # a finished consumer queues its own future, so errors surface
+            # as soon as they happen instead of after all other partitions
+            for future in futures:
+                future.add_done_callback(put)
+
+            remaining = len(futures)
+            try:
+                while remaining:
+                    item = ready.get()
+                    if isinstance(item, concurrent.futures.Future):
+                        item.result()
+                        remaining -= 1
+                        continue
+                    partition = item.column("kafka_partition")[0].as_py()
+                    offset = item.column("kafka_offset")[-1].as_py()
+                    self._next_offsets[str(partition)] = offset + 1
+                    yield item
+            finally:
+                stop.set()
+
+        self._pending_offsets = dict(self._next_offsets)
+
+    def _offset_ranges(self) -> dict[int, tuple[int, int]]:
+        """Get the offsets to read from and up to (exclusive) per partition."""
+        offsets = {}
+        if self._state is not None:
+            offsets = self._state.get(self._state_key) or {}
+
+        ranges = {}
+        consumer = Consumer(self._config)
+        try:
+            for partition in self._partitions:
+                tp = TopicPartition(self._topic, partition)
+                low, high = consumer.get_watermark_offsets(tp, timeout=5)
+                # clamp, the stored offset might have been removed by retention
+                start = min(max(offsets.get(str(partition), low), low), high)
+                ranges[partition] = (start, high)
+        finally:
+            consumer.close()
+        return ranges
+
+    def _consume_partition(
+        self,
+        partition: int,
+        start: int,
+        end: int,
+        max_batch_rows: int,
+        stop: threading.Event,
+    ) -> Iterator[pa.RecordBatch]:
+        """Consume one partition from `start` up to `end` in micro-batches."""
+        consumer = Consumer(self._config)
+        consumer.assign([TopicPartition(self._topic, partition, start)])
+        try:
+            messages = []
+            n_bytes = 0
+            offset = start
+            flushed_at = time.monotonic()
+            while offset < end and not stop.is_set():
+                deadline = flushed_at + self._max_batch_interval
+                polled = consumer.consume(
+                    num_messages=min(self._consume_size, max_batch_rows),
+                    timeout=max(deadline - time.monotonic(), 0.01),
+                )
+                for msg in polled:
+                    error = msg.error()
+                    if error is not None:
+                        if error.code() == KafkaError._PARTITION_EOF:
+                            # the end might lie past trailing control records
+                            # (e.g. transaction markers) that are never
+                            # delivered as messages
+                            offset = max(offset, msg.offset())
+                            continue
+                        raise KafkaException(error)
+                    if msg.offset() >= end:
+                        # everything before the end was read, the rest of the
+                        # poll arrived after the read started
+                        offset = end
+                        break
+                    messages.append(msg)
+                    n_bytes += len(msg.value() or b"")
+                    offset = msg.offset() + 1
+
+                if not polled:
+                    # without partition eof events, trailing control records
+                    # only show in the position, which moves past them
+                    (position,) = consumer.position(
+                        [TopicPartition(self._topic, partition)]
+                    )
+                    offset = max(offset, position.offset)
+
+                if messages and (
+                    len(messages) >= max_batch_rows
+                    or n_bytes >= self._max_batch_bytes
+                    or time.monotonic() >= deadline
+                    or offset >= end
+                ):
+                    yield self._decode(messages)
+                    messages = []
+                    n_bytes = 0
+                    flushed_at = time.monotonic()
+                elif not messages and time.monotonic() >= deadline:
+                    flushed_at = time.monotonic()
+        finally:
+            consumer.close()
+
+    def _decode(self, messages: list[Message]) -> pa.RecordBatch:
+        """Decode messages, fixing the value schema on the first batch."""
+        if self._value_format in ("json", "avro") and self._value_schema is None:
+            with self._schema_lock:
+                if self._value_schema is None:
+                    batch = _to_record_batch(
+                        messages, self._value_format, avro_schema=self._avro_schema
+                    )
+                    # keep every later batch (of any partition) on this schema
+                    self._value_schema = pa.schema(
+                        [f for f in batch.schema if f not in _METADATA_FIELDS]
+                    )
+                    return batch
+
+        return _to_record_batch(
+            messages, self._value_format, self._value_schema, self._avro_schema
+        )
+
+    def commit(self) -> None:
+        """Record the next offset to read per partition in the state store."""
+        if self._state is not None and self._pending_offsets is not None:
+            self._state.set(self._state_key, self._pending_offsets)
+            self._pending_offsets = None
 
     def write(self, data: IR) -> None:
-        pass
+        self.write_batches(self._backend.ir_to_arrow_table(data).to_batches())
+
+    def write_batches(self, batches: Iterable[pa.RecordBatch]) -> None:
+        """
+        Produce the record batches as messages, without waiting on deliveries.
+
+        Messages are handed to the producer queue as fast as it accepts them,
+        delivery reports are served in between and all outstanding messages
+        are flushed at the end.
+
+        Raises
+        ------
+        KafkaException
+            If any message could not be delivered.
+
+        """
+        failures = []
+
+        def on_delivery(error: KafkaError | None, _: Message) -> None:
+            if error is not None:
+                failures.append(error)
+
+        produced = 0
+        for batch in batches:
+            keys, values = _encode(
+                batch,
+                self._value_format,
+                self._key_column,
+                self._avro_schema,
+                self._rows_per_message,
+            )
+            for key, value in zip(keys, values):
+                while True:
+                    try:
+                        self._producer.produce(
+                            self._topic, value, key, on_delivery=on_delivery
+                        )
+                        break
+                    except BufferError:
+                        # the local queue is full, wait for deliveries
+                        self._producer.poll(0.1)
+                produced += 1
+                if produced % _POLL_INTERVAL == 0:
+                    self._producer.poll(0)
+
+        self._producer.flush()
+        if failures:
+            raise KafkaException(
+                f"{len(failures)} of {produced} messages were not delivered, "
+                f"first error: {failures[0]}"
+            )
@@ -0,0 +1,301 @@
+import concurrent.futures
+import itertools
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pyarrow as pa
+from pyarrow import fs
+
+from .._utils import _try_get_file_system_from_uri
+from ..ir import IR, ArrowBackend, BaseBackend, get_global_backend
+from ..state import JsonStateStore
+from ._base import BaseIO
+from ._utils import _limit_batch_size
+
+_EXECUTORS = {
+    "thread": concurrent.futures.ThreadPoolExecutor,
+    "process": concurrent.futures.ProcessPoolExecutor,
+}
+
+
+def _glob_to_regex(pattern: str) -> re.Pattern:
+    """
+    Translate a glob pattern to a regex matching full paths.
+
+    `*` and `?` never match across a `/`, while `**` matches any number of
+    directories.
+    """
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(pattern[i])
+                i += 1
+            else:
+                regex += pattern[i : end + 1]
+                i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+
+    return re.compile(regex + r"\Z")
+
+
+def _is_glob(uri: str) -> bool:
+    return any(c in uri for c in "*?[")
+
+
+def _list_files(
+    uri: str | Path,
+    **options,
+) -> list[fs.FileInfo]:
+    """
+    List the files matching a glob pattern or found under a directory/prefix.
+
+    Files whose name starts with `.` or `_` are skipped, just as they are
+    when discovering an arrow dataset.
+    """
+    file_system, path = _try_get_file_system_from_uri(uri, **options)
+    if _is_glob(path):
+        # list from the deepest directory without any glob characters in it
+        parts = path.split("/")
+        n_static = next(i for i, part in enumerate(parts) if _is_glob(part))
+        base_dir = "/".join(parts[:n_static])
+        pattern = _glob_to_regex(path)
+    else:
+        base_dir = path.rstrip("/")
+        pattern = None
+
+    selector = fs.FileSelector(base_dir, recursive=True)
+    infos = [
+        info
+        for info in file_system.get_file_info(selector)
+        if info.type == fs.FileType.File
+        and not info.base_name.startswith((".", "_"))
+        and (pattern is None or pattern.match(info.path))
+    ]
+    return sorted(infos, key=lambda info: info.path)
+
+
+def _read_file_to_arrow(
+    reader: type[BaseIO],
+    uri: str,
+    options: dict,
+) -> pa.Table:
+    """Read a single file to an arrow table, runs inside a pool worker."""
+    return reader(uri, backend=ArrowBackend(), **options).read()
+
+
+class MultiFile(BaseIO):
+    """
+    Implementation of a source made up of many files of the same format.
+
+    The files are read concurrently with a pool of workers, each worker using
+    the per-format `reader` I/O (e.g. `CsvFile` or `ParquetFile`) to read one
+    file at a time. With thousands of small objects on an object store the
+    runtime is dominated by per-request latency, which only concurrency hides.
+
+    `MultiFile` is a source only, `write` raises `NotImplementedError`. Use
+    e.g. an `ArrowDataset` to write data as many files.
+    """
+
+    def __init__(
+        self,
+        uris: str | Path | Iterable[str | Path],
+        reader: type[BaseIO],
+        *,
+        max_workers: int | None = None,
+        executor: str = "thread",
+        state: JsonStateStore | None = None,
+        backend: BaseBackend | None = None,
+        **options,
+    ) -> None:
+        """
+        Initialize a new `MultiFile`.
+
+        Parameters
+        ----------
+        uris : str | Path | Iterable[str | Path]
+            Either a glob pattern (e.g. `s3://bucket/raw/2025-*/*.csv`), a
+            directory or prefix ending with a `/` which is listed recursively,
+            a single file, or an explicit list of file uris.
+        reader : type[BaseIO]
+            The I/O class used to read each individual file.
+        max_workers : int | None
+            The number of files read concurrently, defaults to the default
+            number of workers of the chosen executor.
+        executor : str
+            Either `thread` or `process`. Threads suit I/O bound reads and
+            readers that release the GIL, processes suit readers that do
+            per-row work in python.
+        state : JsonStateStore | None
+            A state store recording the size and modification time of every
+            file read by the last committed run. When set, only files that are
+            new or changed since are read.
+        backend : BaseBackend | None
+            The backend to read the merged data into.
+        **options
+            Passed on to `reader` for every file, and used to set up the file
+            system when listing the files.
+
+        """
+        super().__init__(
+            name=self.__class__.__name__,
+            backend=backend or get_global_backend(),
+        )
+
+        if executor not in _EXECUTORS:
+            raise ValueError(
+                f"unknown executor '{executor}', expected one of {list(_EXECUTORS)}"
+            )
+
+        if max_workers is None:
+            n_cpus = os.cpu_count() or 1
+            max_workers = min(32, n_cpus + 4) if executor == "thread" else n_cpus
+
+        if isinstance(uris, (str, Path)):
+            self._pattern = uris
+            self._uris = None
+        else:
+            self._pattern = None
+            self._uris = [str(uri) for uri in uris]
+
+        self._reader = reader
+        self._max_workers = max_workers
+        self._executor = executor
+        self._options = options
+        self._state = state
+        self._state_key = f"files://{self._pattern or ','.join(self._uris)}"
+        self._pending_fingerprints = None
+
+    def list_uris(self) -> list[str]:
+        """List the uris of all files that make up the source."""
+        return [uri for uri, _ in self._list_entries()]
+
+    def _list_entries(self) -> list[tuple[str, fs.FileInfo | None]]:
+        """List the uris with their file info, if the listing returned one."""
+        if self._uris is not None:
+            return [(uri, None) for uri in self._uris]
+
+        pattern = str(self._pattern)
+        if not _is_glob(pattern) and not pattern.endswith("/"):
+            return [(pattern, None)]
+
+        scheme = pattern.split("://")[0] + "://" if "://" in pattern else ""
+        return [
+            (scheme + info.path, info) for info in _list_files(pattern, **self._options)
+        ]
+
+    def commit(self) -> None:
+        """Record the fingerprints of the files listed by the last read."""
+        if self._pending_fingerprints is not None:
+            self._state.set(self._state_key, self._pending_fingerprints)
+            self._pending_fingerprints = None
+
+    def _uris_to_read(self) -> list[str]:
+        """
+        List the uris to read, skipping files that are unchanged since the
+        last committed run when the source is incremental.
+        """
+        entries = self._list_entries()
+        if self._state is None:
+            return [uri for uri, _ in entries]
+
+        fingerprints = {}
+        for uri, info in entries:
+            if info is None:
+                file_system, path = _try_get_file_system_from_uri(uri, **self._options)
+                info = file_system.get_file_info(path)
+            fingerprints[uri] = [info.size, info.mtime_ns]
+
+        previous = self._state.get(self._state_key) or {}
+        self._pending_fingerprints = fingerprints
+        return [uri for uri in fingerprints if previous.get(uri) != fingerprints[uri]]
+
+    def read(self) -> IR:
+        """
+        Read all files concurrently and merge them into the backend IR.
+
+        When an incremental source finds no new or changed files, the result
+        is empty but keeps the schema of the files, like an incremental
+        `PostgresTable` without new rows.
+        """
+        uris = self._uris_to_read()
+        if not uris:
+            return self._backend.ir_from_arrow_table(self._empty_table())
+
+        with _EXECUTORS[self._executor](max_workers=self._max_workers) as executor:
+            tables = list(
+                executor.map(
+                    _read_file_to_arrow,
+                    itertools.repeat(self._reader),
+                    uris,
+                    itertools.repeat(self._options),
+                )
+            )
+
+        return self._backend.ir_from_arrow_table(
+            pa.concat_tables(tables, promote_options="default")
+        )
+
+    def _empty_table(self) -> pa.Table:
+        """Get an empty table with the schema of the first batch of the files."""
+        for uri, _ in self._list_entries()[:1]:
+            reader = self._reader(uri, backend=ArrowBackend(), **self._options)
+            first = next(iter(reader.read_batches()), None)
+            if first is not None:
+                return first.schema.empty_table()
+        return pa.table({})
+
+    def read_batches(self, batch_size: int | None = None) -> Iterator[pa.RecordBatch]:
+        """
+        Stream the record batches of each file as soon as the file is read.
+
+        Files are yielded in completion order, not listing order. At most
+        `2 * max_workers` files are in flight at once, which bounds memory
+        while keeping every worker busy. All files must share a schema for
+        the stream to be written to a single target.
+        """
+        uris = iter(self._uris_to_read())
+        executor = _EXECUTORS[self._executor](max_workers=self._max_workers)
+        try:
+            pending = {
+                executor.submit(_read_file_to_arrow, self._reader, uri, self._options)
+                for uri in itertools.islice(uris, 2 * self._max_workers)
+            }
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    for uri in itertools.islice(uris, 1):
+                        pending.add(
+                            executor.submit(
+                                _read_file_to_arrow, self._reader, uri, self._options
+                            )
+                        )
+                    table = future.result()
+                    yield from _limit_batch_size(table.to_batches(), batch_size)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def write(self, data: IR) -> None:
+        """Writing is not supported, see the class docstring."""
+        raise NotImplementedError("MultiFile is a read-only source")
@@ -1,15 +1,30 @@
+import functools
+import threading
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator, Mapping
 
-import polars as pl
+import numpy as np
+import pyarrow as pa
 
+from .._channel import _Channel, _run_concurrently
+from .._utils import _try_get_file_system_from_uri
 from ..ir import IR, BaseBackend, get_global_backend
 from ._base import BaseIO
-from ._utils import _try_get_file_system_from_uri
+from .fixed_width import _decode_field, _gather, _iter_line_chunks
+
+# Number of bytes of lines parsed at a time.
+_DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
 
 
 class MultiFixedWidthFile(BaseIO):
-    """Implementation of a fixed width file (fwf)."""
+    """
+    Implementation of a fixed width file (fwf) with multiple record types.
+
+    Each line starts with a schema id (at `schema_spec_offset`, of length
+    `schema_spec_len`) telling which record type, and so which layout in the
+    `schema_map`, the line has. Lines are split into per record type groups in
+    a single pass, by partitioning each chunk of lines on the schema id.
+    """
 
     def __init__(
         self,
@@ -20,6 +35,7 @@ class MultiFixedWidthFile(BaseIO):
         pad_char: str = " ",
         encoding: str = "utf-8",
         backend: BaseBackend | None = None,
+        **options,
     ) -> None:
         """Initialize the `FixedWidthFile`."""
         super().__init__(
@@ -27,7 +43,7 @@ class MultiFixedWidthFile(BaseIO):
             backend=backend or get_global_backend(),
         )
 
-        file_system, file_path = _try_get_file_system_from_uri(uri=uri)
+        file_system, file_path = _try_get_file_system_from_uri(uri=uri, **options)
         self._file_system = file_system
         self._file_path = file_path
         self._schema_map = schema_map
@@ -35,45 +51,157 @@ class MultiFixedWidthFile(BaseIO):
         self._schema_spec_offset = schema_spec_offset
         self._pad_char = pad_char
         self._encoding = encoding
+        self._chunk_bytes = options.get("chunk_bytes", _DEFAULT_CHUNK_BYTES)
 
     def read(self) -> IR:
-        """Read the fixed width file."""
-        with self._file_system.open_input_file(self._file_path) as source:
-            df = pl.read_csv(
-                source=source,
-                has_header=False,
-                skip_rows=0,
-                new_columns=["full_str"],
+        """
+        Read the fixed width file.
+
+        Returns
+        -------
+        list[IR]
+            The records of each record type in the backend IR, in the order of
+            the `schema_map`.
+
+        """
+        batches = {schema_id: [] for schema_id in self._schema_map}
+        for schema_id, batch in self.read_groups():
+            batches[schema_id].append(batch)
+
+        return [
+            self._backend.ir_from_arrow_table(
+                pa.Table.from_batches(
+                    batches[schema_id], schema=self._schema(schema_id)
+                )
             )
+            for schema_id in self._schema_map
+        ]
 
-        df = df.with_columns(
-            [
-                pl.col("full_str")
-                .str.slice(self._schema_spec_offset, self._schema_spec_len)
-                .alias("_schema_id")
-            ]
-        )
+    def read_groups(
+        self,
+        batch_size: int | None = None,
+    ) -> Iterator[tuple[str, pa.RecordBatch]]:
+        """
+        Stream the records of the file grouped by record type.
+
+        Parameters
+        ----------
+        batch_size : int | None
+            The maximum number of rows per record batch, defaults to one batch
+            per record type per chunk of the file.
+
+        Yields
+        ------
+        tuple[str, pa.RecordBatch]
+            The schema id and a record batch of parsed records of that type.
+            Lines with a schema id missing from the `schema_map` are skipped.
 
-        dfs = []
+        """
+        pad_byte = self._pad_char.encode(self._encoding)[0]
         skip_n_chars = self._schema_spec_len + self._schema_spec_offset
+        known_ids = {
+            schema_id.encode(self._encoding): schema_id
+            for schema_id in self._schema_map
+        }
+
+        for data, starts, lengths in _iter_line_chunks(
+            self._file_system,
+            self._file_path,
+            self._chunk_bytes,
+        ):
+            ids = _gather(
+                data,
+                starts,
+                lengths,
+                self._schema_spec_offset,
+                self._schema_spec_len,
+                pad_byte,
+            )
+            # partition the lines on their schema id: a stable sort groups the
+            # lines of each record type together while keeping their order
+            unique_ids, inverse = np.unique(
+                ids.view(f"S{self._schema_spec_len}").ravel(),
+                return_inverse=True,
+            )
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.cumsum(np.bincount(inverse, minlength=len(unique_ids)))
+
+            for i, raw_id in enumerate(unique_ids):
+                schema_id = known_ids.get(raw_id)
+                if schema_id is None:
+                    continue
+
+                rows = order[bounds[i - 1] if i else 0 : bounds[i]]
+                schema_def = self._schema_map[schema_id]
+                batch = pa.RecordBatch.from_arrays(
+                    [
+                        _decode_field(
+                            _gather(
+                                data,
+                                starts[rows],
+                                lengths[rows],
+                                start + skip_n_chars,
+                                width,
+                                pad_byte,
+                            ),
+                            self._encoding,
+                            self._pad_char,
+                        )
+                        for start, width in schema_def["colspecs"]
+                    ],
+                    names=list(schema_def["colnames"]),
+                )
+                if batch_size is None:
+                    yield schema_id, batch
+                else:
+                    for offset in range(0, batch.num_rows, batch_size):
+                        yield schema_id, batch.slice(offset, batch_size)
+
+    def demux(
+        self,
+        targets: Mapping[str, BaseIO],
+        *,
+        batch_size: int | None = None,
+        queue_depth: int = 4,
+    ) -> None:
+        """
+        Stream the records of each record type to its own target.
+
+        The file is read once, and each record type is written by its own
+        target (e.g. one `ParquetFile` or `ArrowDataset` per type) running on
+        its own thread, fed through a bounded queue of `queue_depth` batches.
+        Memory stays bounded however large the file is.
+
+        Parameters
+        ----------
+        targets : Mapping[str, BaseIO]
+            The target of each schema id, record types without a target are
+            skipped.
+        batch_size : int | None
+            The maximum number of rows per record batch.
+        queue_depth : int
+            The maximum number of batches buffered per target.
+
+        """
+        abort = threading.Event()
+        channels = {schema_id: _Channel(queue_depth, abort) for schema_id in targets}
+        writers = [
+            functools.partial(target.write_batches, channels[schema_id])
+            for schema_id, target in targets.items()
+        ]
+
+        def route() -> None:
+            for schema_id, batch in self.read_groups(batch_size=batch_size):
+                if schema_id in channels:
+                    channels[schema_id].put(batch)
+            for channel in channels.values():
+                channel.close()
+
+        _run_concurrently(writers, route, abort)
 
-        for schema_id, schema_def in self._schema_map.items():
-            colspecs = schema_def["colspecs"]
-            colnames = schema_def["colnames"]
-
-            df_schema_spec = df.filter(pl.col("_schema_id") == schema_id)
-            df_schema_spec = df_schema_spec.with_columns(
-                [
-                    pl.col("full_str")
-                    .str.slice(start + skip_n_chars, width)
-                    .str.strip_chars(self._pad_char)
-                    .alias(col)
-                    for (start, width), col in zip(colspecs, colnames, strict=True)
-                ]
-            ).drop(["full_str", "_schema_id"])
-            dfs.append(df_schema_spec)
-
-        return dfs
+    def _schema(self, schema_id: str) -> pa.Schema:
+        colnames = self._schema_map[schema_id]["colnames"]
+        return pa.schema([(name, pa.string()) for name in colnames])
 
     def write(self, data: IR) -> None:
         pass
@@ -1,10 +1,62 @@
 from pathlib import Path
+from typing import Iterable, Iterator
 
+import duckdb
+import polars as pl
+import pyarrow as pa
+import pyarrow.dataset as ds
 import pyarrow.parquet as pq
+from pyarrow import fs
 
 from .._utils import _try_get_file_system_from_uri
-from ..ir import IR, BaseBackend, get_global_backend
+from ..cache import SourceCache
+from ..ir import IR, BaseBackend, DuckdbBackend, LazyIR, get_global_backend
 from ._base import BaseIO
+from ._utils import _peek_schema
+
+# Write options understood by both `pyarrow.parquet.write_table` and duckdb's
+# `DuckDBPyRelation.write_parquet`.
+_DUCKDB_WRITE_OPTIONS = {"compression", "row_group_size"}
+
+# Same defaults as `pyarrow.parquet.ParquetFile.iter_batches` and
+# `pyarrow.parquet.write_table`.
+_DEFAULT_BATCH_SIZE = 65_536
+_DEFAULT_ROW_GROUP_SIZE = 1024 * 1024
+
+
+def _write_row_groups(
+    writer: pq.ParquetWriter,
+    batches: Iterable[pa.RecordBatch],
+    schema: pa.Schema,
+    row_group_size: int,
+) -> None:
+    """
+    Write a stream of batches buffered into row groups of `row_group_size` rows,
+    so small batches do not end up as many tiny row groups.
+    """
+    buffered = []
+    buffered_rows = 0
+    for batch in batches:
+        buffered.append(batch)
+        buffered_rows += batch.num_rows
+        if buffered_rows < row_group_size:
+            continue
+
+        # write only full row groups and carry the remainder over
+        table = pa.Table.from_batches(buffered, schema=schema)
+        n_full = buffered_rows - buffered_rows % row_group_size
+        writer.write_table(
+            table.slice(0, n_full),
+            row_group_size=row_group_size,
+        )
+        buffered = table.slice(n_full).to_batches()
+        buffered_rows -= n_full
+
+    if buffered_rows:
+        writer.write_table(
+            pa.Table.from_batches(buffered, schema=schema),
+            row_group_size=row_group_size,
+        )
 
 
 class ParquetFile(BaseIO):
@@ -15,9 +67,15 @@ class ParquetFile(BaseIO):
         uri: str | Path,
         *,
         backend: BaseBackend | None = None,
+        cache: SourceCache | None = None,
         **options,
     ) -> None:
-        """Initialize a new `ParquetFile`."""
+        """
+        Initialize a new `ParquetFile`.
+
+        Reads go through `cache` if one is given, so a file read again is
+        memory-mapped from the local cache instead of downloaded and decoded.
+        """
         super().__init__(
             name=self.__class__.__name__,
             backend=backend or get_global_backend(),
@@ -32,19 +90,110 @@ class ParquetFile(BaseIO):
         self._file_path = file_path
         self._read_options = options.get("read_options", {})
         self._write_options = options.get("write_options", {})
+        self._cache = cache
 
     def read(self) -> IR:
         """Read the parquet file to the backend IR."""
+        if self._cache is not None:
+            return self._backend.ir_from_arrow_table(self._read_cached())
+
         with self._file_system.open_input_file(self._file_path) as source:
             return self._backend.ir_from_arrow_table(
                 pq.read_table(source=source, **self._read_options)
             )
 
+    def _read_cached(self) -> pa.Table:
+        return self._cache.read_table(
+            self._file_system,
+            self._file_path,
+            lambda source: pq.read_table(source=source, **self._read_options),
+            options=self._read_options,
+        )
+
     def write(self, data: IR) -> None:
-        """Write backend IR to parquet file."""
+        """
+        Write backend IR to parquet file.
+
+        A duckdb relation written to a local file is copied straight from
+        duckdb with its multithreaded parquet writer, as long as only the
+        `compression` and `row_group_size` write options are set.
+        """
+        if (
+            isinstance(data, duckdb.DuckDBPyRelation)
+            and isinstance(self._file_system, fs.LocalFileSystem)
+            and set(self._write_options) <= _DUCKDB_WRITE_OPTIONS
+        ):
+            data.write_parquet(self._file_path, **self._write_options)
+            return
+
         with self._file_system.open_output_stream(self._file_path) as destination:
             pq.write_table(
                 table=self._backend.ir_to_arrow_table(data),
                 where=destination,
                 **self._write_options,
             )
+
+    def scan(self) -> LazyIR:
+        """
+        Create a lazy query plan over the parquet file.
+
+        Local files are scanned natively with `pl.scan_parquet` unless the
+        backend is duckdb, everything else is scanned as an arrow dataset.
+        Either way only the selected columns and the row groups that can match
+        the filters are read.
+        """
+        if isinstance(self._file_system, fs.LocalFileSystem) and not isinstance(
+            self._backend, DuckdbBackend
+        ):
+            return LazyIR(pl.scan_parquet(self._file_path))
+
+        return self._backend.lazy_from_arrow_dataset(
+            ds.dataset(
+                self._file_path,
+                format="parquet",
+                filesystem=self._file_system,
+            )
+        )
+
+    def read_batches(self, batch_size: int | None = None) -> Iterator[pa.RecordBatch]:
+        """
+        Stream the parquet file as record batches, one row group at a time.
+
+        Only the `columns` read option is honored when streaming, except for
+        cached files, which are read whole from the memory-mapped cache.
+        """
+        if self._cache is not None:
+            yield from self._read_cached().to_batches(
+                max_chunksize=batch_size or _DEFAULT_BATCH_SIZE
+            )
+            return
+
+        with self._file_system.open_input_file(self._file_path) as source:
+            parquet_file = pq.ParquetFile(source)
+            yield from parquet_file.iter_batches(
+                batch_size=batch_size or _DEFAULT_BATCH_SIZE,
+                columns=self._read_options.get("columns"),
+            )
+
+    def write_batches(self, batches: Iterable[pa.RecordBatch]) -> None:
+        """
+        Write a stream of record batches to a parquet file.
+
+        Incoming batches are buffered until they fill a row group of
+        `row_group_size` rows (from the write options), so small batches do not
+        end up as many tiny row groups.
+        """
+        schema, batches = _peek_schema(batches)
+        if schema is None:
+            return
+
+        write_options = dict(self._write_options)
+        row_group_size = write_options.pop("row_group_size", _DEFAULT_ROW_GROUP_SIZE)
+
+        with self._file_system.open_output_stream(self._file_path) as destination:
+            with pq.ParquetWriter(
+                where=destination,
+                schema=schema,
+                **write_options,
+            ) as writer:
+                _write_row_groups(writer, batches, schema, row_group_size)
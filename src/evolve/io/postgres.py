@@ -1,9 +1,53 @@
-from typing import Iterable
+import concurrent.futures
+import itertools
+import logging
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+from urllib.parse import quote
 
+import adbc_driver_postgresql.dbapi as adbc_postgresql
 import duckdb
+import pyarrow as pa
 
-from ..ir import IR, BaseBackend, get_global_backend
+from ..ir import IR, BaseBackend, DuckdbBackend, LazyIR, get_global_backend
+from ..state import JsonStateStore
+from ._adbc import _adbc_ingest, _adbc_swap_tables, _validate_write_mode
 from ._base import BaseIO
+from ._utils import _limit_batch_size, _peek_schema
+
+_logger = logging.getLogger(__name__)
+
+
+def _partition_bounds(low: Any, high: Any, n_partitions: int) -> list[Any]:
+    """
+    Split the closed range `[low, high]` into `n_partitions` contiguous ranges.
+
+    Works for integers, dates and timestamps. Returns the `n_partitions + 1`
+    boundaries, the first being `low` and the last `high`, with duplicates
+    removed when the range holds fewer distinct values than partitions.
+    """
+    bounds = []
+    for i in range(n_partitions + 1):
+        if isinstance(low, int):
+            bound = low + (high - low) * i // n_partitions
+        else:
+            bound = low + (high - low) * i / n_partitions
+        if not bounds or bound != bounds[-1]:
+            bounds.append(bound)
+
+    return bounds
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _sql_literal(value: Any) -> str:
+    """Render a watermark value as a literal understood by duckdb and postgres."""
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    # dates and timestamps print as e.g. '2025-01-01 12:00:00+00:00'
+    return _sql_string(str(value))
 
 
 class PostgresTable(BaseIO):
@@ -19,14 +63,52 @@ class PostgresTable(BaseIO):
         schema: str,
         table: str,
         columns: Iterable[str] | None = None,
+        where: str | None = None,
+        partition_column: str | None = None,
+        num_partitions: int = 1,
+        incremental_column: str | None = None,
+        state: JsonStateStore | None = None,
+        write_mode: str = "append",
+        commit_every: int | None = None,
+        atomic_replace: bool = False,
         backend: BaseBackend | None = None,
     ) -> None:
-        """Initialize the `PostgresTable`."""
+        """
+        Initialize the `PostgresTable`.
+
+        `columns` and `where` are pushed into the query sent to PostgreSQL, so
+        only the selected columns of the matching rows leave the database.
+
+        With `num_partitions` greater than one the table is read over that many
+        concurrent connections, each fetching one range of the integer, date
+        or timestamp `partition_column`. Without a `partition_column` the
+        ranges are ranges of pages of the table, selected on `ctid`.
+
+        With an `incremental_column` and a `state` store only the rows with a
+        value above the high-water mark recorded by the last committed run are
+        read. Every read is capped at the max value found when it starts, which
+        becomes the new mark once the pipeline commits, so rows inserted while
+        reading are picked up by the next run instead of being skipped.
+
+        Writes are bulk loaded with binary COPY through ADBC. `write_mode` is
+        one of `create`, `append`, `replace` or `create_append`, with
+        `commit_every` the load is committed after every chunk of at least
+        that many rows, and with `atomic_replace` a `replace` first loads into
+        a staging table which is swapped in once fully loaded.
+        """
         super().__init__(
             name=self.__class__.__name__,
             backend=backend or get_global_backend(),
         )
 
+        _validate_write_mode(write_mode)
+        if num_partitions < 1:
+            raise ValueError(f"num_partitions must be at least 1, got {num_partitions}")
+        if atomic_replace and write_mode != "replace":
+            raise ValueError("atomic_replace requires write_mode 'replace'")
+        if (incremental_column is None) != (state is None):
+            raise ValueError("incremental_column and state must be set together")
+
         columns = columns or "*"
 
         duckdb_pg_secret_name = f"duckdb_postgres_secret_{user}_{db}"
@@ -34,6 +116,8 @@ class PostgresTable(BaseIO):
 
         conn = duckdb.connect(database=":memory:")
         conn.execute("INSTALL postgres; LOAD postgres;")
+        # push filters added to lazy plans down into the postgres query
+        conn.execute("SET pg_experimental_filter_pushdown = true;")
 
         conn.execute(f"""
         CREATE SECRET {duckdb_pg_secret_name} (
@@ -56,14 +140,31 @@ class PostgresTable(BaseIO):
         if not isinstance(columns, str):
             columns = ", ".join(columns)
 
-        read_query = f"""
-        SELECT {columns} FROM {duckdb_pg_db}.{schema}.{table};
-        """
+        select_query = f"SELECT {columns} FROM {duckdb_pg_db}.{schema}.{table}"
 
-        print(read_query)
+        _logger.debug("select query: %s", select_query)
 
         self._conn = conn
-        self._read_query = read_query
+        self._select_query = select_query
+        self._duckdb_pg_db = duckdb_pg_db
+        self._columns = columns
+        self._where = where
+        self._partition_column = partition_column
+        self._num_partitions = num_partitions
+        self._incremental_column = incremental_column
+        self._state = state
+        self._state_key = (
+            f"postgres://{host}:{port}/{db}/{schema}.{table}/{incremental_column}"
+        )
+        self._pending_watermark = None
+
+        self._adbc_uri = (
+            f"postgresql://{quote(user, safe='')}:{quote(password, safe='')}"
+            f"@{host}:{port}/{db}"
+        )
+        self._write_mode = write_mode
+        self._commit_every = commit_every
+        self._atomic_replace = atomic_replace
 
         self._host = host
         self._port = port
@@ -73,21 +174,209 @@ class PostgresTable(BaseIO):
         self._table = table
 
     def read(self) -> IR:
-        """Read the PostgreSQL table."""
-        # NOTE: on duckdb backend we dont want to materialize the data
-        # immediately - duckdb uses a lazy query execution model - so
-        # if we later filter the original select or something we dont
-        # want to have to materialize it all in memory beforehand
-        # so for duckdb backend we DONT WANT TO ACTUALLY FETCH INTO IR
-        # UNLESS WE HAVE TO - BECAUSE DUCKDB IS SMART :) lets see
-        # if we can be as smart :)
-        return self._backend.ir_from_arrow_table(
-            self._conn.execute(self._read_query).fetch_arrow_table()
-        )
+        """
+        Read the PostgreSQL table.
+
+        On the duckdb backend a single stream read is not fetched at all, it
+        returns the lazy relation over the table so later filters still reach
+        PostgreSQL.
+        """
+        where = self._read_where()
+        if self._num_partitions == 1 and isinstance(self._backend, DuckdbBackend):
+            return self._backend.ir_from_lazy(
+                LazyIR(self._conn.sql(self._read_query(where)))
+            )
+
+        if self._num_partitions == 1:
+            return self._backend.ir_from_arrow_table(
+                self._conn.execute(self._read_query(where)).fetch_arrow_table()
+            )
+
+        queries = self._partition_queries(where)
+        with concurrent.futures.ThreadPoolExecutor(len(queries)) as executor:
+            tables = list(executor.map(self._fetch_partition, queries))
+
+        return self._backend.ir_from_arrow_table(pa.concat_tables(tables))
+
+    def read_batches(self, batch_size: int | None = None) -> Iterator[pa.RecordBatch]:
+        """
+        Stream the PostgreSQL table as record batches.
+
+        A partitioned read yields each partition as soon as it has been
+        fetched, in completion order.
+        """
+        where = self._read_where()
+        if self._num_partitions == 1:
+            reader = self._conn.execute(self._read_query(where)).fetch_record_batch(
+                batch_size or 1_000_000
+            )
+            yield from reader
+            return
+
+        queries = self._partition_queries(where)
+        with concurrent.futures.ThreadPoolExecutor(len(queries)) as executor:
+            futures = [executor.submit(self._fetch_partition, q) for q in queries]
+            for future in concurrent.futures.as_completed(futures):
+                yield from _limit_batch_size(future.result().to_batches(), batch_size)
+
+    def commit(self) -> None:
+        """Record the high-water mark of the last read in the state store."""
+        if self._pending_watermark is not None:
+            self._state.set(self._state_key, self._pending_watermark)
+            self._pending_watermark = None
+
+    def _read_query(self, where: str | None) -> str:
+        if where is None:
+            return self._select_query
+        return f"{self._select_query} WHERE {where}"
+
+    def _read_where(self) -> str | None:
+        """
+        Get the filter of the next read, including the incremental range.
+
+        For an incremental read this looks up the current max value of the
+        incremental column, which is committed as the new high-water mark.
+        """
+        if self._incremental_column is None:
+            return self._where
+
+        column = f'"{self._incremental_column}"'
+        conditions = [f"({self._where})"] if self._where is not None else []
+        watermark = self._state.get(self._state_key)
+        if watermark is not None:
+            conditions.append(f"{column} > {_sql_literal(watermark)}")
+
+        (high,) = self._conn.execute(
+            f"SELECT max({column}) FROM "
+            f"{self._duckdb_pg_db}.{self._schema}.{self._table}"
+            f" WHERE {' AND '.join(conditions) or 'true'}"
+        ).fetchone()
+        if high is None:
+            # nothing new since the last run
+            return "false"
+
+        self._pending_watermark = high
+        return " AND ".join([*conditions, f"{column} <= {_sql_literal(high)}"])
+
+    def _fetch_partition(self, query: tuple[str, list[Any]]) -> pa.Table:
+        # every cursor is its own duckdb connection with its own postgres
+        # connection, so partitions are fetched over concurrent backends
+        sql, params = query
+        with self._conn.cursor() as cursor:
+            return cursor.execute(sql, params).fetch_arrow_table()
+
+    def _partition_queries(self, where: str | None) -> list[tuple[str, list[Any]]]:
+        """Build the query and its parameters for every partition of the read."""
+        if self._partition_column is None:
+            return self._ctid_partition_queries(where)
+
+        column = f'"{self._partition_column}"'
+        table = f"{self._duckdb_pg_db}.{self._schema}.{self._table}"
+        where = f"({where}) AND " if where is not None else ""
+        select = f"SELECT {self._columns} FROM {table} WHERE {where}"
+        low, high = self._conn.execute(
+            f"SELECT min({column}), max({column}) FROM {table} WHERE {where}true"
+        ).fetchone()
+
+        if low is None:
+            # no rows with a value, so only nulls (if anything) to read
+            return [(f"{select}{column} IS NULL", [])]
+
+        bounds = _partition_bounds(low, high, self._num_partitions)
+        ranges = list(itertools.pairwise(bounds)) or [(low, high)]
+        queries = []
+        for i, (lower, upper) in enumerate(ranges):
+            is_last = i == len(ranges) - 1
+            predicate = f"{column} >= ? AND {column} {'<=' if is_last else '<'} ?"
+            if i == 0:
+                predicate = f"({predicate} OR {column} IS NULL)"
+            queries.append((select + predicate, [lower, upper]))
+
+        return queries
+
+    def _ctid_partition_queries(self, where: str | None) -> list[tuple[str, list[Any]]]:
+        """
+        Build one query per range of table pages, selected on `ctid`.
+
+        The queries are run as-is by PostgreSQL through `postgres_query`, the
+        last range is left open in case the table grew since it was measured.
+        """
+        qualified = f'"{self._schema}"."{self._table}"'
+        (n_pages,) = self._conn.execute(
+            "SELECT * FROM postgres_query(?, ?)",
+            [
+                self._duckdb_pg_db,
+                (
+                    f"SELECT (pg_relation_size({_sql_string(qualified)}::regclass)"
+                    " / current_setting('block_size')::int)::bigint"
+                ),
+            ],
+        ).fetchone()
+
+        bounds = _partition_bounds(0, max(int(n_pages), 1), self._num_partitions)
+        where = f" AND ({where})" if where is not None else ""
+        queries = []
+        for i, (lower, upper) in enumerate(itertools.pairwise(bounds)):
+            predicate = f"ctid >= '({lower},0)'::tid"
+            if i < len(bounds) - 2:
+                predicate += f" AND ctid < '({upper},0)'::tid"
+            pg_query = f"SELECT {self._columns} FROM {qualified} WHERE {predicate}"
+            queries.append(
+                (
+                    "SELECT * FROM postgres_query(?, ?)",
+                    [self._duckdb_pg_db, pg_query + where],
+                )
+            )
+
+        return queries
+
+    def scan(self) -> LazyIR:
+        """
+        Create a lazy duckdb relation over the PostgreSQL table.
+
+        Nothing is fetched until the plan is collected, and columns selected
+        and predicates filtered on in the plan are pushed down into the query
+        sent to PostgreSQL.
+        """
+        return LazyIR(self._conn.sql(self._read_query(self._read_where())))
 
     def write(self, data: IR) -> None:
-        """Write to a postgresql table."""
-        pass
+        """Bulk load the backend IR data into the PostgreSQL table."""
+        self.write_batches(self._backend.ir_to_arrow_table(data).to_batches())
+
+    def write_batches(self, batches: Iterable[pa.RecordBatch]) -> None:
+        """
+        Bulk load a stream of record batches into the PostgreSQL table.
+
+        The batches are streamed over a single binary COPY per commit, loading
+        100M rows never goes through one INSERT per row.
+        """
+        schema, batches = _peek_schema(batches)
+        if schema is None:
+            return
+
+        with adbc_postgresql.connect(self._adbc_uri) as connection:
+            if not self._atomic_replace:
+                _adbc_ingest(
+                    connection,
+                    self._table,
+                    batches,
+                    write_mode=self._write_mode,
+                    db_schema=self._schema,
+                    commit_every=self._commit_every,
+                )
+                return
+
+            staging_table = f"{self._table}__evolve_staging"
+            _adbc_ingest(
+                connection,
+                staging_table,
+                batches,
+                write_mode="replace",
+                db_schema=self._schema,
+                commit_every=self._commit_every,
+            )
+            _adbc_swap_tables(connection, self._table, staging_table, self._schema)
 
     def validate_config(self) -> None:
         """Validate the postgresql config."""
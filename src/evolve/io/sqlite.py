@@ -1,31 +1,100 @@
+from typing import Iterable
+
 import adbc_driver_sqlite.dbapi as sqlite
+import pyarrow as pa
 
 from ..ir import IR, BaseBackend, get_global_backend
+from ._adbc import (
+    _adbc_ingest,
+    _adbc_swap_tables,
+    _quote,
+    _validate_write_mode,
+)
 from ._base import BaseIO
+from ._utils import _peek_schema
 
 
 class SQLiteTable(BaseIO):
     """Implementation of an SQLite table."""
 
     def __init__(
-        self, uri: str, *, backend: BaseBackend | None = None, **options
+        self,
+        uri: str,
+        table: str | None = None,
+        *,
+        write_mode: str = "append",
+        commit_every: int | None = None,
+        atomic_replace: bool = False,
+        backend: BaseBackend | None = None,
+        **options,
     ) -> None:
+        """
+        Initialize the `SQLiteTable`.
+
+        Writes are bulk loaded through ADBC, see `PostgresTable` for the
+        meaning of `write_mode`, `commit_every` and `atomic_replace`. The
+        `table` may be left out to only open the connection, but reading or
+        writing then raises a `ValueError`.
+        """
         super().__init__(
             name=self.__class__.__name__,
             backend=backend or get_global_backend(),
         )
+
+        _validate_write_mode(write_mode)
+        if atomic_replace and write_mode != "replace":
+            raise ValueError("atomic_replace requires write_mode 'replace'")
+
         connection = sqlite.connect(uri, **options)
 
         self._uri = uri
+        self._table = table
         self._connection = connection
+        self._write_mode = write_mode
+        self._commit_every = commit_every
+        self._atomic_replace = atomic_replace
+
+    def _check_table(self) -> None:
+        if self._table is None:
+            raise ValueError("SQLiteTable needs a table to read/write")
 
     def read(self) -> IR:
         """Read a table from sqlite connection."""
-        pass
+        self._check_table()
+        with self._connection.cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {_quote(self._table)}")
+            return self._backend.ir_from_arrow_table(cursor.fetch_arrow_table())
 
     def write(self, data: IR) -> None:
         """Write to an sqlite table."""
-        pass
+        self.write_batches(self._backend.ir_to_arrow_table(data).to_batches())
+
+    def write_batches(self, batches: Iterable[pa.RecordBatch]) -> None:
+        """Bulk load a stream of record batches into the sqlite table."""
+        self._check_table()
+        schema, batches = _peek_schema(batches)
+        if schema is None:
+            return
+
+        if not self._atomic_replace:
+            _adbc_ingest(
+                self._connection,
+                self._table,
+                batches,
+                write_mode=self._write_mode,
+                commit_every=self._commit_every,
+            )
+            return
+
+        staging_table = f"{self._table}__evolve_staging"
+        _adbc_ingest(
+            self._connection,
+            staging_table,
+            batches,
+            write_mode="replace",
+            commit_every=self._commit_every,
+        )
+        _adbc_swap_tables(self._connection, self._table, staging_table)
 
     def validate_config(self) -> None:
         pass
@@ -1,15 +1,333 @@
 from __future__ import annotations
 
 import abc
-from typing import Union
+import bisect
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Iterator, Union
 
 import duckdb
 import polars as pl
 import pyarrow as pa
+import pyarrow.dataset as ds
 from pyarrow import ipc
 
+
+def _release(*_: Any) -> None:
+    pass
+
+
+def _keep_alive(
+    rel: duckdb.DuckDBPyRelation, *referents: Any
+) -> duckdb.DuckDBPyRelation:
+    """
+    Keep `referents` alive for as long as the relation is, and return it.
+
+    Duckdb closes a connection as soon as its python object is collected,
+    even while relations created on it are still in use, and a relation
+    chained onto another one does not keep that one alive.
+    """
+    weakref.finalize(rel, _release, *referents)
+    return rel
+
+
+class LazyIR:
+    """
+    Lazy query plan, backed by either a polars `LazyFrame` or a duckdb relation.
+
+    Selecting columns and filtering rows only builds up the plan, nothing is
+    read until the plan is collected. This lets the engine push the projection
+    and the predicates down into the source scan, so a plan that only needs 5
+    of 200 columns only ever reads those 5.
+    """
+
+    def __init__(self, plan: pl.LazyFrame | duckdb.DuckDBPyRelation) -> None:
+        """Initialize the `LazyIR` from a polars or duckdb plan."""
+        self._plan = plan
+
+    def __repr__(self) -> str:
+        return f"LazyIR({type(self._plan).__name__}, columns={self.columns})"
+
+    @property
+    def plan(self) -> pl.LazyFrame | duckdb.DuckDBPyRelation:
+        """Get the underlying polars or duckdb plan."""
+        return self._plan
+
+    @property
+    def columns(self) -> list[str]:
+        """Get the column names of the plan output."""
+        if isinstance(self._plan, pl.LazyFrame):
+            return self._plan.collect_schema().names()
+        return self._plan.columns
+
+    def select(self, *columns: str) -> LazyIR:
+        """Add a projection of `columns` to the plan."""
+        if isinstance(self._plan, pl.LazyFrame):
+            return LazyIR(self._plan.select(columns))
+        rel = self._plan.project(", ".join(f'"{c}"' for c in columns))
+        return LazyIR(_keep_alive(rel, self._plan))
+
+    def filter(self, predicate: str | pl.Expr) -> LazyIR:
+        """
+        Add a row filter to the plan.
+
+        Parameters
+        ----------
+        predicate : str | pl.Expr
+            A SQL boolean expression, e.g. `"total > 100"`, which works for
+            both polars and duckdb plans, or a polars expression for polars
+            plans.
+
+        """
+        if isinstance(self._plan, pl.LazyFrame):
+            if isinstance(predicate, str):
+                predicate = pl.sql_expr(predicate)
+            return LazyIR(self._plan.filter(predicate))
+
+        if not isinstance(predicate, str):
+            raise TypeError("duckdb plans can only be filtered by SQL predicates")
+        return LazyIR(_keep_alive(self._plan.filter(predicate), self._plan))
+
+    def collect(self, engine: str = "auto") -> pa.Table:
+        """
+        Execute the plan and materialize the result as an arrow table.
+
+        Parameters
+        ----------
+        engine : str
+            The polars engine to execute polars plans with. The `streaming`
+            engine processes the data in chunks, so sorts, group-bys and joins
+            over data larger than memory do not need it all in memory at once.
+            Duckdb plans always run on duckdb's own out-of-core engine.
+
+        """
+        if isinstance(self._plan, pl.LazyFrame):
+            return self._plan.collect(engine=engine).to_arrow()
+        return self._plan.fetch_arrow_table()
+
+    def to_batches(
+        self,
+        batch_size: int | None = None,
+        engine: str = "auto",
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Execute the plan and stream the result as arrow record batches.
+
+        With the polars `streaming` engine the result is produced in chunks
+        as well, instead of being collected before the first batch is yielded,
+        on polars versions that have `LazyFrame.collect_batches`.
+        """
+        if isinstance(self._plan, pl.LazyFrame) and engine == "streaming":
+            if hasattr(self._plan, "collect_batches"):
+                chunks = self._plan.collect_batches(
+                    chunk_size=batch_size, engine=engine
+                )
+            else:
+                # older polars only stream the collection, not its result
+                df = self._plan.collect(engine=engine)
+                chunks = df.iter_slices(batch_size) if batch_size else [df]
+            for df in chunks:
+                yield from df.to_arrow().to_batches(max_chunksize=batch_size)
+            return
+
+        if isinstance(self._plan, pl.LazyFrame):
+            yield from self.collect(engine).to_batches(max_chunksize=batch_size)
+            return
+
+        # `fetch_arrow_reader` is the spelling every supported duckdb has
+        yield from self._plan.fetch_arrow_reader(batch_size or 1_000_000)
+
+
 # Internal representation of data - depends on the chosen backend.
-IR = Union[bytes, pl.Series, pl.DataFrame, pa.Table, duckdb.DuckDBPyConnection]
+IR = Union[
+    bytes,
+    pa.Buffer,
+    pl.Series,
+    pl.DataFrame,
+    pa.Table,
+    duckdb.DuckDBPyRelation,
+    LazyIR,
+]
+
+
+class ConversionStats:
+    """
+    Running totals of the conversions between backend IRs.
+
+    Every conversion records how many bytes of its result live in newly
+    allocated buffers rather than in buffers shared with its input, which
+    makes hidden full-table copies in a pipeline visible. Conversions from
+    or to polars are measured by the columns polars has to rebuild, without
+    exporting the dataframe to arrow once more.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty totals."""
+        self._lock = threading.Lock()
+        self._totals: dict[str, dict[str, int]] = {}
+
+    def record(self, source: str, target: str, bytes_copied: int) -> None:
+        """Record a conversion from the `source` to the `target` representation."""
+        with self._lock:
+            totals = self._totals.setdefault(
+                f"{source}->{target}", {"conversions": 0, "bytes_copied": 0}
+            )
+            totals["conversions"] += 1
+            totals["bytes_copied"] += bytes_copied
+
+    @property
+    def bytes_copied(self) -> int:
+        """Get the total number of bytes copied by all conversions."""
+        with self._lock:
+            return sum(t["bytes_copied"] for t in self._totals.values())
+
+    def as_dict(self) -> dict[str, dict[str, int]]:
+        """Get the totals per conversion, e.g. `{"arrow->polars": {...}}`."""
+        with self._lock:
+            return {key: dict(totals) for key, totals in self._totals.items()}
+
+    def reset(self) -> None:
+        """Reset all totals to zero."""
+        with self._lock:
+            self._totals.clear()
+
+
+_conversion_stats = ConversionStats()
+
+
+def get_conversion_stats() -> ConversionStats:
+    """Get the conversion totals of all backends in this process."""
+    return _conversion_stats
+
+
+def _buffers(data: Any) -> list[pa.Buffer]:
+    """Collect the physical buffers backing arrow or bytes data."""
+    if isinstance(data, bytes):
+        return [pa.py_buffer(data)]
+    if isinstance(data, pa.Buffer):
+        return [data]
+    if isinstance(data, (pa.Table, pa.RecordBatch)):
+        data = data.columns
+    elif isinstance(data, pa.ChunkedArray):
+        data = data.chunks
+    elif isinstance(data, pa.Array):
+        data = [data]
+    else:
+        return []
+
+    buffers = []
+    for array in data:
+        for chunk in array.chunks if isinstance(array, pa.ChunkedArray) else [array]:
+            buffers.extend(b for b in chunk.buffers() if b is not None)
+    return buffers
+
+
+def _copied_bytes(source: Any, result: Any) -> int:
+    """Count the bytes of `result` held in buffers not shared with `source`."""
+    ranges = sorted((b.address, b.address + b.size) for b in _buffers(source))
+    starts = [start for start, _ in ranges]
+
+    copied = 0
+    for buffer in _buffers(result):
+        i = bisect.bisect_right(starts, buffer.address) - 1
+        if i < 0 or buffer.address + buffer.size > ranges[i][1]:
+            copied += buffer.size
+    return copied
+
+
+def _rebuilt_by_polars(data_type: pa.DataType) -> bool:
+    """Check if polars copies arrow data of this type into a layout of its own."""
+    if pa.types.is_struct(data_type):
+        return any(_rebuilt_by_polars(field.type) for field in data_type)
+    if pa.types.is_large_list(data_type) or pa.types.is_fixed_size_list(data_type):
+        return _rebuilt_by_polars(data_type.value_type)
+    if pa.types.is_timestamp(data_type) or pa.types.is_duration(data_type):
+        return data_type.unit == "s"
+    if pa.types.is_time64(data_type):
+        return data_type.unit != "ns"
+    return (
+        pa.types.is_string(data_type)
+        or pa.types.is_large_string(data_type)
+        or pa.types.is_binary(data_type)
+        or pa.types.is_large_binary(data_type)
+        or pa.types.is_fixed_size_binary(data_type)
+        or pa.types.is_dictionary(data_type)
+        or pa.types.is_list(data_type)
+        or pa.types.is_time32(data_type)
+    )
+
+
+def _polars_import_copies(source: pa.Table, result: pl.DataFrame) -> int:
+    """
+    Count the bytes polars allocated to import an arrow table.
+
+    Polars keeps the arrow buffers of most types as they are, and rebuilds
+    the others (strings, categoricals, lists with 32-bit offsets, ...) into
+    its own layout. Only the rebuilt columns, or struct fields, are measured,
+    so the result is never exported back to arrow.
+    """
+
+    def copies(data_type: pa.DataType, series: pl.Series) -> int:
+        if not _rebuilt_by_polars(data_type):
+            return 0
+        if pa.types.is_struct(data_type):
+            return sum(
+                copies(field.type, series.struct.field(field.name))
+                for field in data_type
+            )
+        return series.estimated_size()
+
+    return sum(
+        copies(field.type, result.get_column(field.name)) for field in source.schema
+    )
+
+
+def _polars_export_copies(result: pa.Table | pa.Array) -> int:
+    """
+    Count the bytes polars allocated to export a dataframe to arrow.
+
+    Polars stores strings and binaries as views and categoricals with indices
+    of its own, so the export builds those buffers. All other buffers of the
+    result are the ones of the dataframe.
+    """
+
+    def copies(array: pa.Array) -> int:
+        data_type = array.type
+        if (
+            pa.types.is_string(data_type)
+            or pa.types.is_large_string(data_type)
+            or pa.types.is_binary(data_type)
+            or pa.types.is_large_binary(data_type)
+        ):
+            return array.get_total_buffer_size()
+        if pa.types.is_dictionary(data_type):
+            return array.indices.get_total_buffer_size() + copies(array.dictionary)
+        if pa.types.is_struct(data_type):
+            return sum(copies(array.field(i)) for i in range(data_type.num_fields))
+        if (
+            pa.types.is_list(data_type)
+            or pa.types.is_large_list(data_type)
+            or pa.types.is_fixed_size_list(data_type)
+        ):
+            return copies(array.values)
+        return 0
+
+    if isinstance(result, pa.Array):
+        return copies(result)
+    return sum(copies(chunk) for column in result.columns for chunk in column.chunks)
+
+
+def _convert(source_kind: str, target_kind: str, source: Any, result: Any) -> Any:
+    """Record the conversion of `source` to `result` and return the result."""
+    if isinstance(result, pl.DataFrame):
+        copied = _polars_import_copies(source, result)
+    elif isinstance(source, (pl.DataFrame, pl.Series)):
+        copied = _polars_export_copies(result)
+    else:
+        copied = _copied_bytes(source, result)
+    _conversion_stats.record(source_kind, target_kind, copied)
+    return result
 
 
 class BackendMismatchWarning(Warning):
@@ -29,6 +347,50 @@ class BaseBackend(abc.ABC):
     def ir_to_arrow_table(self, data: IR) -> pa.Table:
         pass
 
+    def ir_to_polars_df(self, data: IR) -> pl.DataFrame:
+        """Convert the backend IR to a polars dataframe, through arrow."""
+        table = self.ir_to_arrow_table(data)
+        return _convert("arrow", "polars", table, pl.from_arrow(table))
+
+    def ir_from_polars(self, data: pl.DataFrame | pl.Series) -> IR:
+        """Convert a polars dataframe to the backend IR, through arrow."""
+        table = _convert("polars", "arrow", data, data.to_arrow())
+        return self.ir_from_arrow_table(table)
+
+    def ir_from_lazy(self, data: LazyIR) -> IR:
+        """Execute a lazy plan and materialize the result in the backend IR."""
+        return self.ir_from_arrow_table(data.collect())
+
+    def set_memory_limit(
+        self,
+        memory_limit: int | str | None = None,
+        temp_directory: str | Path | None = None,
+    ) -> None:
+        """
+        Bound the memory used by the backend engine, spilling to disk beyond it.
+
+        The default implementation does nothing, backends with an engine that
+        can spill should override this.
+
+        Parameters
+        ----------
+        memory_limit : int | str | None
+            The memory budget, either in bytes or as a string like `"64GB"`.
+        temp_directory : str | Path | None
+            The scratch directory spilled data is written to.
+
+        """
+        pass
+
+    def lazy_from_arrow_dataset(self, dataset: ds.Dataset) -> LazyIR:
+        """
+        Create a lazy plan scanning an arrow dataset.
+
+        Columns selected and predicates filtered on in the plan are pushed into
+        the dataset scanner, i.e. `dataset.scanner(columns=..., filter=...)`.
+        """
+        return LazyIR(pl.scan_pyarrow_dataset(dataset))
+
 
 class ArrowBackend(BaseBackend):
     """Implementation of an arrow in-memory table backend."""
@@ -41,21 +403,18 @@ class ArrowBackend(BaseBackend):
         """This is a no-op."""
         return data
 
-    def ir_to_polars_df(self, data: pa.Table) -> pl.DataFrame:
-        return pl.from_arrow(data)
-
     def ir_from_polars(self, data: pl.DataFrame | pl.Series) -> pa.Table:
-        return data.to_arrow()
+        return _convert("polars", "arrow", data, data.to_arrow())
 
 
 class PolarsBackend(BaseBackend):
     """Implementation of a polars in-memory dataframe backend."""
 
     def ir_from_arrow_table(self, table: pa.Table) -> IR:
-        return pl.from_arrow(table)
+        return _convert("arrow", "polars", table, pl.from_arrow(table))
 
     def ir_to_arrow_table(self, data: pl.DataFrame) -> pa.Table:
-        return data.to_arrow()
+        return _convert("polars", "arrow", data, data.to_arrow())
 
     def ir_to_polars_df(self, data: pl.DataFrame) -> pl.DataFrame:
         return data
@@ -65,40 +424,92 @@ class PolarsBackend(BaseBackend):
 
 
 class DuckdbBackend(BaseBackend):
-    """Implementation of a duckdb in-memory database backend."""
-
-    def __init__(self) -> None:
-        """Initialize in-memory database connection."""
-        self._conn = duckdb.connect(database=":memory:")
-
-    def ir_from_arrow_table(self, table: pa.Table) -> IR:
-        return self._conn.register("tmp_arrow_data", table)
-
-    def ir_to_arrow_table(self, data: duckdb.DuckDBPyConnection) -> pa.Table:
-        return data.execute("SELECT * FROM tmp_arrow_data;").fetch_arrow_table()
+    """
+    Implementation of a duckdb in-memory database backend.
+
+    The IR is a lazy `DuckDBPyRelation`. Each arrow table becomes its own
+    relation, scanned in place under a unique name, so I/O objects sharing a
+    backend never overwrite each other's data. Transforms chain SQL onto the
+    relation without executing it, and file targets write it out with
+    duckdb's own parallel writers, so the data only leaves duckdb when a
+    target needs arrow. Relations keep the connection of the backend open,
+    so they stay usable after the backend object is gone.
+    """
+
+    def __init__(self, connection: duckdb.DuckDBPyConnection | None = None) -> None:
+        """Initialize the backend on `connection`, or an in-memory database."""
+        self._conn = connection or duckdb.connect(database=":memory:")
+
+    @property
+    def connection(self) -> duckdb.DuckDBPyConnection:
+        """Get the duckdb connection the relations are created on."""
+        return self._conn
+
+    def set_memory_limit(
+        self,
+        memory_limit: int | str | None = None,
+        temp_directory: str | Path | None = None,
+    ) -> None:
+        """
+        Set the duckdb `memory_limit` and `temp_directory` of the connection.
+
+        Sorts, aggregates and joins that exceed the limit spill their
+        intermediates to the temp directory instead of failing.
+        """
+        if isinstance(memory_limit, int):
+            memory_limit = f"{memory_limit // 2**20}MiB"
+        if memory_limit is not None:
+            self._conn.execute("SET memory_limit = ?", [memory_limit])
+        if temp_directory is not None:
+            self._conn.execute("SET temp_directory = ?", [str(temp_directory)])
+
+    def ir_from_arrow_table(self, table: pa.Table) -> duckdb.DuckDBPyRelation:
+        # the relation scans the arrow table in place
+        _conversion_stats.record("arrow", "duckdb", 0)
+        return _keep_alive(self._conn.from_arrow(table), self._conn)
+
+    def ir_to_arrow_table(self, data: duckdb.DuckDBPyRelation) -> pa.Table:
+        return _convert("duckdb", "arrow", None, data.fetch_arrow_table())
+
+    def ir_from_lazy(self, data: LazyIR) -> duckdb.DuckDBPyRelation:
+        """Keep duckdb plans lazy, other plans are executed."""
+        if isinstance(data.plan, duckdb.DuckDBPyRelation):
+            return data.plan
+        return super().ir_from_lazy(data)
+
+    def lazy_from_arrow_dataset(self, dataset: ds.Dataset) -> LazyIR:
+        """Create a lazy duckdb relation scanning an arrow dataset."""
+        return LazyIR(_keep_alive(self._conn.from_arrow(dataset), self._conn))
 
 
 class BytesBackend(BaseBackend):
-    """Implementation of a bytes in-memory backend."""
+    """
+    Implementation of a bytes in-memory backend.
 
-    def bytes_from_ir(self, _bytes: bytes) -> bytes:
-        return _bytes
+    The IR is an arrow `Buffer` (python `bytes` are accepted as well), so
+    bytes are passed between the I/O objects without copying them into
+    python objects.
+    """
 
-    def ir_from_bytes(self, _bytes: bytes) -> bytes:
-        return _bytes
+    def bytes_from_ir(self, data: pa.Buffer | bytes) -> pa.Buffer | bytes:
+        return data
+
+    def ir_from_bytes(self, data: pa.Buffer | bytes) -> pa.Buffer | bytes:
+        return data
 
-    def ir_from_arrow_table(self, table: pa.Table) -> bytes:
+    def ir_from_arrow_table(self, table: pa.Table) -> pa.Buffer:
         # We need to serialize the table to bytes using ipc
         sink = pa.BufferOutputStream()
         with ipc.new_stream(sink, table.schema) as stream:
             stream.write_table(table)
 
-        return sink.getvalue().to_pybytes()
+        return _convert("arrow", "bytes", table, sink.getvalue())
 
-    def ir_to_arrow_table(self, _bytes: bytes) -> pa.Table:
-        buffer = pa.py_buffer(_bytes)
+    def ir_to_arrow_table(self, data: pa.Buffer | bytes) -> pa.Table:
+        # the columns of the table read back are slices of the ipc buffer
+        buffer = pa.py_buffer(data) if isinstance(data, bytes) else data
         with ipc.open_stream(buffer) as reader:
-            return reader.read_all()
+            return _convert("bytes", "arrow", buffer, reader.read_all())
 
 
 _current_backend: BaseBackend = PolarsBackend()
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+import polars as pl
+import pyarrow as pa
+
+from .ir import get_conversion_stats
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on windows
+    resource = None
+
+_active = threading.local()
+
+# the innermost stage measured on every thread, read by `ResourceMonitor`
+_active_stages: dict[int, str] = {}
+
+
+def _active_stage_labels() -> tuple[str, ...]:
+    """Get the labels of the stages currently doing work, on any thread."""
+    return tuple(sorted(set(_active_stages.values())))
+
+
+def _max_rss() -> int:
+    """Get the peak resident set size of the process so far, in bytes."""
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macos bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _size(data: Any) -> tuple[int | None, int | None]:
+    """Get the number of rows and bytes of data, if known without computing it."""
+    if isinstance(data, (pa.Table, pa.RecordBatch)):
+        return data.num_rows, data.nbytes
+    if isinstance(data, pl.DataFrame):
+        return data.height, data.estimated_size()
+    if isinstance(data, (bytes, pa.Buffer)):
+        return None, len(data)
+    # e.g. lazy plans and relations, which have not been executed yet
+    return None, None
+
+
+def _add(total: int | None, value: int | None) -> int | None:
+    if value is None:
+        return total
+    return value if total is None else total + value
+
+
+class _Measurement:
+    """
+    Time spent in a block of code on the current thread.
+
+    Measurements nest: the time of a measurement is reported exclusive of the
+    measurements started inside it on the same thread, so a writer pulling
+    batches from a reader is not charged for the reading.
+    """
+
+    def __init__(self, stage: StageMetrics | None, cpu_clock: Callable[[], float]):
+        self._stage = stage
+        self._cpu_clock = cpu_clock
+        self._nested = [0.0, 0.0, 0]
+
+    def __enter__(self) -> _Measurement:
+        stack = _active.__dict__.setdefault("stack", [])
+        self._parent = stack[-1] if stack else None
+        stack.append(self)
+        self._start = (time.perf_counter(), self._cpu_clock(), _max_rss())
+        thread = threading.get_ident()
+        self._outer_label = _active_stages.get(thread)
+        if self._stage is not None:
+            _active_stages[thread] = self._stage.label
+            if self._stage.start_time_ns is None:
+                self._stage.start_time_ns = time.time_ns()
+        else:
+            # waiting on another stage, which tags itself while it works
+            _active_stages.pop(thread, None)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _active.stack.pop()
+        thread = threading.get_ident()
+        if self._outer_label is None:
+            _active_stages.pop(thread, None)
+        else:
+            _active_stages[thread] = self._outer_label
+        wall = time.perf_counter() - self._start[0]
+        cpu = self._cpu_clock() - self._start[1]
+        rss = _max_rss() - self._start[2]
+        if self._parent is not None:
+            self._parent._nested[0] += wall
+            self._parent._nested[1] += cpu
+            self._parent._nested[2] += rss
+
+        stage = self._stage
+        if stage is not None:
+            stage.wall_time += wall - self._nested[0]
+            stage.cpu_time += cpu - self._nested[1]
+            stage.peak_rss_delta += rss - self._nested[2]
+            stage.end_time_ns = time.time_ns()
+
+
+class StageMetrics:
+    """
+    Measurements of one stage of a pipeline run.
+
+    Attributes
+    ----------
+    name : str
+        The name of the source, transform or target.
+    kind : str
+        One of "read", "transform", "execute" (running a lazy plan) or "write".
+    wall_time : float
+        Seconds spent in the stage, excluding time spent waiting on the
+        stages feeding it.
+    cpu_time : float
+        Seconds of cpu time spent in the stage. Pipelined runs count the
+        thread running the stage only, other runs the whole process, which
+        includes the worker threads of the engines.
+    rows_in, rows_out, bytes_in, bytes_out : int | None
+        The size of the data that went in and came out of the stage, `None`
+        while it is not known, e.g. for lazy plans that have not run yet.
+    batches : int
+        The number of batches (or whole datasets, when not streaming) that
+        passed through the stage.
+    peak_rss_delta : int
+        How many bytes the stage raised the peak memory usage of the process.
+
+    """
+
+    def __init__(self, name: str, kind: str, cpu_clock: Callable[[], float]) -> None:
+        """Initialize empty measurements."""
+        self.name = name
+        self.kind = kind
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.rows_in: int | None = None
+        self.rows_out: int | None = None
+        self.bytes_in: int | None = None
+        self.bytes_out: int | None = None
+        self.batches = 0
+        self.peak_rss_delta = 0
+        self.start_time_ns: int | None = None
+        self.end_time_ns: int | None = None
+        self._cpu_clock = cpu_clock
+
+    @property
+    def label(self) -> str:
+        """Get the label of the stage, e.g. `"read:CsvFile"`."""
+        return f"{self.kind}:{self.name}"
+
+    def measure(self) -> _Measurement:
+        """Measure a block of code as work of this stage."""
+        return _Measurement(self, self._cpu_clock)
+
+    def record_in(self, data: Any) -> None:
+        """Record data going into the stage."""
+        rows, n_bytes = _size(data)
+        self.rows_in = _add(self.rows_in, rows)
+        self.bytes_in = _add(self.bytes_in, n_bytes)
+        if self.kind == "write":
+            self.batches += 1
+
+    def record_out(self, data: Any) -> None:
+        """Record data coming out of the stage."""
+        rows, n_bytes = _size(data)
+        self.rows_out = _add(self.rows_out, rows)
+        self.bytes_out = _add(self.bytes_out, n_bytes)
+        self.batches += 1
+
+    def produce(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Measure producing every item of `items` as work of this stage."""
+        items = iter(items)
+        while True:
+            with self.measure():
+                item = next(items, _DONE)
+            if item is _DONE:
+                return
+            self.record_out(item)
+            yield item
+
+    def consume(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Record the items the stage consumes, without charging it for them."""
+        items = iter(items)
+        while True:
+            with _Measurement(None, self._cpu_clock):
+                item = next(items, _DONE)
+            if item is _DONE:
+                return
+            self.record_in(item)
+            yield item
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the measurements as a json serializable dict."""
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "batches": self.batches,
+            "peak_rss_delta": self.peak_rss_delta,
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+        }
+
+
+_DONE = object()
+
+
+class RunReport:
+    """
+    The structured report of a pipeline run, returned by `Pipeline.run`.
+
+    It holds the `StageMetrics` of the source, every transform and the target
+    in pipeline order, and can be exported as json or as OpenTelemetry spans.
+    """
+
+    def __init__(self, mode: str) -> None:
+        """Initialize the report of a run in the given mode."""
+        self.mode = mode
+        self.stages: list[StageMetrics] = []
+        self.error: str | None = None
+        self.bytes_copied = 0
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: int | None = None
+        self._start = time.perf_counter()
+        self._bytes_copied_at_start = get_conversion_stats().bytes_copied
+        self._cpu_clock = time.thread_time if mode == "pipelined" else time.process_time
+
+    @property
+    def wall_time(self) -> float:
+        """Get the seconds the run took."""
+        if self.end_time_ns is None:
+            return time.perf_counter() - self._start
+        return (self.end_time_ns - self.start_time_ns) / 1e9
+
+    def stage(self, name: str, kind: str) -> StageMetrics:
+        """Add a stage to the report."""
+        stage = StageMetrics(name, kind, self._cpu_clock)
+        self.stages.append(stage)
+        return stage
+
+    def finish(self, error: BaseException | None = None) -> None:
+        """Close the report once the run succeeded or failed with `error`."""
+        self.end_time_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.bytes_copied = (
+            get_conversion_stats().bytes_copied - self._bytes_copied_at_start
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the report as a json serializable dict."""
+        return {
+            "mode": self.mode,
+            "wall_time": self.wall_time,
+            "error": self.error,
+            "bytes_copied": self.bytes_copied,
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+            "stages": [stage.as_dict() for stage in self.stages],
+        }
+
+    def to_json(self, **kwargs) -> str:
+        """Serialize the report to json, `kwargs` are passed to `json.dumps`."""
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def to_otel_spans(self, trace_id: str | None = None) -> list[dict[str, Any]]:
+        """
+        Export the report as spans in the OpenTelemetry (OTLP) json encoding.
+
+        The run is the root span with one child span per stage, its time
+        range spanning the first to the last moment the stage did work. The
+        measurements become `evolve.*` attributes.
+
+        Parameters
+        ----------
+        trace_id : str | None
+            The 32 hex digit id of the trace to add the spans to, a new trace
+            by default.
+
+        Returns
+        -------
+        list[dict[str, Any]]
+            The spans, ready to be put in the `spans` of an OTLP `ScopeSpans`.
+
+        """
+        trace_id = trace_id or os.urandom(16).hex()
+        root_id = os.urandom(8).hex()
+
+        def attributes(values: dict[str, Any]) -> list[dict[str, Any]]:
+            encoded = []
+            for key, value in values.items():
+                if value is None:
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    encoded.append({"key": key, "value": {"stringValue": str(value)}})
+                elif isinstance(value, int):
+                    # 64 bit integers are strings in the OTLP json encoding
+                    encoded.append({"key": key, "value": {"intValue": str(value)}})
+                else:
+                    encoded.append({"key": key, "value": {"doubleValue": value}})
+            return encoded
+
+        root = {
+            "traceId": trace_id,
+            "spanId": root_id,
+            "name": "evolve.pipeline.run",
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or time.time_ns()),
+            "attributes": attributes(
+                {"evolve.mode": self.mode, "evolve.bytes_copied": self.bytes_copied}
+            ),
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        spans = [root]
+        for stage in self.stages:
+            if stage.start_time_ns is None:
+                continue
+            values = stage.as_dict()
+            del values["start_time_ns"], values["end_time_ns"]
+            spans.append(
+                {
+                    "traceId": trace_id,
+                    "spanId": os.urandom(8).hex(),
+                    "parentSpanId": root_id,
+                    "name": f"evolve.{stage.kind}: {stage.name}",
+                    "kind": 1,
+                    "startTimeUnixNano": str(stage.start_time_ns),
+                    "endTimeUnixNano": str(stage.end_time_ns),
+                    "attributes": attributes(
+                        {f"evolve.{key}": value for key, value in values.items()}
+                    ),
+                }
+            )
+        return spans
+
+    def __str__(self) -> str:
+        lines = [f"RunReport(mode={self.mode}, wall_time={self.wall_time:.3f}s)"]
+        for s in self.stages:
+            rows = s.rows_out if s.rows_out is not None else s.rows_in
+            lines.append(
+                f"  {s.kind:<9} {s.name:<24} wall={s.wall_time:.3f}s "
+                f"cpu={s.cpu_time:.3f}s rows={'?' if rows is None else rows} "
+                f"batches={s.batches}"
+            )
+        return "\n".join(lines)
@@ -1,10 +1,35 @@
 from __future__ import annotations
 
+import functools
+import logging
+import threading
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
+import pyarrow as pa
 import yaml
 
-from .transform import Transform
+from ._channel import _Channel, _run_concurrently
+from .ir import IR, DuckdbBackend, LazyIR
+from .metrics import RunReport, StageMetrics
+from .transform import Transform, fuse
+
+_logger = logging.getLogger(__name__)
+
+
+def _apply(
+    transform: Transform,
+    ir: IR,
+    stage: StageMetrics,
+    record_in: bool = True,
+) -> IR:
+    """Apply a transform, measuring it as `stage`."""
+    if record_in:
+        stage.record_in(ir)
+    with stage.measure():
+        ir = transform.apply(ir)
+    stage.record_out(ir)
+    return ir
 
 
 class Pipeline:
@@ -63,6 +88,11 @@ class Pipeline:
         s += ")"
         return s
 
+    @property
+    def _fused_transforms(self) -> list[Transform]:
+        """The transforms, with adjacent built-in transforms fused into one."""
+        return fuse(self._transforms)
+
     def with_source(self, s) -> Pipeline:
         self._source = s
         return self
@@ -75,12 +105,245 @@ class Pipeline:
         self._transforms.append(t)
         return self
 
-    def run(self) -> None:
-        print("Running pipeline")
-        print(f"  Loading data from source: '{self._source._name}'")
-        ir = self._source.read()
-        for transform in self._transforms:
-            print(f"  - Applying transform: '{transform.name}'")
-            ir = transform.apply(ir)
-        print(f"  Writing data to target: '{self._target._name}'")
-        self._target.write(ir)
+    def run(
+        self,
+        *,
+        lazy: bool = False,
+        streaming: bool = False,
+        pipelined: bool = False,
+        batch_size: int | None = None,
+        queue_depth: int = 4,
+        memory_limit: int | str | None = None,
+        temp_directory: str | Path | None = None,
+        callbacks: Iterable[Callable[[RunReport], None]] = (),
+    ) -> RunReport:
+        """
+        Run the pipeline.
+
+        Parameters
+        ----------
+        lazy : bool
+            Whether to build a lazy query plan over the source with `scan`
+            instead of reading it. Transforms then receive a `LazyIR` and their
+            column selections and filters are pushed down into the source, and
+            the result is streamed into the target as arrow record batches.
+        streaming : bool
+            Whether to stream the data from the source to the target as arrow
+            record batches instead of materializing the full dataset in memory.
+            Transforms are applied to one batch at a time, so peak memory
+            depends on the batch size and not on the size of the source.
+        pipelined : bool
+            Whether to stream with the source reader, the transform chain and
+            the target writer each running on their own thread, so reading,
+            transforming and writing overlap. Implies `streaming`.
+        batch_size : int | None
+            The maximum number of rows per record batch when streaming,
+            defaults to the natural chunking of the source.
+        queue_depth : int
+            The maximum number of record batches buffered between two stages
+            when pipelined. A full queue blocks the stage feeding it, which
+            bounds memory to roughly `queue_depth` batches per queue.
+        memory_limit : int | str | None
+            The memory budget of the run, in bytes or as a string like
+            `"64GB"`. Engines that can spill are set up to stay within it:
+            duckdb backends get it as their `memory_limit`, and lazy polars
+            plans are executed with the polars streaming engine. Transforms
+            that sort, group or join data larger than memory therefore need
+            either `lazy` or the duckdb backend.
+        temp_directory : str | Path | None
+            The scratch directory the engines spill to when over budget.
+        callbacks : Iterable[Callable[[RunReport], None]]
+            Called with the report once the run finished, also when it failed,
+            e.g. to ship it to a metrics or tracing backend.
+
+        Returns
+        -------
+        RunReport
+            The wall time, cpu time, rows, bytes, batches and peak memory
+            growth of reading the source, every transform and writing the
+            target. In lazy runs the transforms only build the plan, which
+            runs in an "execute" stage.
+
+        Once the data has been written, the source commits its progress, so
+        incremental sources only extract new data on the next run. A failed
+        run commits nothing and the next run extracts the same data again.
+
+        """
+        out_of_core = memory_limit is not None or temp_directory is not None
+        if out_of_core:
+            backends = {
+                id(io.backend): io.backend for io in (self._source, self._target)
+            }
+            for backend in backends.values():
+                backend.set_memory_limit(memory_limit, temp_directory)
+
+        if lazy:
+            mode = "lazy"
+        elif pipelined:
+            mode = "pipelined"
+        elif streaming:
+            mode = "streaming"
+        else:
+            mode = "eager"
+
+        report = RunReport(mode)
+        _logger.info("running pipeline (%s)", mode)
+        try:
+            if lazy:
+                self._run_lazy(
+                    report,
+                    batch_size=batch_size,
+                    engine="streaming" if out_of_core else "auto",
+                )
+            elif pipelined:
+                self._run_pipelined(
+                    report, batch_size=batch_size, queue_depth=queue_depth
+                )
+            elif streaming:
+                self._run_streaming(report, batch_size=batch_size)
+            else:
+                self._run_eager(report)
+        except BaseException as e:
+            report.finish(e)
+            raise
+        else:
+            report.finish()
+            self._source.commit()
+        finally:
+            _logger.info("%s", report)
+            for callback in callbacks:
+                callback(report)
+
+        return report
+
+    def _run_eager(self, report: RunReport) -> None:
+        read = report.stage(self._source.name, "read")
+        _logger.info("loading data from source: '%s'", self._source.name)
+        with read.measure():
+            ir = self._source.read()
+        read.record_out(ir)
+
+        for transform in self._fused_transforms:
+            _logger.info("applying transform: '%s'", transform.name)
+            ir = _apply(transform, ir, report.stage(transform.name, "transform"))
+
+        write = report.stage(self._target.name, "write")
+        _logger.info("writing data to target: '%s'", self._target.name)
+        write.record_in(ir)
+        with write.measure():
+            self._target.write(ir)
+
+    def _run_lazy(self, report: RunReport, batch_size: int | None, engine: str) -> None:
+        read = report.stage(self._source.name, "read")
+        _logger.info("scanning data from source: '%s'", self._source.name)
+        with read.measure():
+            ir = self._source.scan()
+
+        for transform in self._fused_transforms:
+            _logger.info("adding transform to plan: '%s'", transform.name)
+            ir = _apply(transform, ir, report.stage(transform.name, "transform"))
+
+        _logger.info("writing data to target: '%s'", self._target.name)
+        if isinstance(ir, LazyIR) and isinstance(self._target.backend, DuckdbBackend):
+            # hand the plan to the target as a relation, so it can be written
+            # out by duckdb without passing through arrow, which also runs it
+            write = report.stage(self._target.name, "write")
+            with write.measure():
+                self._target.write(self._target.backend.ir_from_lazy(ir))
+        elif isinstance(ir, LazyIR):
+            execute = report.stage("plan", "execute")
+            write = report.stage(self._target.name, "write")
+            batches = execute.produce(
+                ir.to_batches(batch_size=batch_size, engine=engine)
+            )
+            with write.measure():
+                self._target.write_batches(write.consume(batches))
+        else:
+            write = report.stage(self._target.name, "write")
+            write.record_in(ir)
+            with write.measure():
+                self._target.write(ir)
+
+    def _run_streaming(self, report: RunReport, batch_size: int | None) -> None:
+        read = report.stage(self._source.name, "read")
+        _logger.info("streaming data from source: '%s'", self._source.name)
+        batches = read.produce(self._source.read_batches(batch_size=batch_size))
+        if self._transforms:
+            batches = self._transform_batches(batches, report)
+
+        write = report.stage(self._target.name, "write")
+        _logger.info("streaming data to target: '%s'", self._target.name)
+        with write.measure():
+            self._target.write_batches(write.consume(batches))
+
+    def _run_pipelined(
+        self,
+        report: RunReport,
+        batch_size: int | None,
+        queue_depth: int,
+    ) -> None:
+        abort = threading.Event()
+
+        def pump(batches: Iterable[pa.RecordBatch], channel: _Channel) -> None:
+            for batch in batches:
+                channel.put(batch)
+            channel.close()
+
+        read = report.stage(self._source.name, "read")
+        _logger.info("streaming data from source: '%s'", self._source.name)
+        channel = _Channel(queue_depth, abort)
+        stages = [
+            functools.partial(
+                pump,
+                read.produce(self._source.read_batches(batch_size=batch_size)),
+                channel,
+            )
+        ]
+
+        if self._transforms:
+            transformed = _Channel(queue_depth, abort)
+            stages.append(
+                functools.partial(
+                    pump, self._transform_batches(channel, report), transformed
+                )
+            )
+            channel = transformed
+
+        write_stage = report.stage(self._target.name, "write")
+
+        def write() -> None:
+            with write_stage.measure():
+                self._target.write_batches(write_stage.consume(channel))
+            # the writer might return without draining the channel, which
+            # would leave the upstream stages blocked on a full queue
+            abort.set()
+
+        _logger.info("streaming data to target: '%s'", self._target.name)
+        _run_concurrently(stages, write, abort)
+
+    def _transform_batches(
+        self,
+        batches: Iterable[pa.RecordBatch],
+        report: RunReport,
+    ) -> Iterator[pa.RecordBatch]:
+        """Apply all transforms to each record batch in the source backend IR."""
+        backend = self._source.backend
+        transforms = self._fused_transforms
+        stages = []
+        for transform in transforms:
+            _logger.info("applying transform per batch: '%s'", transform.name)
+            stages.append(report.stage(transform.name, "transform"))
+
+        def transform_batches() -> Iterator[pa.RecordBatch]:
+            # the conversions from and to arrow are charged to the first and
+            # the last transform
+            for batch in stages[0].consume(batches):
+                with stages[0].measure():
+                    ir = backend.ir_from_arrow_table(pa.Table.from_batches([batch]))
+                for transform, stage in zip(transforms, stages):
+                    ir = _apply(transform, ir, stage, record_in=stage is not stages[0])
+                with stages[-1].measure():
+                    out = backend.ir_to_arrow_table(ir).to_batches()
+                yield from out
+
+        return transform_batches()
@@ -0,0 +1,110 @@
+import datetime
+import json
+import threading
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from pyarrow import fs
+
+from ._utils import _try_get_file_system_from_uri
+
+_TYPE_TAG = "__evolve_type__"
+
+
+def _encode(value: Any) -> Any:
+    """Tag values that have no native json representation."""
+    if isinstance(value, datetime.datetime):
+        return {_TYPE_TAG: "datetime", "value": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {_TYPE_TAG: "date", "value": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {_TYPE_TAG: "decimal", "value": str(value)}
+    if isinstance(value, dict):
+        return {key: _encode(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    return value
+
+
+def _decode(value: Any) -> Any:
+    """Reverse `_encode`."""
+    if isinstance(value, dict):
+        tag = value.get(_TYPE_TAG)
+        if tag == "datetime":
+            return datetime.datetime.fromisoformat(value["value"])
+        if tag == "date":
+            return datetime.date.fromisoformat(value["value"])
+        if tag == "decimal":
+            return Decimal(value["value"])
+        return {key: _decode(v) for key, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+class JsonStateStore:
+    """
+    A persistent key-value store for the progress of incremental sources.
+
+    Sources configured with a state store record a high-water mark under their
+    own key, e.g. the max value of a column read from a table, the next offset
+    per partition of a topic or the fingerprints of the files already read.
+    The pipeline persists the new marks once the data has been written, so
+    the next run only extracts what is new.
+
+    The state is kept in a single json file, which can live on any file
+    system supported by the I/O objects (e.g. `s3://bucket/state.json`).
+    """
+
+    def __init__(self, uri: str | Path, **options) -> None:
+        """
+        Initialize a new `JsonStateStore`.
+
+        Parameters
+        ----------
+        uri : str | Path
+            The uri of the json file, created on the first `set`.
+        **options
+            Used to set up the file system.
+
+        """
+        self._file_system, self._path = _try_get_file_system_from_uri(uri, **options)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        """Get the state recorded under `key`, or `None` if there is none."""
+        with self._lock:
+            return self._load().get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        """Record `value` as the state under `key`, replacing the previous one."""
+        with self._lock:
+            state = self._load()
+            state[key] = value
+            self._save(state)
+
+    def delete(self, key: str) -> None:
+        """Forget the state under `key`, so the next run extracts everything."""
+        with self._lock:
+            state = self._load()
+            if state.pop(key, None) is not None:
+                self._save(state)
+
+    def _load(self) -> dict[str, Any]:
+        info = self._file_system.get_file_info(self._path)
+        if info.type == fs.FileType.NotFound:
+            return {}
+        with self._file_system.open_input_stream(self._path) as f:
+            return _decode(json.loads(f.read()))
+
+    def _save(self, state: dict[str, Any]) -> None:
+        # write next to the state file and move it into place, so a crash
+        # mid-write never leaves a truncated state behind
+        tmp_path = self._path + ".tmp"
+        parent = self._path.rpartition("/")[0]
+        if parent:
+            self._file_system.create_dir(parent, recursive=True)
+        with self._file_system.open_output_stream(tmp_path) as f:
+            f.write(json.dumps(_encode(state), indent=2, sort_keys=True).encode())
+        self._file_system.move(tmp_path, self._path)
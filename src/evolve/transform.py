@@ -1,6 +1,13 @@
 import abc
+import datetime
+import uuid
+from typing import Iterable, Mapping
 
-from .ir import IR
+import duckdb
+import polars as pl
+import pyarrow as pa
+
+from .ir import IR, LazyIR, _keep_alive
 
 
 class Transform(abc.ABC):
@@ -14,6 +21,12 @@ class Transform(abc.ABC):
 
     Apache Arrow tables are immutable by design.
 
+    When a pipeline runs lazily the transform receives a `LazyIR` plan, and
+    should use its `select` and `filter` so they are pushed down into the
+    source instead of materializing the data. On the duckdb backend the
+    transform receives a lazy `DuckDBPyRelation`, which it should chain onto
+    instead of fetching.
+
     """
 
     def __init__(self, name: str) -> None:
@@ -28,3 +41,373 @@ class Transform(abc.ABC):
     def apply(self, data: IR) -> IR:
         """Apply the transform on the data."""
         pass
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_literal(value: str | datetime.datetime) -> str:
+    if isinstance(value, datetime.datetime):
+        return f"TIMESTAMP '{value.isoformat(sep=' ')}'"
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _polars_expr(expr: str | pl.Expr) -> pl.Expr:
+    """SQL expressions work on polars too, through `pl.sql_expr`."""
+    return pl.sql_expr(expr) if isinstance(expr, str) else expr
+
+
+def _sql_expr(expr: str | pl.Expr) -> str:
+    if not isinstance(expr, str):
+        raise TypeError("duckdb relations can only be transformed by SQL expressions")
+    return expr
+
+
+def _duckdb_with_columns(
+    rel: duckdb.DuckDBPyRelation,
+    columns: Mapping[str, str],
+) -> duckdb.DuckDBPyRelation:
+    """Add or replace the columns of a relation, like `with_columns` in polars."""
+    replaced = [
+        f"{expr} AS {_quote(name)}"
+        for name, expr in columns.items()
+        if name in rel.columns
+    ]
+    added = [
+        f"{expr} AS {_quote(name)}"
+        for name, expr in columns.items()
+        if name not in rel.columns
+    ]
+    star = f"* REPLACE ({', '.join(replaced)})" if replaced else "*"
+    return rel.project(", ".join([star, *added]))
+
+
+class ExprTransform(Transform):
+    """
+    Base class of the built-in vectorized transforms.
+
+    A built-in transform is defined once as polars lazy frame operations and
+    once as duckdb relation operations, so it runs vectorized on every
+    backend. Arrow tables are transformed with polars, which reads them
+    without copying. Expressions given as SQL strings work on all backends,
+    polars expressions only on polars and arrow data.
+
+    Lazy inputs stay lazy. Eager polars and arrow inputs are collected once
+    per `apply`, so adjacent transforms combined with `fuse` run as a single
+    optimized pass over the data instead of materializing every step.
+    """
+
+    @abc.abstractmethod
+    def _apply_polars(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        pass
+
+    @abc.abstractmethod
+    def _apply_duckdb(self, rel: duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+        pass
+
+    def apply(self, data: IR) -> IR:
+        """Apply the transform on the data."""
+        if isinstance(data, LazyIR):
+            return LazyIR(self.apply(data.plan))
+
+        if isinstance(data, duckdb.DuckDBPyRelation):
+            return _keep_alive(self._apply_duckdb(data), data)
+
+        if isinstance(data, pl.LazyFrame):
+            return self._apply_polars(data)
+
+        if isinstance(data, pl.DataFrame):
+            return self._apply_polars(data.lazy()).collect()
+
+        if isinstance(data, pa.Table):
+            return self._apply_polars(pl.from_arrow(data).lazy()).collect().to_arrow()
+
+        raise TypeError(f"cannot apply {self.name} to {type(data).__name__}")
+
+
+class FusedTransform(ExprTransform):
+    """A chain of built-in transforms applied as one transform."""
+
+    def __init__(self, transforms: Iterable[ExprTransform]) -> None:
+        """Initialize a new `FusedTransform` applying `transforms` in order."""
+        transforms = list(transforms)
+        super().__init__(" + ".join(t.name for t in transforms))
+        self._transforms = transforms
+
+    def _apply_polars(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        for transform in self._transforms:
+            lf = transform._apply_polars(lf)
+        return lf
+
+    def _apply_duckdb(self, rel: duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+        for transform in self._transforms:
+            rel = transform._apply_duckdb(rel)
+        return rel
+
+
+def fuse(transforms: Iterable[Transform]) -> list[Transform]:
+    """Combine every run of adjacent built-in transforms into one transform."""
+    fused = []
+    run = []
+    for transform in [*transforms, None]:
+        if isinstance(transform, ExprTransform):
+            run.append(transform)
+            continue
+
+        if len(run) > 1:
+            fused.append(FusedTransform(run))
+        else:
+            fused.extend(run)
+        run = []
+        if transform is not None:
+            fused.append(transform)
+
+    return fused
+
+
+class Select(ExprTransform):
+    """Keep only the given columns, in the given order."""
+
+    def __init__(self, *columns: str) -> None:
+        """Initialize a new `Select`."""
+        super().__init__("select")
+        self._columns = columns
+
+    def _apply_polars(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.select(self._columns)
+
+    def _apply_duckdb(self, rel: duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+        return rel.project(", ".join(_quote(c) for c in self._columns))
+
+
+class Rename(ExprTransform):
+    """Rename columns, given as a mapping of old to new names."""
+
+    def __init__(self, mapping: Mapping[str, str]) -> None:
+        """Initialize a new `Rename`."""
+        super().__init__("rename")
+        self._mapping = dict(mapping)
+
+    def _apply_polars(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.rename(self._mapping)
+
+    def _apply_duckdb(self, rel: duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+        return rel.project(
+            ", ".join(
+                f"{_quote(c)} AS {_quote(self._mapping.get(c, c))}" for c in rel.columns
+            )
+        )
+
+
+class Cast(ExprTransform):
+    """
+    Cast columns to new types, given as a mapping of column name to type.
+
+    Types given as SQL type names (e.g. `"BIGINT"`, `"DECIMAL(18, 2)"`) work
+    on all backends, polars data types only on polars and arrow data.
+    """
+
+    def __init__(self, mapping: Mapping[str, str | pl.DataType]) -> None:
+        """Initialize a new `Cast`."""
+        super().__init__("cast")
+        self._mapping = dict(mapping)
+
+    def _apply_polars(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.with_columns(
+            pl.sql_expr(f"CAST({_quote(c)} AS {t})").alias(c)
+            if isinstance(t, str)
+            else pl.col(c).cast(t)
+            for c, t in self._mapping.items()
+        )
+
+    def _apply_duckdb(self, rel: duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+        return _duckdb_with_columns(
+            rel,
+            {
+                c: f"CAST({_quote(c)} AS {_sql_expr(t)})"
+                for c, t in self._mapping.items()
+            },
+        )
+
+
+class Filter(ExprTransform):
+    """Keep only the rows matching a SQL or polars predicate."""
+
+    def __init__(self, predicate: str | pl.Expr) -> None:
+        """Initialize a new `Filter`."""
+        super().__init__("filter")
+        self._predicate = predicate
+
+    def _apply_polars(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.filter(_polars_expr(self._predicate))
+
+    def _apply_duckdb(self, rel: duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+        return rel.filter(_sql_expr(self._predicate))
+
+
+class WithColumns(ExprTransform):
+    """
+    Add derived columns, or replace existing ones, from SQL or polars expressions.
+
+    All expressions are evaluated against the input columns, e.g.
+    `WithColumns(total="price * quantity", year=pl.col("date").dt.year())`.
+    """
+
+    def __init__(self, **columns: str | pl.Expr) -> None:
+        """Initialize a new `WithColumns`."""
+        super().__init__("with_columns")
+        self._columns = columns
+
+    def _apply_polars(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.with_columns(
+            _polars_expr(expr).alias(name) for name, expr in self._columns.items()
+        )
+
+    def _apply_duckdb(self, rel: duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+        return _duckdb_with_columns(
+            rel, {name: _sql_expr(expr) for name, expr in self._columns.items()}
+        )
+
+
+class AddLoadMetadata(ExprTransform):
+    """
+    Add the `internal_loaded_time` and `internal_job_name` columns.
+
+    Every row gets the same load time, by default the time the transform was
+    created, so all data loaded by one job run shares it.
+    """
+
+    def __init__(
+        self,
+        job_name: str,
+        loaded_time: datetime.datetime | None = None,
+    ) -> None:
+        """Initialize a new `AddLoadMetadata`."""
+        super().__init__("add_load_metadata")
+        self._columns = {
+            "internal_loaded_time": loaded_time or datetime.datetime.now(),
+            "internal_job_name": job_name,
+        }
+
+    def _apply_polars(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.with_columns(
+            pl.lit(value).alias(name) for name, value in self._columns.items()
+        )
+
+    def _apply_duckdb(self, rel: duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+        return _duckdb_with_columns(
+            rel, {name: _sql_literal(value) for name, value in self._columns.items()}
+        )
+
+
+class Deduplicate(ExprTransform):
+    """
+    Drop duplicate rows, considering only the `subset` columns if given.
+
+    One row of every group of duplicates is kept, which one is unspecified.
+    A streaming pipeline transforms one batch at a time, so only duplicates
+    within the same batch are dropped, use a lazy run to deduplicate globally.
+    """
+
+    def __init__(self, subset: Iterable[str] | None = None) -> None:
+        """Initialize a new `Deduplicate`."""
+        super().__init__("deduplicate")
+        self._subset = list(subset) if subset is not None else None
+
+    def _apply_polars(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.unique(subset=self._subset, keep="any")
+
+    def _apply_duckdb(self, rel: duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+        if self._subset is None:
+            return rel.distinct()
+
+        keys = ", ".join(_quote(c) for c in self._subset)
+        # a view of its own per application, see `SqlTransform`
+        view = f"evolve_dedup_{uuid.uuid4().hex}"
+        return rel.query(
+            view, f"FROM {view} QUALIFY row_number() OVER (PARTITION BY {keys}) = 1"
+        )
+
+
+def _hash_key_sql(columns: Iterable[str]) -> str:
+    # nulls get a marker of their own, so that e.g. (NULL, 'a') and ('', 'a')
+    # do not end up with the same key
+    values = ", ".join(
+        f"coalesce(CAST({_quote(c)} AS VARCHAR), '\\N')" for c in columns
+    )
+    return f"md5(concat_ws('|', {values}))"
+
+
+def _hash_key_batch(struct: pl.Series, sql: str) -> pl.Series:
+    """Compute the hash keys of a batch of rows with duckdb."""
+    rows = struct.struct.unnest()
+    with duckdb.connect() as conn:
+        keys = conn.from_arrow(rows.to_arrow()).project(sql).fetch_arrow_table()
+    return pl.Series(struct.name, keys.column(0))
+
+
+class HashKey(ExprTransform):
+    """
+    Add a surrogate key column holding the md5 hex digest of the `columns`.
+
+    The key is computed with duckdb's `md5` on every backend, so it is stable
+    across backends and library versions, unlike polars' `hash`.
+    """
+
+    def __init__(self, columns: Iterable[str], name: str = "hash_key") -> None:
+        """Initialize a new `HashKey`."""
+        super().__init__("hash_key")
+        self._columns = list(columns)
+        self._column_name = name
+        self._sql = _hash_key_sql(self._columns)
+
+    def _apply_polars(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.with_columns(
+            pl.struct(self._columns)
+            .map_batches(
+                lambda struct: _hash_key_batch(struct, self._sql),
+                return_dtype=pl.String,
+            )
+            .alias(self._column_name)
+        )
+
+    def _apply_duckdb(self, rel: duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+        return _duckdb_with_columns(rel, {self._column_name: self._sql})
+
+
+class SqlTransform(ExprTransform):
+    """
+    Transform running a SQL query over the data, referred to as `self`.
+
+    Duckdb relations (and duckdb `LazyIR` plans) stay lazy, the query is
+    chained onto the relation and executed by duckdb together with the rest
+    of the plan. Polars dataframes and lazy frames run the query with polars
+    SQL, and arrow tables are queried through polars.
+    """
+
+    def __init__(self, query: str, name: str = "sql") -> None:
+        """
+        Initialize a new `SqlTransform`.
+
+        Parameters
+        ----------
+        query : str
+            A `SELECT` query reading from `self`, e.g.
+            `"SELECT id, amount * 2 AS amount FROM self WHERE amount > 0"`.
+        name : str
+            The name of the transform.
+
+        """
+        super().__init__(name)
+        self._query = query
+
+    def _apply_polars(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.sql(self._query)
+
+    def _apply_duckdb(self, rel: duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+        # duckdb resolves views by name when a relation executes, so every
+        # application needs its own view, or an earlier result would read the
+        # relation of a later one
+        view = f"evolve_sql_{uuid.uuid4().hex}"
+        return rel.query(view, f"WITH self AS (FROM {view}) FROM ({self._query})")
@@ -1,9 +1,18 @@
 import functools
-import sys
 import os
-import psutil
+import sys
 import threading
+import time
 from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import psutil
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .metrics import _active_stage_labels
 
 
 def monitor_usage(
@@ -28,12 +37,8 @@ def monitor_usage(
             else:
                 f = None
 
-            # Initial counters
-            prev_net = (
-                proc.net_io_counters()
-                if network and hasattr(proc, "net_io_counters")
-                else None
-            )
+            # Initial counters, psutil only counts network traffic per host
+            prev_net = psutil.net_io_counters() if network else None
             prev_io = proc.io_counters() if disk else None
 
             def log_usage():
@@ -46,7 +51,7 @@ def monitor_usage(
                     mem = proc.memory_info().rss / (1024 * 1024)  # MB
                     net_info = ""
                     if network and prev_net is not None:
-                        new_net = proc.net_io_counters()
+                        new_net = psutil.net_io_counters()
                         sent_diff = new_net.bytes_sent - prev_net.bytes_sent
                         recv_diff = new_net.bytes_recv - prev_net.bytes_recv
                         prev_net = new_net
@@ -89,3 +94,197 @@ def monitor_usage(
         return wrapper
 
     return decorator
+
+
+_SAMPLE_DTYPE = np.dtype(
+    [
+        ("time", np.float64),
+        ("cpu_time", np.float64),
+        ("rss", np.int64),
+        ("read_bytes", np.int64),
+        ("write_bytes", np.int64),
+        ("net_sent", np.int64),
+        ("net_recv", np.int64),
+        ("stage", np.int32),
+    ]
+)
+
+
+class ResourceMonitor:
+    """
+    Sample the resource usage of the process on a background thread.
+
+    Every sample records the cpu time, resident memory, disk and network
+    counters, and the pipeline stages doing work at that moment (see
+    `RunReport`), into a preallocated ring buffer that keeps the last
+    `capacity` samples. Nothing is formatted or written while sampling, so
+    intervals of 10 ms cost little. Use it as a context manager around
+    `Pipeline.run`, then look at the `summary` per stage or export the
+    samples with `to_parquet`.
+
+    Network counters are those of the whole host, psutil has no per process
+    network counters. Disk counters are not available on macos.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.01,
+        capacity: int = 360_000,
+        network: bool = True,
+        disk: bool = True,
+    ) -> None:
+        """
+        Initialize a new `ResourceMonitor`.
+
+        Parameters
+        ----------
+        interval : float
+            The seconds between two samples.
+        capacity : int
+            The number of samples kept, one hour at 10 ms by default.
+        network : bool
+            Whether to sample the network counters, which takes about as long
+            as sampling everything else.
+        disk : bool
+            Whether to sample the disk counters.
+
+        """
+        self._interval = interval
+        self._network = network
+        self._disk = disk
+        self._samples = np.zeros(capacity, dtype=_SAMPLE_DTYPE)
+        self._n_samples = 0
+        self._stages: dict[tuple[str, ...], int] = {}
+        self._process = psutil.Process(os.getpid())
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "ResourceMonitor":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start sampling on a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Take a last sample and stop sampling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        disk = self._disk and hasattr(self._process, "io_counters")
+        next_sample = time.perf_counter()
+        while True:
+            self._sample(disk)
+            if self._stop.is_set():
+                return
+            next_sample += self._interval
+            self._stop.wait(max(next_sample - time.perf_counter(), 0))
+
+    def _sample(self, disk: bool) -> None:
+        labels = _active_stage_labels()
+        stage = self._stages.setdefault(labels, len(self._stages)) if labels else -1
+
+        cpu = os.times()
+        with self._process.oneshot():
+            rss = self._process.memory_info().rss
+            io = self._process.io_counters() if disk else None
+        net = psutil.net_io_counters() if self._network else None
+
+        self._samples[self._n_samples % len(self._samples)] = (
+            time.time(),
+            cpu.user + cpu.system,
+            rss,
+            io.read_bytes if io else 0,
+            io.write_bytes if io else 0,
+            net.bytes_sent if net else 0,
+            net.bytes_recv if net else 0,
+            stage,
+        )
+        self._n_samples += 1
+
+    def samples(self) -> pa.Table:
+        """
+        Get the samples in the buffer, oldest first.
+
+        Besides the raw counters every sample has the cpu usage (in percent
+        of one core) and the disk and network throughput (in bytes per
+        second) since the previous sample, and the stages it was taken in,
+        joined by "+" when several stages were working at the same time.
+        """
+        n = self._n_samples
+        capacity = len(self._samples)
+        if n > capacity:
+            start = n % capacity
+            samples = np.concatenate([self._samples[start:], self._samples[:start]])
+        else:
+            samples = self._samples[:n].copy()
+
+        labels = ["+".join(stage) for stage in self._stages]
+        elapsed = np.diff(samples["time"], prepend=np.nan)
+
+        def rate(counter: str) -> np.ndarray:
+            return np.diff(samples[counter], prepend=np.nan) / elapsed
+
+        return pa.table(
+            {
+                "time": pa.array((samples["time"] * 1e6).astype(np.int64)).cast(
+                    pa.timestamp("us", tz="UTC")
+                ),
+                "stage": pa.array(
+                    [labels[i] if i >= 0 else None for i in samples["stage"]],
+                    pa.string(),
+                ),
+                "cpu_percent": rate("cpu_time") * 100,
+                "rss": samples["rss"],
+                "read_bytes_per_s": rate("read_bytes"),
+                "write_bytes_per_s": rate("write_bytes"),
+                "net_sent_bytes_per_s": rate("net_sent"),
+                "net_recv_bytes_per_s": rate("net_recv"),
+                "cpu_time": samples["cpu_time"],
+                "read_bytes": samples["read_bytes"],
+                "write_bytes": samples["write_bytes"],
+                "net_sent": samples["net_sent"],
+                "net_recv": samples["net_recv"],
+            }
+        )
+
+    def summary(self) -> pl.DataFrame:
+        """Summarize the samples per stage with the p50, p95 and max of every rate."""
+        metrics = [
+            "cpu_percent",
+            "rss",
+            "read_bytes_per_s",
+            "write_bytes_per_s",
+            "net_sent_bytes_per_s",
+            "net_recv_bytes_per_s",
+        ]
+        df = pl.from_arrow(self.samples()).with_columns(pl.col(metrics).fill_nan(None))
+        return (
+            df.group_by("stage", maintain_order=True)
+            .agg(
+                pl.len().alias("samples"),
+                *(
+                    agg
+                    for metric in metrics
+                    for agg in (
+                        pl.col(metric).median().alias(f"{metric}_p50"),
+                        pl.col(metric).quantile(0.95).alias(f"{metric}_p95"),
+                        pl.col(metric).max().alias(f"{metric}_max"),
+                    )
+                ),
+            )
+            .sort("stage", nulls_last=True)
+        )
+
+    def to_parquet(self, path: str | Path) -> None:
+        """Write the samples to a parquet file for offline analysis."""
+        pq.write_table(self.samples(), path)
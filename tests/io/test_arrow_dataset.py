@@ -1,10 +1,14 @@
+import json
+
 import polars as pl
 import pyarrow as pa
 import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from testcontainers.minio import MinioContainer
 
-from evolve.ir import PolarsBackend
 from evolve.io import ArrowDataset, ParquetFile
+from evolve.io.arrow_dataset import write_partitioned_parquet_embedded
+from evolve.ir import PolarsBackend
 
 
 def test_write_and_read_s3():
@@ -63,3 +67,128 @@ def test_write_and_read_s3():
 
         dff = pp.read()
         print(dff.head())
+
+
+def test_write_partitioned_parquet_embedded_streaming(tmp_path):
+    n_rows = 10_000
+    table = pa.table(
+        {"day": [i % 4 for i in range(n_rows)], "value": list(range(n_rows))}
+    )
+
+    write_partitioned_parquet_embedded(
+        table.to_batches(max_chunksize=700),
+        str(tmp_path),
+        ["day"],
+        max_workers=3,
+        max_rows_per_file=1_000,
+        row_group_size=300,
+    )
+
+    partition = tmp_path / "day=1"
+    names = sorted(p.name for p in partition.iterdir())
+    assert names == ["data-1.parquet", "data-2.parquet", "data.parquet"]
+
+    first = pq.ParquetFile(partition / "data.parquet")
+    assert first.metadata.num_rows == 1_000
+    assert [
+        first.metadata.row_group(i).num_rows
+        for i in range(first.metadata.num_row_groups)
+    ] == [300, 300, 300, 100]
+
+    # partition columns are embedded and rows keep their input order
+    values = pl.concat(
+        pl.read_parquet(partition / name)
+        for name in ["data.parquet", "data-1.parquet", "data-2.parquet"]
+    )
+    assert values["day"].unique().to_list() == [1]
+    assert values["value"].to_list() == list(range(1, n_rows, 4))
+
+
+def test_arrow_dataset_embedded_partition_write(tmp_path):
+    df = pl.DataFrame({"day": [1, 1, 2], "value": [1.0, 2.0, 3.0]})
+    target = ArrowDataset(
+        tmp_path,
+        partitioning=["day"],
+        embed_partition_columns=True,
+        backend=PolarsBackend(),
+    )
+    target.write(df)
+
+    result = target.read().sort("value")
+    assert result.columns == ["day", "value"]
+    assert result["day"].to_list() == [1, 1, 2]
+
+
+def test_compact_small_files(tmp_path):
+    for day in [1, 2]:
+        partition = tmp_path / f"day={day}"
+        partition.mkdir()
+        for i in range(5):
+            pq.write_table(
+                pa.table({"value": list(range(i * 10, i * 10 + 10))}),
+                partition / f"part-{i}.parquet",
+            )
+
+    dataset = ArrowDataset(tmp_path, partitioning="hive", backend=PolarsBackend())
+    before = dataset.read()["value"].sort()
+
+    compacted = dataset.compact(target_file_size=1 << 20, max_workers=2)
+
+    assert len(compacted) == 2
+    for day in [1, 2]:
+        names = [p.name for p in (tmp_path / f"day={day}").iterdir()]
+        assert len(names) == 1 and names[0].startswith("compacted-")
+    assert dataset.read()["value"].sort().equals(before)
+
+    # nothing left to compact
+    assert dataset.compact(target_file_size=1 << 20) == []
+
+
+def test_compact_recovers_interrupted_compaction(tmp_path):
+    inputs = [tmp_path / f"part-{i}.parquet" for i in range(2)]
+    for i, path in enumerate(inputs):
+        pq.write_table(pa.table({"value": [i]}), path)
+
+    # the compacted file was moved into place but the inputs were not deleted
+    pq.write_table(pa.table({"value": [0, 1]}), tmp_path / "compacted-x.parquet")
+    (tmp_path / "_compaction-x.json").write_text(
+        json.dumps(
+            {
+                "staging": str(tmp_path / ".compacting-x.parquet"),
+                "output": str(tmp_path / "compacted-x.parquet"),
+                "inputs": [str(path) for path in inputs],
+            }
+        )
+    )
+
+    dataset = ArrowDataset(tmp_path, backend=PolarsBackend())
+    assert dataset.compact(target_file_size=1 << 20) == []
+    assert [p.name for p in tmp_path.iterdir()] == ["compacted-x.parquet"]
+    assert dataset.read()["value"].to_list() == [0, 1]
+
+
+def test_compact_finishes_swap_interrupted_while_deleting_inputs(tmp_path):
+    inputs = [tmp_path / f"part-{i}.parquet" for i in range(3)]
+    for i, path in enumerate(inputs[1:], start=1):
+        pq.write_table(pa.table({"value": [i]}), path)
+
+    # the first input was deleted, the complete compacted file is still hidden
+    pq.write_table(pa.table({"value": [0, 1, 2]}), tmp_path / ".compacted-x.parquet")
+    (tmp_path / "_compaction-x.json").write_text(
+        json.dumps(
+            {
+                "staging": str(tmp_path / ".compacting-x.parquet"),
+                "ready": str(tmp_path / ".compacted-x.parquet"),
+                "output": str(tmp_path / "compacted-x.parquet"),
+                "inputs": [str(path) for path in inputs],
+            }
+        )
+    )
+
+    dataset = ArrowDataset(tmp_path, backend=PolarsBackend())
+    # readers never see the rows of the inputs and the output together
+    assert dataset.read()["value"].sort().to_list() == [1, 2]
+
+    assert dataset.compact(target_file_size=1 << 20) == []
+    assert [p.name for p in tmp_path.iterdir()] == ["compacted-x.parquet"]
+    assert dataset.read()["value"].to_list() == [0, 1, 2]
@@ -0,0 +1,57 @@
+import polars as pl
+import pyarrow as pa
+import pytest
+from pyarrow import ipc
+
+from evolve.io import ArrowIpcFile
+from evolve.ir import ArrowBackend, PolarsBackend
+
+TABLE = pa.table({"id": list(range(1000)), "name": [f"name-{i}" for i in range(1000)]})
+
+
+def test_arrow_ipc_file_is_read_zero_copy(tmp_path):
+    uri = tmp_path / "staged.arrow"
+    ArrowIpcFile(uri, backend=ArrowBackend()).write_batches(
+        TABLE.to_batches(max_chunksize=100)
+    )
+
+    allocated = pa.total_allocated_bytes()
+    result = ArrowIpcFile(uri, backend=ArrowBackend()).read()
+    # the columns point into the memory map instead of allocated memory
+    assert pa.total_allocated_bytes() == allocated
+    assert result.equals(TABLE)
+
+    batches = list(ArrowIpcFile(uri).read_batches(batch_size=40))
+    assert [len(batch) for batch in batches[:3]] == [40, 40, 20]
+    assert pa.Table.from_batches(batches).equals(TABLE)
+
+
+@pytest.mark.parametrize("compression", ["lz4", "zstd"])
+def test_arrow_ipc_file_compressed(tmp_path, compression):
+    uri = tmp_path / "staged.arrow"
+    ArrowIpcFile(uri, compression=compression, backend=PolarsBackend()).write(
+        PolarsBackend().ir_from_arrow_table(TABLE)
+    )
+
+    with ipc.open_file(uri) as reader:
+        assert reader.num_record_batches == 1
+    result = ArrowIpcFile(uri, backend=ArrowBackend(), memory_map=False).read()
+    assert result.to_pylist() == TABLE.to_pylist()
+
+
+def test_arrow_ipc_dataset(tmp_path):
+    uri = tmp_path / "staged"
+    ArrowIpcFile(
+        uri, compression="zstd", max_rows_per_file=300, backend=ArrowBackend()
+    ).write(TABLE)
+    assert sorted(path.name for path in uri.iterdir()) == [
+        f"part-{i}.arrow" for i in range(4)
+    ]
+
+    source = ArrowIpcFile(uri, backend=ArrowBackend())
+    assert source.read().sort_by("id").equals(TABLE)
+    assert sum(len(batch) for batch in source.read_batches()) == len(TABLE)
+    assert source.scan().plan.filter(pl.col("id") < 10).collect().height == 10
+
+    with pytest.raises(ValueError, match="unsupported compression"):
+        ArrowIpcFile(uri, compression="snappy")
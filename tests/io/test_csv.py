@@ -1,21 +1,21 @@
 import io
 
-from duckdb import DuckDBPyConnection
 import polars as pl
 import pyarrow as pa
+from duckdb import DuckDBPyRelation
 from pyarrow import csv
 from testcontainers.minio import MinioContainer
 
-from evolve.ir import ArrowBackend, DuckdbBackend
 from evolve.io import CsvFile
+from evolve.ir import ArrowBackend, DuckdbBackend
 
 
 def test_csv_source_local_file_duckdb_backend():
     source = CsvFile("examples/data/dummy.csv", backend=DuckdbBackend())
     ir = source.read()
     print("========== LOCAL CSV (Backend: DuckDB) ===========")
-    assert isinstance(ir, DuckDBPyConnection)
-    t = ir.execute("SELECT * FROM tmp_arrow_data;").fetch_arrow_table()
+    assert isinstance(ir, DuckDBPyRelation)
+    t = ir.fetch_arrow_table()
     print(t)
     assert isinstance(t, pa.Table)
 
@@ -36,6 +36,20 @@ def test_csv_source_local_file_polars_backend():
     assert isinstance(ir, pl.DataFrame)
 
 
+def test_csv_read_batches_bounded_batch_size():
+    source = CsvFile("examples/data/dummy.csv", backend=ArrowBackend())
+    batches = list(source.read_batches(batch_size=2))
+    assert [b.num_rows for b in batches] == [2, 2, 1]
+    assert pa.Table.from_batches(batches).equals(source.read())
+
+
+def test_csv_write_batches(tmp_path):
+    source = CsvFile("examples/data/dummy.csv", backend=ArrowBackend())
+    target = CsvFile(tmp_path / "dummy.csv", backend=ArrowBackend())
+    target.write_batches(source.read_batches(batch_size=2))
+    assert target.read().equals(source.read())
+
+
 def test_csv_source_s3_minio():
     with MinioContainer() as minio:
         client = minio.get_client()
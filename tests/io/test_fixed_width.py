@@ -0,0 +1,65 @@
+import polars as pl
+import pyarrow as pa
+import pytest
+
+from evolve.io import FixedWidthFile
+from evolve.ir import ArrowBackend, PolarsBackend
+
+COLSPECS = [(0, 4), (4, 8), (12, 6)]
+COLNAMES = ["id", "name", "note"]
+
+
+@pytest.fixture
+def fwf_file(tmp_path):
+    rows = [
+        ("1", "max", 'a,"b'),
+        ("22", "oscar", "c;d"),
+        ("333", "lando", ""),
+    ]
+    path = tmp_path / "data.fwf"
+    path.write_text("".join(f"{a:>4}{b:<8}{c:<6}\n" for a, b, c in rows))
+    return path
+
+
+def test_fixed_width_delimiters_and_quotes_are_data(fwf_file):
+    df = FixedWidthFile(fwf_file, COLSPECS, COLNAMES, backend=PolarsBackend()).read()
+    assert isinstance(df, pl.DataFrame)
+    assert df["id"].to_list() == ["1", "22", "333"]
+    assert df["name"].to_list() == ["max", "oscar", "lando"]
+    assert df["note"].to_list() == ['a,"b', "c;d", ""]
+
+
+def test_fixed_width_read_batches_is_chunked(fwf_file):
+    source = FixedWidthFile(fwf_file, COLSPECS, COLNAMES, backend=ArrowBackend())
+    batches = list(source.read_batches(batch_size=2))
+    assert [b.num_rows for b in batches] == [2, 1]
+
+
+def test_fixed_width_crlf_without_trailing_newline(tmp_path):
+    path = tmp_path / "crlf.fwf"
+    path.write_bytes(b"   1max     \r\n   2oscar   ")
+    table = FixedWidthFile(
+        path, [(0, 4), (4, 8)], ["id", "name"], backend=ArrowBackend()
+    ).read()
+    assert table.column("name").to_pylist() == ["max", "oscar"]
+
+
+def test_fixed_width_ragged_records_are_padded(tmp_path):
+    path = tmp_path / "ragged.fwf"
+    path.write_text("abc  12\nde   3\nfgh 456\n")
+    table = FixedWidthFile(
+        path, [(0, 5), (5, 2)], ["name", "value"], backend=ArrowBackend()
+    ).read()
+    assert table["name"].to_pylist() == ["abc", "de", "fgh 4"]
+    assert table["value"].to_pylist() == ["12", "3", "56"]
+
+
+def test_fixed_width_trimmed_records_after_the_first_chunk(tmp_path):
+    path = tmp_path / "trimmed.fwf"
+    path.write_text("   1max\n   2oscar\n  3 a\n   4\n   5lan")
+    source = FixedWidthFile(path, [(0, 4), (4, 3)], ["id", "name"])
+    batches = list(source.read_batches(batch_size=1))
+    assert [b.num_rows for b in batches] == [1] * 5
+    table = pa.Table.from_batches(batches)
+    assert table["id"].to_pylist() == ["1", "2", "3", "4", "5"]
+    assert table["name"].to_pylist() == ["max", "osc", "a", "", "lan"]
@@ -0,0 +1,134 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+import pytest
+from pyiceberg.catalog.sql import SqlCatalog
+
+from evolve.io import IcebergTable
+from evolve.ir import ArrowBackend
+
+
+def _catalog_options(tmp_path):
+    return {
+        "type": "sql",
+        "uri": f"sqlite:///{tmp_path}/catalog.db",
+        "warehouse": f"file://{tmp_path}",
+    }
+
+
+def _create_table(tmp_path):
+    catalog = SqlCatalog("test", **_catalog_options(tmp_path))
+    catalog.create_namespace("db")
+    schema = pa.schema([("day", pa.int64()), ("id", pa.int64()), ("v", pa.string())])
+    table = catalog.create_table("db.events", schema=schema)
+    with table.update_spec() as update:
+        update.add_identity("day")
+    for day in range(4):
+        for i in range(3):
+            ids = list(range(day * 100 + i * 10, day * 100 + i * 10 + 10))
+            table.append(
+                pa.table({"day": [day] * 10, "id": ids, "v": ["x"] * 10}, schema=schema)
+            )
+    return table
+
+
+def test_iceberg_read_prunes_and_projects(tmp_path):
+    _create_table(tmp_path)
+
+    source = IcebergTable(
+        "events",
+        "db",
+        "test",
+        row_filter="day = 2 and id >= 215",
+        selected_fields=("id",),
+        max_workers=2,
+        backend=ArrowBackend(),
+        **_catalog_options(tmp_path),
+    )
+
+    # only the files of the matching partition are planned
+    assert len(list(source._scan().plan_files())) == 2
+
+    table = source.read()
+    assert table.column_names == ["id"]
+    assert sorted(table["id"].to_pylist()) == list(range(215, 230))
+
+    batches = list(source.read_batches(batch_size=4))
+    assert max(len(b) for b in batches) <= 4
+    assert sum(len(b) for b in batches) == 15
+
+
+def test_iceberg_read_empty_scan(tmp_path):
+    _create_table(tmp_path)
+
+    source = IcebergTable(
+        "events",
+        "db",
+        "test",
+        row_filter="day = 9",
+        backend=ArrowBackend(),
+        **_catalog_options(tmp_path),
+    )
+    table = source.read()
+    assert table.num_rows == 0
+    assert table.column_names == ["day", "id", "v"]
+
+
+def _target(tmp_path, **kwargs):
+    return IcebergTable(
+        "events",
+        "db",
+        "test",
+        backend=ArrowBackend(),
+        **kwargs,
+        **_catalog_options(tmp_path),
+    )
+
+
+def test_iceberg_write_commit_batching(tmp_path):
+    table = _create_table(tmp_path)
+    snapshots = len(table.metadata.snapshots)
+    batches = [
+        pa.record_batch(
+            {"day": [7] * 10, "id": list(range(i, i + 10)), "v": ["y"] * 10}
+        )
+        for i in range(0, 50, 10)
+    ]
+
+    _target(tmp_path).write_batches(batches)
+    table.refresh()
+    assert len(table.metadata.snapshots) == snapshots + 1
+
+    _target(tmp_path, commit_rows=20).write_batches(batches)
+    table.refresh()
+    assert len(table.metadata.snapshots) == snapshots + 4
+    assert table.scan(row_filter="day = 7").to_arrow().num_rows == 100
+
+
+def test_iceberg_write_overwrite_modes(tmp_path):
+    table = _create_table(tmp_path)
+    data = pa.table({"day": [1, 1, 5], "id": [-1, -2, -3], "v": ["new"] * 3})
+
+    _target(tmp_path, mode="dynamic").write(data)
+    table.refresh()
+    result = table.scan().to_arrow()
+    assert sorted(result.filter(pc.equal(result["day"], 1))["id"].to_pylist()) == [
+        -2,
+        -1,
+    ]
+    assert result.num_rows == 3 * 30 + 3
+
+    _target(tmp_path, mode="overwrite", overwrite_filter="day >= 1").write(data)
+    table.refresh()
+    assert sorted(table.scan().to_arrow()["day"].to_pylist()) == [0] * 30 + [1, 1, 5]
+
+
+def test_iceberg_write_checks_schema_before_writing(tmp_path):
+    _create_table(tmp_path)
+    files = set(tmp_path.rglob("*.parquet"))
+
+    data = pa.table({"day": [1], "id": ["not an id"], "v": ["x"]})
+    with pytest.raises(ValueError, match="column 'id' of type string"):
+        _target(tmp_path).write(data)
+    with pytest.raises(ValueError, match="column 'other' is not in the schema"):
+        _target(tmp_path).write(pa.table({"day": [1], "other": [1]}))
+    assert set(tmp_path.rglob("*.parquet")) == files
@@ -0,0 +1,192 @@
+from types import SimpleNamespace
+from typing import ClassVar
+
+import pyarrow as pa
+from confluent_kafka import TopicPartition
+
+from evolve.io import kafka_topic
+from evolve.io.kafka_topic import KafkaTopic, _encode, _to_record_batch
+
+
+class _Message:
+    """The part of a `confluent_kafka.Message` the reader uses."""
+
+    def __init__(self, value, key=None, partition=0, offset=0, timestamp=(0, None)):
+        self._value = value
+        self._key = key
+        self._partition = partition
+        self._offset = offset
+        self._timestamp = timestamp
+
+    def value(self):
+        return self._value
+
+    def key(self):
+        return self._key
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+    def timestamp(self):
+        return self._timestamp
+
+    def error(self):
+        return None
+
+
+def _messages(values, keys=None):
+    return [
+        _Message(
+            value,
+            key=f"k{i}".encode() if keys is None else keys[i],
+            partition=2,
+            offset=10 + i,
+            timestamp=(1, 1_700_000_000_000 + i),
+        )
+        for i, value in enumerate(values)
+    ]
+
+
+def test_to_record_batch_raw():
+    batch = _to_record_batch(_messages([b"a", None]), "raw")
+
+    assert batch.schema.names == [
+        "value",
+        "kafka_key",
+        "kafka_partition",
+        "kafka_offset",
+        "kafka_timestamp",
+    ]
+    assert batch.column("value").to_pylist() == [b"a", None]
+    assert batch.column("kafka_key").to_pylist() == [b"k0", b"k1"]
+    assert batch.column("kafka_partition").to_pylist() == [2, 2]
+    assert batch.column("kafka_offset").to_pylist() == [10, 11]
+    assert batch.column("kafka_timestamp").type == pa.timestamp("ms", tz="UTC")
+
+
+def test_to_record_batch_json():
+    messages = _messages([b'{"id": 1, "name": "a"}', b'{\n  "id": 2\n}', None])
+
+    batch = _to_record_batch(messages, "json")
+    assert batch.column("id").to_pylist() == [1, 2, None]
+    assert batch.column("name").to_pylist() == ["a", None, None]
+
+    # with a schema, types are fixed and unknown fields dropped
+    schema = pa.schema([pa.field("id", pa.int32())])
+    batch = _to_record_batch(messages, "json", schema)
+    assert batch.schema.names[0] == "id"
+    assert batch.schema.field("id").type == pa.int32()
+    assert "name" not in batch.schema.names
+
+
+def test_encode_json_round_trip():
+    batch = pa.record_batch({"id": [1, 2, 3], "name": ["a", "b\nc", None]})
+
+    keys, values = _encode(batch, "json", key_column="id")
+    assert keys == [b"1", b"2", b"3"]
+    assert len(values) == 3
+
+    decoded = _to_record_batch(_messages(values, keys), "json")
+    assert decoded.column("name").to_pylist() == ["a", "b\nc", None]
+
+    # the metadata columns of a read are not written back
+    _, rewritten = _encode(decoded, "json")
+    assert rewritten == values
+
+
+def test_encode_arrow_groups_rows_by_key():
+    batch = pa.record_batch({"user": ["a", "b", "a", "a"], "value": [1, 2, 3, 4]})
+
+    keys, values = _encode(batch, "arrow", key_column="user", rows_per_message=2)
+    assert keys == [b"a", b"a", b"b"]
+
+    decoded = _to_record_batch(_messages(values, keys), "arrow")
+    assert decoded.column("value").to_pylist() == [1, 3, 4, 2]
+    assert decoded.column("kafka_key").to_pylist() == [b"a", b"a", b"a", b"b"]
+    assert decoded.column("kafka_offset").to_pylist() == [10, 10, 11, 12]
+
+
+class _TransactionalConsumer:
+    """A partition of two messages followed by a transaction marker."""
+
+    consumers: ClassVar[list["_TransactionalConsumer"]] = []
+
+    def __init__(self, config):
+        self.position_offset = 0
+        self.closed = False
+        self.consumers.append(self)
+
+    def list_topics(self, topic, timeout):
+        partitions = {0: SimpleNamespace(id=0)}
+        return SimpleNamespace(topics={topic: SimpleNamespace(partitions=partitions)})
+
+    def get_watermark_offsets(self, tp, timeout):
+        return 0, 3
+
+    def assign(self, partitions):
+        pass
+
+    def consume(self, num_messages, timeout):
+        if self.position_offset:
+            return []
+        # the marker at offset 2 is never delivered, but moves the position
+        self.position_offset = 3
+        return [_Message(value, offset=i) for i, value in enumerate([b"a", b"b"])]
+
+    def position(self, partitions):
+        return [TopicPartition(partitions[0].topic, 0, self.position_offset)]
+
+    def close(self):
+        self.closed = True
+
+
+def test_read_stops_past_trailing_control_records(monkeypatch):
+    monkeypatch.setattr(kafka_topic, "Consumer", _TransactionalConsumer)
+    _TransactionalConsumer.consumers.clear()
+
+    topic = KafkaTopic(
+        "events",
+        bootstrap_servers="localhost:9092",
+        group_id="test",
+        enable_partition_eof=False,
+    )
+    batches = list(topic.read_batches())
+
+    assert sum(len(batch) for batch in batches) == 2
+    assert all(consumer.closed for consumer in _TransactionalConsumer.consumers)
+
+
+class _BusyConsumer(_TransactionalConsumer):
+    """A partition that keeps receiving messages past its high watermark."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.polls = 0
+
+    def consume(self, num_messages, timeout):
+        self.polls += 1
+        if self.polls > 100:
+            raise RuntimeError("the read did not stop at the high watermark")
+        if self.polls == 1:
+            return [_Message(value, offset=i) for i, value in enumerate([b"a", b"b"])]
+        # the marker at offset 2 is followed by ever new messages
+        return [_Message(b"new", offset=self.polls + 1)]
+
+
+def test_read_stops_at_messages_past_the_high_watermark(monkeypatch):
+    monkeypatch.setattr(kafka_topic, "Consumer", _BusyConsumer)
+    _BusyConsumer.consumers.clear()
+
+    topic = KafkaTopic(
+        "events",
+        bootstrap_servers="localhost:9092",
+        group_id="test",
+        enable_partition_eof=False,
+    )
+    batches = list(topic.read_batches())
+
+    assert sum(len(batch) for batch in batches) == 2
+    assert all(consumer.closed for consumer in _BusyConsumer.consumers)
@@ -0,0 +1,104 @@
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from pyarrow import csv
+
+from evolve import JsonStateStore, Pipeline
+from evolve.io import CsvFile, FixedWidthFile, MultiFile, ParquetFile
+from evolve.ir import ArrowBackend, PolarsBackend
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    for day in range(1, 4):
+        sub = tmp_path / f"day={day}"
+        sub.mkdir()
+        table = pa.table({"day": [day] * 10, "value": list(range(10))})
+        csv.write_csv(table, sub / "part-0.csv")
+        csv.write_csv(table, sub / "_ignored.csv")
+    return tmp_path
+
+
+def test_multi_file_glob_thread_pool(csv_dir):
+    source = MultiFile(
+        str(csv_dir / "day=*" / "*.csv"),
+        reader=CsvFile,
+        max_workers=2,
+        backend=PolarsBackend(),
+    )
+    assert len(source.list_uris()) == 3
+
+    df = source.read()
+    assert isinstance(df, pl.DataFrame)
+    assert df.shape == (30, 2)
+    assert df["day"].to_list() == [1] * 10 + [2] * 10 + [3] * 10
+
+
+def test_multi_file_prefix_process_pool_streaming(csv_dir):
+    source = MultiFile(
+        str(csv_dir) + "/",
+        reader=CsvFile,
+        executor="process",
+        max_workers=2,
+        backend=ArrowBackend(),
+    )
+    batches = list(source.read_batches(batch_size=4))
+    assert all(b.num_rows <= 4 for b in batches)
+    assert sum(b.num_rows for b in batches) == 30
+
+
+def test_multi_file_explicit_uris_fixed_width(tmp_path):
+    uris = []
+    for i in range(3):
+        path = tmp_path / f"{i}.fwf"
+        path.write_text(f"{i:>3}abc\n{i:>3}def\n")
+        uris.append(path)
+
+    source = MultiFile(
+        uris,
+        reader=FixedWidthFile,
+        colspecs=[(0, 3), (3, 3)],
+        colnames=["id", "code"],
+        backend=PolarsBackend(),
+    )
+    df = source.read()
+    assert df["id"].to_list() == ["0", "0", "1", "1", "2", "2"]
+    assert df["code"].to_list() == ["abc", "def"] * 3
+
+
+def test_multi_file_incremental(csv_dir, tmp_path):
+    state = JsonStateStore(tmp_path / "state.json")
+    target = tmp_path / "out.parquet"
+
+    def run():
+        source = MultiFile(
+            str(csv_dir / "day=*" / "*.csv"),
+            reader=CsvFile,
+            state=state,
+            backend=ArrowBackend(),
+        )
+        Pipeline(
+            source=source, target=ParquetFile(target, backend=ArrowBackend())
+        ).run()
+        return pq.read_table(target)
+
+    assert run().num_rows == 30
+
+    # nothing changed, so nothing is read, but the target keeps the schema
+    unchanged = run()
+    assert unchanged.num_rows == 0
+    assert unchanged.schema.names == ["day", "value"]
+
+    # a new file and a rewritten file are picked up
+    (csv_dir / "day=4").mkdir()
+    for day in (1, 4):
+        table = pa.table({"day": [day] * 5, "value": list(range(5))})
+        csv.write_csv(table, csv_dir / f"day={day}" / "part-0.csv")
+    assert sorted(run().column("day").to_pylist()) == [1] * 5 + [4] * 5
+
+
+def test_multi_file_is_read_only(csv_dir):
+    source = MultiFile(str(csv_dir / "day=1" / "*.csv"), reader=CsvFile)
+    with pytest.raises(NotImplementedError, match="read-only"):
+        source.write(pl.DataFrame({"day": [1]}))
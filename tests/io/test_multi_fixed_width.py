@@ -0,0 +1,63 @@
+import pyarrow as pa
+import pytest
+
+from evolve.io import MultiFixedWidthFile, ParquetFile
+from evolve.ir import ArrowBackend
+
+SCHEMA_MAP = {
+    "01": {"colspecs": [(0, 4), (4, 6)], "colnames": ["id", "name"]},
+    "02": {"colspecs": [(0, 4), (4, 3), (7, 2)], "colnames": ["id", "code", "qty"]},
+}
+
+
+@pytest.fixture
+def multi_fwf_file(tmp_path):
+    lines = [
+        "01   1max   ",
+        "02   1abc 5",
+        "99garbage",
+        "01   2oscar",
+        "02   2de 10",
+        "02   3f",
+    ]
+    path = tmp_path / "multi.fwf"
+    path.write_text("\r\n".join(lines))
+    return path
+
+
+def test_multi_fixed_width_read_single_pass(multi_fwf_file):
+    source = MultiFixedWidthFile(
+        multi_fwf_file,
+        schema_map=SCHEMA_MAP,
+        schema_spec_len=2,
+        backend=ArrowBackend(),
+        chunk_bytes=16,
+    )
+    people, orders = source.read()
+    assert people.to_pydict() == {"id": ["1", "2"], "name": ["max", "oscar"]}
+    assert orders.to_pydict() == {
+        "id": ["1", "2", "3"],
+        "code": ["abc", "de", "f"],
+        "qty": ["5", "10", ""],
+    }
+
+
+def test_multi_fixed_width_demux_to_parquet(multi_fwf_file, tmp_path):
+    source = MultiFixedWidthFile(
+        multi_fwf_file,
+        schema_map=SCHEMA_MAP,
+        schema_spec_len=2,
+        backend=ArrowBackend(),
+    )
+    targets = {
+        schema_id: ParquetFile(
+            tmp_path / f"{schema_id}.parquet", backend=ArrowBackend()
+        )
+        for schema_id in SCHEMA_MAP
+    }
+    source.demux(targets, batch_size=1, queue_depth=1)
+
+    people, orders = source.read()
+    assert targets["01"].read().equals(people)
+    assert targets["02"].read().equals(orders)
+    assert isinstance(people, pa.Table)
@@ -1,18 +1,18 @@
 import io
 from pathlib import Path
 
-from duckdb import DuckDBPyConnection
 import pyarrow as pa
 import pyarrow.parquet as pq
+from duckdb import DuckDBPyRelation
 from testcontainers.minio import MinioContainer
 
+from evolve.io import ParquetFile
 from evolve.ir import (
     ArrowBackend,
     DuckdbBackend,
     PolarsBackend,
     set_global_backend,
 )
-from evolve.io import ParquetFile
 
 
 def test_parquet_source_local_file_arrow_backend():
@@ -26,6 +26,21 @@ def test_parquet_source_local_file_arrow_backend():
     assert isinstance(ir, pa.Table)
 
 
+def test_parquet_read_and_write_batches(tmp_path):
+    source = ParquetFile("examples/data/weather.parquet", backend=ArrowBackend())
+    batches = list(source.read_batches(batch_size=100))
+    assert all(b.num_rows <= 100 for b in batches)
+
+    target = ParquetFile(
+        tmp_path / "weather.parquet",
+        backend=ArrowBackend(),
+        write_options={"row_group_size": 250},
+    )
+    target.write_batches(batches)
+    assert target.read().equals(source.read())
+    assert pq.ParquetFile(tmp_path / "weather.parquet").num_row_groups == 2
+
+
 def test_parquet_source_s3_minio_duckdb_backend():
     with MinioContainer() as minio:
         client = minio.get_client()
@@ -57,8 +72,8 @@ def test_parquet_source_s3_minio_duckdb_backend():
             backend=DuckdbBackend(),
         )
         ir = source.read()
-        assert isinstance(ir, DuckDBPyConnection)
-        t = ir.execute("SELECT * FROM tmp_arrow_data;").fetch_arrow_table()
+        assert isinstance(ir, DuckDBPyRelation)
+        t = ir.fetch_arrow_table()
         print("============ LOCAL Parquet (Backend: DuckDB) ============")
         print(t)
         assert isinstance(t, pa.Table)
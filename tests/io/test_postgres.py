@@ -1,7 +1,12 @@
+from datetime import datetime
+
 import duckdb
+import pyarrow as pa
 from testcontainers.postgres import PostgresContainer
 
+from evolve import JsonStateStore
 from evolve.io import PostgresTable
+from evolve.io.postgres import _partition_bounds
 from evolve.ir import ArrowBackend, DuckdbBackend
 
 
@@ -170,3 +175,129 @@ def test_postgres_read_polars_backend():
 
         ir = source.read()
         print(ir.head())
+
+
+def test_postgres_write_atomic_replace_arrow_backend():
+    user = "wilhelm"
+    password = "123"
+    db = "test"
+
+    with PostgresContainer(
+        image="postgres:latest",
+        username=user,
+        password=password,
+        dbname=db,
+    ) as pg:
+        conn = duckdb.connect(database=":memory:")
+        conn.execute("INSTALL postgres; LOAD postgres;")
+        conn.execute(f"""
+        ATTACH 'host={pg.get_container_host_ip()} port={pg.get_exposed_port(pg.port)} dbname={db} user={user} password={password}' AS pg_db (
+            TYPE postgres
+        );
+        """)
+        conn.execute("CREATE SCHEMA IF NOT EXISTS pg_db.raw;")
+        conn.execute("CREATE TABLE pg_db.raw.users (id integer, name text);")
+        conn.execute("INSERT INTO pg_db.raw.users VALUES (1, 'old');")
+
+        table = pa.table({"id": list(range(1000)), "name": ["new"] * 1000})
+        target = PostgresTable(
+            host=pg.get_container_host_ip(),
+            port=pg.get_exposed_port(pg.port),
+            user=user,
+            password=password,
+            db=db,
+            schema="raw",
+            table="users",
+            write_mode="replace",
+            commit_every=100,
+            atomic_replace=True,
+            backend=ArrowBackend(),
+        )
+        target.write_batches(table.to_batches(max_chunksize=64))
+
+        result = target.read()
+        assert result.num_rows == 1000
+        assert set(result.column("name").to_pylist()) == {"new"}
+
+
+def test_partition_bounds():
+    assert _partition_bounds(1, 100, 4) == [1, 25, 50, 75, 100]
+    assert _partition_bounds(1, 3, 8) == [1, 2, 3]
+    assert _partition_bounds(5, 5, 4) == [5]
+    assert _partition_bounds(datetime(2025, 1, 1), datetime(2025, 1, 2), 2) == [
+        datetime(2025, 1, 1),
+        datetime(2025, 1, 1, 12),
+        datetime(2025, 1, 2),
+    ]
+
+
+def test_postgres_partitioned_read_arrow_backend():
+    user = "wilhelm"
+    password = "123"
+    db = "test"
+
+    with PostgresContainer(
+        image="postgres:latest",
+        username=user,
+        password=password,
+        dbname=db,
+    ) as pg:
+        options = {
+            "host": pg.get_container_host_ip(),
+            "port": pg.get_exposed_port(pg.port),
+            "user": user,
+            "password": password,
+            "db": db,
+            "schema": "public",
+            "table": "numbers",
+            "backend": ArrowBackend(),
+        }
+        table = pa.table({"id": list(range(10_000)), "value": ["x"] * 10_000})
+        PostgresTable(**options, write_mode="create").write(table)
+
+        for partitioning in (
+            {"partition_column": "id", "num_partitions": 4},
+            {"num_partitions": 4},
+        ):
+            result = PostgresTable(**options, **partitioning).read()
+            assert sorted(result.column("id").to_pylist()) == list(range(10_000))
+
+
+def test_postgres_incremental_read(tmp_path):
+    user = "wilhelm"
+    password = "123"
+    db = "test"
+
+    with PostgresContainer(
+        image="postgres:latest",
+        username=user,
+        password=password,
+        dbname=db,
+    ) as pg:
+        options = {
+            "host": pg.get_container_host_ip(),
+            "port": pg.get_exposed_port(pg.port),
+            "user": user,
+            "password": password,
+            "db": db,
+            "schema": "public",
+            "table": "events",
+            "backend": ArrowBackend(),
+        }
+        PostgresTable(**options, write_mode="create").write(
+            pa.table({"id": list(range(100))})
+        )
+
+        state = JsonStateStore(tmp_path / "state.json")
+
+        def read_new_rows():
+            source = PostgresTable(**options, incremental_column="id", state=state)
+            result = source.read()
+            source.commit()
+            return result.column("id").to_pylist()
+
+        assert read_new_rows() == list(range(100))
+        assert read_new_rows() == []
+
+        PostgresTable(**options).write(pa.table({"id": list(range(100, 150))}))
+        assert sorted(read_new_rows()) == list(range(100, 150))
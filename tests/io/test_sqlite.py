@@ -0,0 +1,48 @@
+import pyarrow as pa
+import pytest
+
+from evolve.io import SQLiteTable
+from evolve.ir import ArrowBackend
+
+TABLE = pa.table({"id": [1, 2, 3, 4, 5], "name": ["a", "b", "c", "d", "e"]})
+
+
+def test_sqlite_write_create_then_append(tmp_path):
+    uri = str(tmp_path / "test.db")
+    SQLiteTable(uri, "users", write_mode="create", backend=ArrowBackend()).write(TABLE)
+
+    target = SQLiteTable(uri, "users", commit_every=2, backend=ArrowBackend())
+    target.write_batches(TABLE.to_batches(max_chunksize=1))
+
+    result = target.read()
+    assert result.num_rows == 10
+    assert result.column("id").to_pylist() == [1, 2, 3, 4, 5] * 2
+
+
+def test_sqlite_atomic_replace(tmp_path):
+    uri = str(tmp_path / "test.db")
+    SQLiteTable(uri, "users", write_mode="create", backend=ArrowBackend()).write(TABLE)
+
+    target = SQLiteTable(
+        uri,
+        "users",
+        write_mode="replace",
+        atomic_replace=True,
+        backend=ArrowBackend(),
+    )
+    target.write(TABLE.slice(0, 2))
+
+    assert target.read().column("name").to_pylist() == ["a", "b"]
+
+
+def test_sqlite_atomic_replace_requires_replace_mode(tmp_path):
+    with pytest.raises(ValueError):
+        SQLiteTable(str(tmp_path / "test.db"), "users", atomic_replace=True)
+
+
+def test_sqlite_table_is_needed_to_read_and_write(tmp_path):
+    target = SQLiteTable(str(tmp_path / "test.db"), backend=ArrowBackend())
+    with pytest.raises(ValueError, match="needs a table"):
+        target.write(TABLE)
+    with pytest.raises(ValueError, match="needs a table"):
+        target.read()
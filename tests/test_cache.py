@@ -0,0 +1,87 @@
+import os
+
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from evolve import ArrowBackend, SourceCache
+from evolve.io import Bytes, CsvFile, ParquetFile
+from evolve.ir import BytesBackend
+
+TABLE = pa.table({"id": [1, 2, 3], "name": ["a", "b", "c"]})
+
+
+def test_source_cache_decoded_hit_and_invalidation(tmp_path):
+    path = tmp_path / "lookup.csv"
+    pv.write_csv(TABLE, path)
+    cache = SourceCache(tmp_path / "cache")
+
+    assert CsvFile(path, backend=ArrowBackend(), cache=cache).read().equals(TABLE)
+    entries = list(cache.directory.glob("*/*.arrow"))
+    assert len(entries) == 1
+
+    # an edit keeping the size and mtime goes unnoticed, so the rows come
+    # from the entry without parsing the source
+    mtime = os.stat(path).st_mtime_ns
+    path.write_text(path.read_text().replace("a", "x"))
+    os.utime(path, ns=(mtime, mtime))
+    assert CsvFile(path, backend=ArrowBackend(), cache=cache).read().equals(TABLE)
+    assert cache.size == entries[0].stat().st_size
+
+    # a changed source is a new entry
+    pv.write_csv(TABLE.slice(0, 1), path)
+    result = CsvFile(path, backend=ArrowBackend(), cache=cache).read()
+    assert result.equals(TABLE.slice(0, 1))
+    assert len(list(cache.directory.glob("*/*.arrow"))) == 2
+
+    batches = list(
+        CsvFile(path, backend=ArrowBackend(), cache=cache).read_batches(batch_size=1)
+    )
+    assert pa.Table.from_batches(batches).equals(TABLE.slice(0, 1))
+
+
+def test_source_cache_evicts_least_recently_used(tmp_path):
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"{i}.parquet")
+        pq.write_table(TABLE, paths[-1])
+
+    def entries():
+        return set(cache.directory.glob("*/*.arrow"))
+
+    cache = SourceCache(tmp_path / "cache")
+    ParquetFile(paths[0], backend=ArrowBackend(), cache=cache).read()
+    (first,) = entries()
+    entry_size = cache.size
+
+    cache = SourceCache(tmp_path / "cache", max_size=2 * entry_size)
+    ParquetFile(paths[1], backend=ArrowBackend(), cache=cache).read()
+    (second,) = entries() - {first}
+    for entry in (first, second):
+        os.utime(entry, ns=(0, 0))
+
+    # reading the first file again makes the second the least recently used
+    ParquetFile(paths[0], backend=ArrowBackend(), cache=cache).read()
+    ParquetFile(paths[2], backend=ArrowBackend(), cache=cache).read()
+
+    assert first in entries() and second not in entries()
+    assert cache.size == 2 * entry_size
+
+
+def test_source_cache_raw_files(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"x" * 1000)
+    cache = SourceCache(tmp_path / "cache", decoded=False)
+
+    assert Bytes(path, backend=BytesBackend(), cache=cache).read() == b"x" * 1000
+    entries = list(cache.directory.glob("*/*.raw"))
+    assert [entry.read_bytes() for entry in entries] == [b"x" * 1000]
+
+    # tables are decoded from the raw copy, nothing decoded is stored
+    pv.write_csv(TABLE, tmp_path / "lookup.csv")
+    result = CsvFile(tmp_path / "lookup.csv", backend=ArrowBackend(), cache=cache)
+    assert result.read().equals(TABLE)
+    assert not list(cache.directory.glob("*/*.arrow"))
+
+    cache.clear()
+    assert cache.size == 0
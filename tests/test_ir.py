@@ -0,0 +1,102 @@
+import gc
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from evolve.io import ArrowDataset, CsvFile, ParquetFile
+from evolve.ir import (
+    ArrowBackend,
+    BytesBackend,
+    DuckdbBackend,
+    LazyIR,
+    PolarsBackend,
+    get_conversion_stats,
+)
+
+
+def test_lazy_parquet_scan_polars_pushdown():
+    source = ParquetFile("examples/data/weather.parquet", backend=PolarsBackend())
+    lazy = source.scan().filter("MinTemp > 10").select("MinTemp", "MaxTemp")
+    assert isinstance(lazy, LazyIR)
+    assert isinstance(lazy.plan, pl.LazyFrame)
+    assert "PROJECT 2/22 COLUMNS" in lazy.plan.explain()
+
+    table = lazy.collect()
+    expected = source.read().filter(pl.col("MinTemp") > 10)
+    assert table.column_names == ["MinTemp", "MaxTemp"]
+    assert table.num_rows == len(expected)
+
+
+def test_lazy_csv_scan_duckdb_pushdown():
+    source = CsvFile("examples/data/dummy.csv", backend=DuckdbBackend())
+    lazy = source.scan().filter("amount > 1000").select("name")
+    assert "Filters:" in lazy.plan.explain()
+
+    table = pa.Table.from_batches(list(lazy.to_batches()))
+    assert table.column("name").to_pylist() == ["wilhelm", "rickard", "ye", "slime"]
+
+
+def test_lazy_dataset_scan_partition_pruning(tmp_path):
+    table = pa.table({"day": [1, 1, 2, 3], "value": [1.0, 2.0, 3.0, 4.0]})
+    pq.write_to_dataset(table, tmp_path, partition_cols=["day"])
+
+    source = ArrowDataset(tmp_path, partitioning="hive", backend=ArrowBackend())
+    result = source.scan().filter(pl.col("day") == 1).collect()
+    assert result.column("value").to_pylist() == [1.0, 2.0]
+
+
+def test_lazy_duckdb_plan_rejects_polars_predicates():
+    source = CsvFile("examples/data/dummy.csv", backend=DuckdbBackend())
+    with pytest.raises(TypeError):
+        source.scan().filter(pl.col("amount") > 1000)
+
+
+def test_conversion_stats_count_copies():
+    stats = get_conversion_stats()
+    stats.reset()
+
+    numbers = pa.table({"value": pa.array(range(1000), pa.int64())})
+    df = PolarsBackend().ir_from_arrow_table(numbers)
+    assert stats.as_dict() == {"arrow->polars": {"conversions": 1, "bytes_copied": 0}}
+
+    # serializing to ipc copies, reading the ipc buffer back does not
+    buffer = BytesBackend().ir_from_arrow_table(numbers)
+    assert isinstance(buffer, pa.Buffer)
+    assert BytesBackend().ir_to_arrow_table(buffer).equals(numbers)
+    totals = stats.as_dict()
+    assert totals["arrow->bytes"]["bytes_copied"] >= numbers.nbytes
+    assert totals["bytes->arrow"]["bytes_copied"] == 0
+
+    # polars stores strings as views, exporting them to arrow builds new buffers
+    stats.reset()
+    PolarsBackend().ir_to_arrow_table(df)
+    assert stats.bytes_copied == 0
+    PolarsBackend().ir_to_arrow_table(pl.DataFrame({"name": ["a", "b", "c"]}))
+    assert stats.bytes_copied > 0
+
+    stats.reset()
+    backend = DuckdbBackend()
+    backend.ir_to_polars_df(backend.ir_from_arrow_table(numbers))
+    assert stats.bytes_copied >= numbers.nbytes
+    assert df["value"].sum() == sum(range(1000))
+
+
+def test_duckdb_backend_relations_do_not_collide():
+    backend = DuckdbBackend()
+    first = backend.ir_from_arrow_table(pa.table({"a": [1, 2]}))
+    second = backend.ir_from_arrow_table(pa.table({"b": ["x"]}))
+    assert first.alias != second.alias
+
+    assert backend.ir_to_arrow_table(first).column("a").to_pylist() == [1, 2]
+    assert backend.ir_to_arrow_table(second).column("b").to_pylist() == ["x"]
+
+
+def test_duckdb_relations_keep_the_backend_connection_open():
+    rel = DuckdbBackend().ir_from_arrow_table(pa.table({"a": [1, 2, 3]}))
+    plan = LazyIR(rel).filter("a > 1").select("a")
+    del rel
+    gc.collect()
+
+    assert plan.collect().column("a").to_pylist() == [2, 3]
@@ -1,8 +1,17 @@
 import io
+import json
 from pathlib import Path
 from unittest.mock import patch
 
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from evolve.io import CsvFile, ParquetFile
+from evolve.ir import DuckdbBackend, PolarsBackend
 from evolve.pipeline import Pipeline
+from evolve.transform import SqlTransform, Transform
 
 DUMMY_YAML = """
     source:
@@ -34,3 +43,168 @@ def test_from_yaml_file():
         pipeline = Pipeline.from_yaml_file("my_pipeline.yml")
         print(pipeline)
         assert len(pipeline._transforms) == 3
+
+
+class _AddOne(Transform):
+    def __init__(self) -> None:
+        super().__init__(name="add_one")
+
+    def apply(self, data):
+        return data.with_columns(pl.col("amount") + 1)
+
+
+def test_run_streaming_csv_to_parquet(tmp_path):
+    source = CsvFile("examples/data/dummy.csv", backend=PolarsBackend())
+    target = ParquetFile(tmp_path / "dummy.parquet", backend=PolarsBackend())
+
+    pipeline = Pipeline(source=source, target=target, transforms=[_AddOne()])
+    pipeline.run(streaming=True, batch_size=2)
+
+    expected = source.read().with_columns(pl.col("amount") + 1)
+    result = pq.read_table(tmp_path / "dummy.parquet")
+    assert result.num_rows == 5
+    assert pl.from_arrow(result).equals(expected)
+
+
+def test_run_pipelined_csv_to_parquet(tmp_path):
+    source = CsvFile("examples/data/dummy.csv", backend=PolarsBackend())
+    target = ParquetFile(tmp_path / "dummy.parquet", backend=PolarsBackend())
+
+    pipeline = Pipeline(source=source, target=target, transforms=[_AddOne()])
+    pipeline.run(pipelined=True, batch_size=1, queue_depth=1)
+
+    expected = source.read().with_columns(pl.col("amount") + 1)
+    result = pq.read_table(tmp_path / "dummy.parquet")
+    assert pl.from_arrow(result).equals(expected)
+
+
+class _Explode(Transform):
+    def __init__(self) -> None:
+        super().__init__(name="explode")
+
+    def apply(self, data):
+        raise RuntimeError("boom")
+
+
+def test_run_pipelined_propagates_stage_errors(tmp_path):
+    source = CsvFile("examples/data/dummy.csv", backend=PolarsBackend())
+    target = ParquetFile(tmp_path / "dummy.parquet", backend=PolarsBackend())
+
+    pipeline = Pipeline(source=source, target=target, transforms=[_Explode()])
+    with pytest.raises(RuntimeError, match="boom"):
+        pipeline.run(pipelined=True, batch_size=1, queue_depth=1)
+
+
+class _ProjectAndFilter(Transform):
+    def __init__(self) -> None:
+        super().__init__(name="project_and_filter")
+
+    def apply(self, data):
+        return data.filter("MinTemp > 10").select("MinTemp", "RainTomorrow")
+
+
+def test_run_lazy_parquet_to_csv(tmp_path):
+    source = ParquetFile("examples/data/weather.parquet")
+    target = CsvFile(tmp_path / "weather.csv", backend=PolarsBackend())
+
+    pipeline = Pipeline(source=source, target=target, transforms=[_ProjectAndFilter()])
+    pipeline.run(lazy=True)
+
+    result = target.read()
+    assert result.columns == ["MinTemp", "RainTomorrow"]
+    assert (result["MinTemp"] > 10).all()
+
+
+def test_run_duckdb_sql_transforms_parquet_to_parquet(tmp_path):
+    backend = DuckdbBackend()
+    source = ParquetFile("examples/data/weather.parquet", backend=backend)
+    target = ParquetFile(tmp_path / "weather.parquet", backend=backend)
+
+    pipeline = Pipeline(
+        source=source,
+        target=target,
+        transforms=[
+            SqlTransform("SELECT MinTemp, MaxTemp FROM self WHERE MinTemp > 10"),
+            SqlTransform("SELECT MaxTemp - MinTemp AS TempRange FROM self"),
+        ],
+    )
+    pipeline.run(lazy=True)
+
+    result = pq.read_table(tmp_path / "weather.parquet")
+    expected = pl.read_parquet("examples/data/weather.parquet").filter(
+        pl.col("MinTemp") > 10
+    )
+    assert result.column_names == ["TempRange"]
+    assert result.num_rows == len(expected)
+
+
+@pytest.mark.parametrize("backend", [PolarsBackend, DuckdbBackend])
+def test_run_lazy_dedup_with_memory_limit(tmp_path, backend):
+    table = pa.table({"key": [i % 100 for i in range(10_000)], "value": range(10_000)})
+    pq.write_table(table, tmp_path / "source.parquet")
+
+    backend = backend()
+    pipeline = Pipeline(
+        source=ParquetFile(tmp_path / "source.parquet", backend=backend),
+        target=ParquetFile(tmp_path / "target.parquet", backend=backend),
+        transforms=[
+            SqlTransform("SELECT key, max(value) AS value FROM self GROUP BY key")
+        ],
+    )
+    pipeline.run(lazy=True, memory_limit="256MB", temp_directory=tmp_path / "spill")
+
+    result = pq.read_table(tmp_path / "target.parquet").sort_by("key")
+    assert result.column("key").to_pylist() == list(range(100))
+    assert result.column("value").to_pylist() == list(range(9_900, 10_000))
+    if isinstance(backend, DuckdbBackend):
+        (temp_directory,) = backend.connection.execute(
+            "SELECT current_setting('temp_directory')"
+        ).fetchone()
+        assert temp_directory == str(tmp_path / "spill")
+
+
+@pytest.mark.parametrize("mode", ["eager", "streaming", "pipelined"])
+def test_run_report(tmp_path, mode):
+    source = CsvFile("examples/data/dummy.csv", backend=PolarsBackend())
+    target = ParquetFile(tmp_path / "dummy.parquet", backend=PolarsBackend())
+    reports = []
+
+    pipeline = Pipeline(source=source, target=target, transforms=[_AddOne()])
+    report = pipeline.run(
+        streaming=mode == "streaming",
+        pipelined=mode == "pipelined",
+        batch_size=2,
+        callbacks=[reports.append],
+    )
+
+    assert reports == [report]
+    assert report.mode == mode
+    assert report.error is None
+    assert [(s.kind, s.name) for s in report.stages] == [
+        ("read", "CsvFile"),
+        ("transform", "add_one"),
+        ("write", "ParquetFile"),
+    ]
+    read, transform, write = report.stages
+    assert read.rows_out == transform.rows_in == transform.rows_out == 5
+    assert write.rows_in == 5
+    assert write.batches == (1 if mode == "eager" else 3)
+    assert all(s.wall_time >= 0 and s.bytes_out != 0 for s in report.stages[:2])
+
+    assert json.loads(report.to_json())["stages"][2]["rows_in"] == 5
+    spans = report.to_otel_spans()
+    assert len(spans) == 4
+    assert {span["parentSpanId"] for span in spans[1:]} == {spans[0]["spanId"]}
+
+
+def test_run_report_on_failure(tmp_path):
+    source = CsvFile("examples/data/dummy.csv", backend=PolarsBackend())
+    target = ParquetFile(tmp_path / "dummy.parquet", backend=PolarsBackend())
+    reports = []
+
+    pipeline = Pipeline(source=source, target=target, transforms=[_Explode()])
+    with pytest.raises(RuntimeError):
+        pipeline.run(callbacks=[reports.append])
+
+    assert reports[0].error == "RuntimeError: boom"
+    assert reports[0].to_otel_spans()[0]["status"]["code"] == 2
@@ -0,0 +1,28 @@
+import datetime
+from decimal import Decimal
+
+from evolve import JsonStateStore
+
+
+def test_json_state_store_roundtrip(tmp_path):
+    uri = tmp_path / "state" / "state.json"
+    store = JsonStateStore(uri)
+    assert store.get("source") is None
+
+    watermark = {
+        "ts": datetime.datetime(2025, 1, 1, 12, tzinfo=datetime.UTC),
+        "day": datetime.date(2025, 1, 1),
+        "amount": Decimal("1.50"),
+        "offsets": {"0": 10, "1": 20},
+    }
+    store.set("source", watermark)
+    store.set("other", 1)
+
+    # a fresh store reads back what was persisted
+    store = JsonStateStore(uri)
+    assert store.get("source") == watermark
+    assert store.get("other") == 1
+
+    store.delete("other")
+    assert JsonStateStore(uri).get("other") is None
+    assert not (tmp_path / "state" / "state.json.tmp").exists()
@@ -0,0 +1,144 @@
+import datetime
+import gc
+import hashlib
+
+import polars as pl
+import pyarrow as pa
+import pytest
+
+from evolve.ir import DuckdbBackend, LazyIR
+from evolve.transform import (
+    AddLoadMetadata,
+    Cast,
+    Deduplicate,
+    Filter,
+    FusedTransform,
+    HashKey,
+    Rename,
+    Select,
+    SqlTransform,
+    Transform,
+    WithColumns,
+    fuse,
+)
+
+TABLE = pa.table(
+    {
+        "id": [1, 2, 2, 3],
+        "name": ["a", "b", "b", None],
+        "amount": [10, 20, 20, 30],
+    }
+)
+
+
+def _to_arrow(data):
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pl.DataFrame):
+        return data.to_arrow()
+    return data.fetch_arrow_table()
+
+
+@pytest.mark.parametrize(
+    "to_ir",
+    [
+        lambda t: t,
+        pl.from_arrow,
+        # the backend outlives every relation of the test
+        lambda t, backend=DuckdbBackend(): backend.ir_from_arrow_table(t),
+    ],
+    ids=["arrow", "polars", "duckdb"],
+)
+def test_builtin_transforms_on_every_backend(to_ir):
+    loaded_time = datetime.datetime(2025, 1, 1, 12)
+    transforms = [
+        Filter("amount > 10"),
+        Deduplicate(subset=["id"]),
+        WithColumns(total="amount * 2"),
+        Cast({"amount": "DOUBLE"}),
+        Rename({"name": "label"}),
+        AddLoadMetadata("nightly", loaded_time=loaded_time),
+        HashKey(["id", "label"]),
+        Select("id", "label", "amount", "total", "hash_key", "internal_job_name"),
+    ]
+
+    ir = to_ir(TABLE)
+    for transform in transforms:
+        ir = transform.apply(ir)
+
+    result = _to_arrow(ir).sort_by("id")
+    assert result.column_names == [
+        "id",
+        "label",
+        "amount",
+        "total",
+        "hash_key",
+        "internal_job_name",
+    ]
+    assert result.column("id").to_pylist() == [2, 3]
+    assert result.column("label").to_pylist() == ["b", None]
+    assert result.column("amount").to_pylist() == [20.0, 30.0]
+    assert result.column("total").to_pylist() == [40, 60]
+    assert result.column("internal_job_name").to_pylist() == ["nightly"] * 2
+
+    # the same key on every backend, with nulls distinct from empty strings
+    assert result.column("hash_key").to_pylist() == [
+        hashlib.md5(b"2|b").hexdigest(),
+        hashlib.md5(b"3|\\N").hexdigest(),
+    ]
+
+
+class _Custom(Transform):
+    def apply(self, data):
+        return data
+
+
+def test_fuse_adjacent_builtin_transforms():
+    sql = SqlTransform("SELECT id, amount FROM self")
+    custom = _Custom("custom")
+    transforms = fuse([Filter("amount > 10"), sql, custom, Deduplicate()])
+
+    assert isinstance(transforms[0], FusedTransform)
+    assert transforms[0].name == "filter + sql"
+    assert transforms[1] is custom
+    assert isinstance(transforms[2], Deduplicate)
+
+    lazy = transforms[0].apply(LazyIR(pl.from_arrow(TABLE).lazy()))
+    assert isinstance(lazy, LazyIR)
+    assert lazy.collect().num_rows == 3
+
+
+def test_polars_expressions_are_rejected_on_duckdb():
+    rel = DuckdbBackend().ir_from_arrow_table(TABLE)
+    with pytest.raises(TypeError):
+        Filter(pl.col("amount") > 10).apply(rel)
+
+    assert Filter(pl.col("amount") > 10).apply(TABLE).num_rows == 3
+
+
+def test_sql_transform_applied_to_two_relations():
+    backend = DuckdbBackend()
+    sql = SqlTransform("SELECT amount FROM self")
+    first = sql.apply(backend.ir_from_arrow_table(pa.table({"amount": [10, 20]})))
+    second = sql.apply(backend.ir_from_arrow_table(pa.table({"amount": [30, 40]})))
+
+    assert first.fetch_arrow_table().column("amount").to_pylist() == [10, 20]
+    assert second.fetch_arrow_table().column("amount").to_pylist() == [30, 40]
+
+
+def test_deduplicate_applied_to_two_relations():
+    backend = DuckdbBackend()
+    dedup = Deduplicate(subset=["id"])
+    first = dedup.apply(backend.ir_from_arrow_table(pa.table({"id": [1, 1]})))
+    second = dedup.apply(backend.ir_from_arrow_table(pa.table({"id": [2, 3, 3]})))
+
+    assert first.fetch_arrow_table().column("id").to_pylist() == [1]
+    assert sorted(second.fetch_arrow_table().column("id").to_pylist()) == [2, 3]
+
+
+def test_transformed_relations_outlive_their_input():
+    rel = Filter("amount > 10").apply(DuckdbBackend().ir_from_arrow_table(TABLE))
+    rel = Select("amount").apply(rel)
+    gc.collect()
+
+    assert rel.fetch_arrow_table().column("amount").to_pylist() == [20, 20, 30]
@@ -0,0 +1,83 @@
+import time
+
+import polars as pl
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from evolve import (
+    Pipeline,
+    PolarsBackend,
+    ResourceMonitor,
+    clear_file_system_cache,
+    set_file_system_idle_timeout,
+)
+from evolve._utils import _try_get_file_system_from_uri
+from evolve.io import CsvFile, ParquetFile
+from evolve.transform import Transform
+
+
+def _s3(uri, **options):
+    return _try_get_file_system_from_uri(
+        uri, access_key="key", secret_key="secret", region="eu-west-1", **options
+    )
+
+
+def test_file_systems_are_shared():
+    clear_file_system_cache()
+
+    first, path = _s3("s3://bucket/a.csv")
+    second, _ = _s3("s3://bucket/b.csv")
+    assert path == "bucket/a.csv"
+    assert first is second
+
+    # other options get their own instance
+    retries = fs.AwsStandardS3RetryStrategy(max_attempts=5)
+    third, _ = _s3("s3://bucket/a.csv", retry_strategy=retries)
+    assert third is not first
+    assert _s3("s3://bucket/c.csv", retry_strategy=retries)[0] is third
+
+    clear_file_system_cache()
+    assert _s3("s3://bucket/a.csv")[0] is not first
+
+
+def test_idle_file_systems_are_evicted():
+    clear_file_system_cache()
+    set_file_system_idle_timeout(0.05)
+    try:
+        first, _ = _s3("s3://bucket/a.csv")
+        assert _s3("s3://bucket/a.csv")[0] is first
+        time.sleep(0.1)
+        assert _s3("s3://bucket/a.csv")[0] is not first
+    finally:
+        set_file_system_idle_timeout(None)
+
+
+class _Sleep(Transform):
+    def __init__(self) -> None:
+        super().__init__(name="sleep")
+
+    def apply(self, data):
+        time.sleep(0.1)
+        return data
+
+
+def test_resource_monitor_tags_samples_with_stages(tmp_path):
+    pipeline = Pipeline(
+        source=CsvFile("examples/data/dummy.csv", backend=PolarsBackend()),
+        target=ParquetFile(tmp_path / "dummy.parquet", backend=PolarsBackend()),
+        transforms=[_Sleep()],
+    )
+    with ResourceMonitor(interval=0.005, capacity=16) as monitor:
+        pipeline.run()
+
+    samples = monitor.samples()
+    assert samples.num_rows == 16
+    assert "transform:sleep" in samples["stage"].to_pylist()
+
+    summary = monitor.summary()
+    row = summary.filter(pl.col("stage") == "transform:sleep").row(0, named=True)
+    assert row["samples"] >= 1
+    assert row["rss_max"] > 0
+
+    monitor.to_parquet(tmp_path / "samples.parquet")
+    assert pq.read_table(tmp_path / "samples.parquet").num_rows == 16